@@ -7,7 +7,7 @@ __version__ = '0.1.12'
 
 # do not change this line manually
 # this is managed by proto/build-proto.sh and updated on every execution
-__proto_version__ = '0.0.21'
+__proto_version__ = '0.0.24'
 
 import platform
 import sys
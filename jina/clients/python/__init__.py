@@ -56,7 +56,7 @@ class PyClient(GrpcClient):
 
     @mode.setter
     def mode(self, value):
-        avail = {'train', 'index', 'search'}
+        avail = {'train', 'index', 'search', 'update', 'delete'}
         if value in avail:
             self._mode = value
             self.args.mode = value
@@ -88,7 +88,7 @@ class PyClient(GrpcClient):
         Nonetheless, you can use it for testing one query and check the result.
 
         :param data: the binary data of the document or the ``Document`` in protobuf
-        :param mode: request will be sent in this mode, available ``train``, ``index``, ``query``
+        :param mode: request will be sent in this mode, available ``train``, ``index``, ``search``, ``update``, ``delete``
         """
         self.mode = mode
         kwargs = vars(self.args)
@@ -182,3 +182,15 @@ class PyClient(GrpcClient):
         self.mode = 'index'
         self.input_fn = input_fn
         self.start(output_fn, **kwargs)
+
+    def update(self, input_fn: Union[Iterator['jina_pb2.Document'], Iterator[bytes], Callable] = None,
+               output_fn: Callable[['jina_pb2.Message'], None] = None, **kwargs):
+        self.mode = 'update'
+        self.input_fn = input_fn
+        self.start(output_fn, **kwargs)
+
+    def delete(self, input_fn: Union[Iterator['jina_pb2.Document'], Iterator[bytes], Callable] = None,
+               output_fn: Callable[['jina_pb2.Message'], None] = None, **kwargs):
+        self.mode = 'delete'
+        self.input_fn = input_fn
+        self.start(output_fn, **kwargs)
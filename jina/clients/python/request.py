@@ -3,7 +3,7 @@ __license__ = "Apache-2.0"
 
 import ctypes
 import random
-from typing import Iterator, Union
+from typing import Iterator, Union, Dict, List
 
 from ...helper import batch_iterator
 from ...proto import jina_pb2
@@ -12,7 +12,7 @@ from ...proto import jina_pb2
 def _generate(data: Union[Iterator[bytes], Iterator['jina_pb2.Document']], batch_size: int = 0,
               first_doc_id: int = 0, first_request_id: int = 0,
               random_doc_id: bool = False, mode: str = 'index', top_k: int = 50,
-              in_proto: bool = False,
+              in_proto: bool = False, filter: Union[Dict[str, str], List[str]] = None,
               *args, **kwargs) -> Iterator['jina_pb2.Message']:
     for pi in batch_iterator(data, batch_size):
         req = jina_pb2.Request()
@@ -23,6 +23,8 @@ def _generate(data: Union[Iterator[bytes], Iterator['jina_pb2.Document']], batch
                 raise ValueError('"top_k: %d" is not a valid number' % top_k)
             else:
                 req.search.top_k = top_k
+            if filter:
+                req.search.filter.update(_parse_filter(filter))
 
         for raw_bytes in pi:
             d = getattr(req, mode).docs.add()
@@ -30,13 +32,28 @@ def _generate(data: Union[Iterator[bytes], Iterator['jina_pb2.Document']], batch
                 d.CopyFrom(raw_bytes)
             else:
                 d.raw_bytes = raw_bytes
-            d.doc_id = first_doc_id if not random_doc_id else random.randint(0, ctypes.c_uint(-1).value)
+            if not (in_proto and mode in ('update', 'delete')):
+                # the documents to update or delete are identified by the doc_id given in the protobuf
+                d.doc_id = first_doc_id if not random_doc_id else random.randint(0, ctypes.c_uint(-1).value)
             d.weight = 1.0
             first_doc_id += 1
         yield req
         first_request_id += 1
 
 
+def _parse_filter(filter: Union[Dict[str, str], List[str]]) -> Dict[str, str]:
+    """Parse the filter given as a dict, or as a list of ``KEY=VALUE`` strings from the CLI """
+    if isinstance(filter, dict):
+        return {str(k): str(v) for k, v in filter.items()}
+    result = {}
+    for f in filter:
+        if '=' not in f:
+            raise ValueError('"filter: %s" is not valid, expecting "KEY=VALUE"' % f)
+        k, v = f.split('=', 1)
+        result[k] = v
+    return result
+
+
 def index(*args, **kwargs):
     """Generate indexing request"""
     yield from _generate(*args, **kwargs)
@@ -54,3 +71,13 @@ def train(*args, **kwargs):
 def search(*args, **kwargs):
     """Generate search request """
     yield from _generate(*args, **kwargs)
+
+
+def update(*args, **kwargs):
+    """Generate update request """
+    yield from _generate(*args, **kwargs)
+
+
+def delete(*args, **kwargs):
+    """Generate delete request """
+    yield from _generate(*args, **kwargs)
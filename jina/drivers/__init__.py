@@ -3,7 +3,7 @@ __license__ = "Apache-2.0"
 
 import inspect
 from functools import wraps
-from typing import Callable, List
+from typing import Callable, List, Optional, Dict, Union
 
 import ruamel.yaml.constructor
 
@@ -106,6 +106,11 @@ class BaseDriver(metaclass=DriverType):
         """
         return self.pea.prev_requests
 
+    @property
+    def buffers(self) -> Optional[Dict[int, memoryview]]:
+        """Get the chunk embeddings received in the zero-copy mode, shortcut to ``self.pea.buffers``"""
+        return getattr(self.pea, 'buffers', None)
+
     @property
     def msg(self) -> 'jina_pb2.Message':
         """Get the current request, shortcut to ``self.pea.message``"""
@@ -129,6 +134,12 @@ class BaseDriver(metaclass=DriverType):
         """Shortcut to ``self.pea.logger``"""
         return self.pea.logger
 
+    @property
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """The runtime statistics of this driver, e.g. the hits of a cache, reported by the
+        :class:`jina.peapods.pea.BasePea` in its stats and the reply of the ``STATUS`` request """
+        return {}
+
     def __call__(self, *args, **kwargs) -> None:
         raise NotImplementedError
 
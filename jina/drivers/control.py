@@ -19,6 +19,8 @@ class ControlReqDriver(BaseDriver):
             self.envelope.status = jina_pb2.Envelope.READY
             for k, v in vars(self.pea.args).items():
                 self.req.args[k] = str(v)
+            for k, v in getattr(self.pea, 'stats', {}).items():
+                self.req.args[k] = str(v)
         elif self.req.command == jina_pb2.Request.ControlRequest.DRYRUN:
             self.envelope.status = jina_pb2.Envelope.READY
         else:
@@ -1,8 +1,14 @@
 __copyright__ = "Copyright (c) 2020 Jina AI Limited. All rights reserved."
 __license__ = "Apache-2.0"
 
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
 from . import BaseExecutableDriver
-from .helper import extract_chunks, array2pb
+from .helper import extract_chunks, array2pb, pack_embeddings
+from ..executors.encoders.cache import EmbeddingCache
 
 
 class BaseEncodeDriver(BaseExecutableDriver):
@@ -14,27 +20,129 @@ class BaseEncodeDriver(BaseExecutableDriver):
 
 class EncodeDriver(BaseEncodeDriver):
     """Extract the chunk-level content from documents and call executor and do encoding
+
+    With ``cache_size > 0``, the embeddings are cached by the hash of the chunk content, see
+    :class:`jina.executors.encoders.cache.EmbeddingCache`. Only the chunks not in the cache are sent to the encoder.
+
+    The chunks of several messages can be encoded in one call via :func:`encode_batch`, this is used by the pea to
+    batch the queued requests, see ``--max-batch-size``.
     """
 
+    def __init__(self, pack_embedding: bool = False, cache_size: int = 0,
+                 cache_memory_limit: int = 256 * 1024 * 1024, cache_filename: str = None, *args, **kwargs):
+        """
+
+        :param pack_embedding: store the embeddings of all chunks as one packed ``B x D`` array in the request,
+            instead of one ``NdArray`` per chunk. Vector drivers read the packed array directly,
+            see :func:`jina.drivers.helper.extract_embeddings`
+        :param cache_size: the max number of embeddings cached in the memory, ``0`` disables the cache
+        :param cache_memory_limit: the max total size of the embeddings cached in the memory in bytes
+        :param cache_filename: the file name of the on-disk cache in the workspace of the executor, ``None`` to keep
+            the cache in the memory only
+        """
+        super().__init__(*args, **kwargs)
+        self.pack_embedding = pack_embedding
+        self.cache_size = cache_size
+        self.cache_memory_limit = cache_memory_limit
+        self.cache_filename = cache_filename
+        self._cache = None
+        self._batched = Counter()  # the number of the batched messages of each request id, not yet handled
+
+    @property
+    def cache(self) -> Optional['EmbeddingCache']:
+        """The cache of the embeddings, created on the first use, ``None`` when it is disabled """
+        if self._cache is None and self.cache_size > 0:
+            path = self.exec.get_file_from_workspace(self.cache_filename) if self.cache_filename else None
+            self._cache = EmbeddingCache(self.cache_size, self.cache_memory_limit, path)
+        return self._cache
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        if self._cache is None:
+            return {}
+        return {f'cache_{k}': v for k, v in self._cache.stats.items()}
+
+    def __getstate__(self):
+        d = super().__getstate__()
+        d['_cache'] = None
+        return d
+
     def __call__(self, *args, **kwargs):
-        contents, chunk_pts, no_chunk_docs, bad_chunk_ids = extract_chunks(self.req.docs, embedding=False)
+        if self._batched and self.msg is not None and self._batched[self.envelope.request_id] > 0:
+            # already encoded by encode_batch()
+            self._batched[self.envelope.request_id] -= 1
+            self._batched += Counter()  # drop the zero counts
+            return
+        self._encode([self.req])
+
+    def encode_batch(self, msgs: List['jina_pb2.Message']):
+        """Encode the chunks of all messages in as few calls of the executor as possible
+
+        The contents of different shapes can not be stacked, so the messages are grouped by the shape and the dtype of
+        their contents, and each group is encoded in one call. The next call of this driver on each of the encoded
+        messages does nothing, so that the messages can go through the rest of the drivers one by one as usual. The
+        messages of a failed group are encoded again one by one in that call.
+
+        :param msgs: the messages of the data requests
+        """
+        groups = {}
+        for msg in msgs:
+            req = getattr(msg.request, msg.request.WhichOneof('body'))
+            contents, chunk_pts = self._extract_chunks(req)
+            key = (contents.shape[1:], contents.dtype.str) if chunk_pts else None
+            groups.setdefault(key, []).append((msg, req, contents, chunk_pts))
+        for group in groups.values():
+            msgs, reqs, contents, chunk_pts = zip(*group)
+            if self._encode(reqs, contents, chunk_pts):
+                self._batched.update(m.envelope.request_id for m in msgs)
+
+    def _extract_chunks(self, req: 'jina_pb2.Request') -> Tuple[Optional['np.ndarray'], List['jina_pb2.Chunk']]:
+        contents, chunk_pts, no_chunk_docs, bad_chunk_ids = extract_chunks(req.docs, embedding=False)
 
         if no_chunk_docs:
             self.logger.warning('these docs contain no chunk: %s' % no_chunk_docs)
 
         if bad_chunk_ids:
             self.logger.warning('these bad chunks can not be added: %s' % bad_chunk_ids)
+        return contents, chunk_pts
+
+    def _encode(self, reqs: Sequence['jina_pb2.Request'], contents: Sequence[Optional['np.ndarray']] = None,
+                chunk_pts: Sequence[List['jina_pb2.Chunk']] = None) -> bool:
+        """Encode the chunks of the requests in one call of the executor
+
+        :param contents: the contents of the chunks of each request in the same shape, extracted if not given
+        :param chunk_pts: the chunks of each request, extracted if not given
+        :return: ``True`` if the chunks are encoded, ``False`` if the executor throws an exception
+        """
+        if contents is None:
+            contents, chunk_pts = zip(*[self._extract_chunks(req) for req in reqs])
+        num_chunks = [len(c) for c in chunk_pts]
+        contents = [c for c, n in zip(contents, num_chunks) if n]
+        chunk_pts = [c for _chunk_pts in chunk_pts for c in _chunk_pts]
+        if not chunk_pts:
+            return True
 
-        if chunk_pts:
-            try:
+        try:
+            contents = contents[0] if len(contents) == 1 else np.concatenate(contents)
+            if self.cache is not None:
+                embeds = self.cache.encode(contents, self.exec_fn)
+            else:
                 embeds = self.exec_fn(contents)
-                if len(chunk_pts) != embeds.shape[0]:
-                    self.logger.error(
-                        'mismatched %d chunks and a %s shape embedding, '
-                        'the first dimension must be the same' % (len(chunk_pts), embeds.shape))
+            if len(chunk_pts) != embeds.shape[0]:
+                self.logger.error(
+                    'mismatched %d chunks and a %s shape embedding, '
+                    'the first dimension must be the same' % (len(chunk_pts), embeds.shape))
+            if self.pack_embedding:
+                offsets = np.cumsum([0] + num_chunks)
+                for req, start, end in zip(reqs, offsets[:-1], offsets[1:]):
+                    if end > start:
+                        pack_embeddings(req, embeds[start:end], chunk_pts[start:end])
+            else:
                 for c, emb in zip(chunk_pts, embeds):
                     c.embedding.CopyFrom(array2pb(emb))
-            except Exception as ex:
-                self.logger.error(ex, exc_info=True)
-                self.logger.warning('encoder driver throws an exception, '
-                                    'the sequel pipeline may not work properly')
+        except Exception as ex:
+            self.logger.error(ex, exc_info=True)
+            self.logger.warning('encoder driver throws an exception, '
+                                'the sequel pipeline may not work properly')
+            return False
+        return True
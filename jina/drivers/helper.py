@@ -2,22 +2,24 @@ __copyright__ = "Copyright (c) 2020 Jina AI Limited. All rights reserved."
 __license__ = "Apache-2.0"
 
 import os
-from typing import Dict, Any, Iterable, Tuple
+from typing import Dict, Any, Iterable, Tuple, Optional, List
 
 import numpy as np
 
 from ..proto import jina_pb2
 
 
-def pb2array(blob: 'jina_pb2.NdArray') -> 'np.ndarray':
+def pb2array(blob: 'jina_pb2.NdArray', buffer: Optional[memoryview] = None) -> 'np.ndarray':
     """Convert a blob protobuf to a numpy ndarray.
 
     Note if the argument ``quantize`` is specified in :func:`array2pb` then the returned result may be lossy.
     Nonetheless, it will always in original ``dtype``, i.e. ``float32`` or ``float64``
 
     :param blob: a blob described in protobuf
+    :param buffer: read the data from this buffer instead of ``blob.raw_bytes``, the returned ndarray is a read-only
+        view over it when no quantization is used
     """
-    x = np.frombuffer(blob.raw_bytes, dtype=blob.dtype)
+    x = np.frombuffer(blob.raw_bytes if buffer is None else buffer, dtype=blob.dtype)
 
     if blob.quantization == jina_pb2.NdArray.FP16:
         x = x.astype(blob.original_dtype)
@@ -67,13 +69,16 @@ def array2pb(x: 'np.ndarray', quantize: str = None) -> 'jina_pb2.NdArray':
     return blob
 
 
-def extract_chunks(docs: Iterable['jina_pb2.Document'], embedding: bool) -> Tuple:
+def extract_chunks(docs: Iterable['jina_pb2.Document'], embedding: bool,
+                   buffers: Optional[Dict[int, memoryview]] = None) -> Tuple:
     """Iterate over a list of protobuf documents and extract chunk-level information from them
 
     :param docs: an iterable of protobuf documents
     :param embedding: an indicator of extracting embedding or not.
                     If ``True`` then all chunk-level embedding are extracted.
                     If ``False`` then ``text``, ``raw_bytes``, ``blob`` info of each chunks are extracted
+    :param buffers: the chunk embeddings received in the zero-copy mode, a map from ``chunk_id`` to the buffer.
+                    They are used for the chunks whose embedding is not filled in the protobuf
     :return: A tuple of four pieces:
 
             - a numpy ndarray of extracted info
@@ -86,7 +91,13 @@ def extract_chunks(docs: Iterable['jina_pb2.Document'], embedding: bool) -> Tupl
     no_chunk_docs = []
     bad_chunk_ids = []
 
-    if embedding:
+    if embedding and buffers:
+        def _extract_fn(c):
+            if c.embedding.raw_bytes:
+                return pb2array(c.embedding)
+            elif c.chunk_id in buffers:
+                return pb2array(c.embedding, buffers[c.chunk_id])
+    elif embedding:
         _extract_fn = lambda c: c.embedding.raw_bytes and pb2array(c.embedding)
     else:
         _extract_fn = lambda c: c.text or c.raw_bytes or (c.blob and pb2array(c.blob))
@@ -108,6 +119,80 @@ def extract_chunks(docs: Iterable['jina_pb2.Document'], embedding: bool) -> Tupl
     return contents, chunk_pts, no_chunk_docs, bad_chunk_ids
 
 
+def extract_embeddings(req: 'jina_pb2.Request', buffers: Optional[Dict[int, memoryview]] = None) -> Tuple:
+    """Extract the chunk-level embeddings from a request
+
+    When the request carries packed embeddings (see :func:`pack_embeddings`), the rows are read from the
+    packed ``B x D`` array directly, no per-chunk conversion is involved. Otherwise it falls back to
+    :func:`extract_chunks` on ``Chunk.embedding``.
+
+    :param req: a train, index or search request
+    :param buffers: the chunk embeddings received in the zero-copy mode, see :func:`extract_chunks`
+    :return: the same four pieces as :func:`extract_chunks`
+    """
+    if not req.embedding_chunk_ids:
+        return extract_chunks(req.docs, embedding=True, buffers=buffers)
+
+    packed = pb2array(req.embeddings)
+    row_ids = {c_id: j for j, c_id in enumerate(req.embedding_chunk_ids)}
+    rows = []
+    chunk_pts = []
+    no_chunk_docs = []
+    bad_chunk_ids = []
+
+    for d in req.docs:
+        if not d.chunks:
+            no_chunk_docs.append(d.doc_id)
+            continue
+
+        for c in d.chunks:
+            if c.chunk_id in row_ids:
+                rows.append(row_ids[c.chunk_id])
+                chunk_pts.append(c)
+            else:
+                bad_chunk_ids.append((d.doc_id, c.chunk_id))
+
+    if not rows:
+        contents = None
+    elif rows == list(range(packed.shape[0])):
+        # the chunks are in the same order as the packed rows, no gathering is needed
+        contents = packed
+    else:
+        contents = packed[rows]
+    return contents, chunk_pts, no_chunk_docs, bad_chunk_ids
+
+
+def pack_embeddings(req: 'jina_pb2.Request', embeds: 'np.ndarray', chunk_pts: List['jina_pb2.Chunk']) -> None:
+    """Store the chunk-level embeddings in the request as one packed ``B x D`` array
+
+    :param req: a train, index or search request
+    :param embeds: the embeddings in ``B x D`` ndarray
+    :param chunk_pts: the ``B`` chunks corresponding to each row of ``embeds``
+    """
+    req.embeddings.CopyFrom(array2pb(embeds))
+    req.ClearField('embedding_chunk_ids')
+    req.embedding_chunk_ids.extend(c.chunk_id for c in chunk_pts)
+
+
+def unpack_embeddings(req: 'jina_pb2.Request') -> None:
+    """Fill the packed embeddings in the request back into ``Chunk.embedding`` and remove the packed array
+
+    This is only needed when ``Chunk.embedding`` is read directly, e.g. on the client side.
+
+    :param req: a train, index or search request
+    """
+    if not req.embedding_chunk_ids:
+        return
+    packed = pb2array(req.embeddings)
+    row_ids = {c_id: j for j, c_id in enumerate(req.embedding_chunk_ids)}
+    for d in req.docs:
+        for c in d.chunks:
+            if c.chunk_id in row_ids:
+                c.embedding.CopyFrom(array2pb(packed[row_ids[c.chunk_id]]))
+    req.ClearField('embeddings')
+    req.ClearField('embedding_chunk_ids')
+
+
 def routes2str(msg: 'jina_pb2.Message', flag_current: bool = False) -> str:
     """Get the string representation of the routes in a message.
 
@@ -141,3 +226,21 @@ def pb_obj2dict(obj, keys: Iterable[str]) -> Dict[str, Any]:
     :param keys: an iterable of keys for extraction
     """
     return {k: getattr(obj, k) for k in keys if hasattr(obj, k)}
+
+
+def pb_objs2columns(objs: Iterable, keys: Iterable[str], id_key: str = 'chunk_id') -> Dict[str, 'np.ndarray']:
+    """Convert protobuf objects to numpy columns by selected keys, the duplicated objects are removed and the rows
+    are sorted by ``id_key``
+
+    :param objs: an iterable of protobuf objects
+    :param keys: an iterable of keys for extraction
+    :param id_key: the key identifying an object, it is always extracted as a column
+    :return: a dict mapping from the key to a numpy ``ndarray``
+    """
+    objs = list(objs)
+    ids, rows = np.unique(np.array([getattr(o, id_key) for o in objs], dtype=np.float64), return_index=True)
+    r = {id_key: ids}
+    for k in keys:
+        if k != id_key and objs and hasattr(objs[0], k):
+            r[k] = np.array([getattr(objs[j], k) for j in rows])
+    return r
@@ -1,26 +1,38 @@
 __copyright__ = "Copyright (c) 2020 Jina AI Limited. All rights reserved."
 __license__ = "Apache-2.0"
 
+from typing import Dict, List, Optional
+
 import numpy as np
 
 from . import BaseExecutableDriver
-from .helper import extract_chunks
+from .helper import extract_embeddings
 
 
 class BaseIndexDriver(BaseExecutableDriver):
-    """Drivers inherited from this Driver will bind :meth:`craft` by default """
+    """Drivers inherited from this Driver will bind :meth:`add` by default, one can bind :meth:`update` instead via
+    ``method: update`` to handle the ``UpdateRequest`` """
 
     def __init__(self, executor: str = None, method: str = 'add', *args, **kwargs):
         super().__init__(executor, method, *args, **kwargs)
 
 
+class BaseDeleteDriver(BaseExecutableDriver):
+    """Drivers inherited from this Driver will bind :meth:`delete` by default """
+
+    def __init__(self, executor: str = None, method: str = 'delete', *args, **kwargs):
+        super().__init__(executor, method, *args, **kwargs)
+
+
 class VectorIndexDriver(BaseIndexDriver):
     """Extract chunk-level embeddings and add it to the executor
 
+    The ``tags`` of the documents are added as the attributes of their chunk vectors, so that the search can be
+    filtered on them, see :class:`jina.drivers.search.VectorSearchDriver`.
     """
 
     def __call__(self, *args, **kwargs):
-        embed_vecs, chunk_pts, no_chunk_docs, bad_chunk_ids = extract_chunks(self.req.docs, embedding=True)
+        embed_vecs, chunk_pts, no_chunk_docs, bad_chunk_ids = extract_embeddings(self.req, self.buffers)
 
         if no_chunk_docs:
             self.pea.logger.warning('these docs contain no chunk: %s' % no_chunk_docs)
@@ -29,11 +41,16 @@ class VectorIndexDriver(BaseIndexDriver):
             self.pea.logger.warning('these bad chunks can not be added: %s' % bad_chunk_ids)
 
         if chunk_pts:
-            self.exec_fn(np.array([c.chunk_id for c in chunk_pts]), np.stack(embed_vecs))
+            keys = np.array([c.chunk_id for c in chunk_pts])
+            attributes = _get_attributes(self.req.docs, chunk_pts)
+            if attributes:
+                self.exec_fn(keys, embed_vecs, attributes=attributes)
+            else:
+                self.exec_fn(keys, embed_vecs)
 
 
 class KVIndexDriver(BaseIndexDriver):
-    """Serialize the documents/chunks in the request to key-value JSON pairs and write it using the executor
+    """Serialize the documents/chunks in the request to key-value binary protobuf pairs and write it using the executor
 
     Number of key-value pairs depends on the ``level``
 
@@ -57,20 +74,57 @@ class KVIndexDriver(BaseIndexDriver):
         self.level = level
 
     def __call__(self, *args, **kwargs):
-        from google.protobuf.json_format import MessageToJson
         if self.level == 'doc':
-            content = {f'd{d.doc_id}': MessageToJson(d) for d in self.req.docs}
+            content = {f'd{d.doc_id}': d.SerializeToString() for d in self.req.docs}
         elif self.level == 'chunk':
-            content = {f'c{c.chunk_id}': MessageToJson(c) for d in self.req.docs for c in d.chunks}
+            content = {f'c{c.chunk_id}': c.SerializeToString() for d in self.req.docs for c in d.chunks}
         elif self.level == 'all':
-            content = {f'c{c.chunk_id}': MessageToJson(c) for d in self.req.docs for c in d.chunks}
-            content.update({f'd{d.doc_id}': MessageToJson(d) for d in self.req.docs})
+            content = {f'c{c.chunk_id}': c.SerializeToString() for d in self.req.docs for c in d.chunks}
+            content.update({f'd{d.doc_id}': d.SerializeToString() for d in self.req.docs})
         else:
             raise TypeError(f'level={self.level} is not supported, must choose from "chunk" or "doc" ')
         if content:
             self.exec_fn(content)
 
 
+class VectorDeleteDriver(BaseDeleteDriver):
+    """Delete the vectors of all chunks in the request from the executor, the chunks are identified by ``chunk_id``
+    """
+
+    def __call__(self, *args, **kwargs):
+        keys = [c.chunk_id for d in self.req.docs for c in d.chunks]
+        if keys:
+            self.exec_fn(np.array(keys))
+
+
+class KVDeleteDriver(BaseDeleteDriver):
+    """Delete the documents/chunks in the request from the executor, the deleted keys depend on ``level`` in the same
+    way as :class:`KVIndexDriver`
+    """
+
+    def __init__(self, level: str, *args, **kwargs):
+        """
+
+        :param level: index level "chunk" or "doc", or "all"
+        :param args:
+        :param kwargs:
+        """
+        super().__init__(*args, **kwargs)
+        self.level = level
+
+    def __call__(self, *args, **kwargs):
+        if self.level == 'doc':
+            keys = [f'd{d.doc_id}' for d in self.req.docs]
+        elif self.level == 'chunk':
+            keys = [f'c{c.chunk_id}' for d in self.req.docs for c in d.chunks]
+        elif self.level == 'all':
+            keys = [f'c{c.chunk_id}' for d in self.req.docs for c in d.chunks] + [f'd{d.doc_id}' for d in self.req.docs]
+        else:
+            raise TypeError(f'level={self.level} is not supported, must choose from "chunk" or "doc" ')
+        if keys:
+            self.exec_fn(keys)
+
+
 class DocKVIndexDriver(KVIndexDriver):
     """A shortcut of :class:`MergeTopKDriver` with ``level=chunk``"""
 
@@ -82,3 +136,11 @@ class ChunkKVIndexDriver(KVIndexDriver):
 
     def __init__(self, level: str = 'chunk', *args, **kwargs):
         super().__init__(level, *args, **kwargs)
+
+
+def _get_attributes(docs, chunk_pts) -> Dict[str, List[Optional[str]]]:
+    """Get the tags of the parent document of each chunk, column by column, ``None`` when the tag is not set """
+    tags = {c.chunk_id: d.tags for d in docs if d.tags for c in d.chunks}
+    names = list(dict.fromkeys(k for t in tags.values() for k in t))
+    empty = {}
+    return {k: [tags.get(c.chunk_id, empty).get(k) for c in chunk_pts] for k in names}
@@ -30,6 +30,11 @@ class PruneDriver(BaseDriver):
         self.level = level
 
     def __call__(self, *args, **kwargs):
+        if self.level in {'chunk', 'all'} and 'embedding' in self.pruned and hasattr(self.req, 'embeddings'):
+            # the packed chunk-level embeddings
+            self.req.ClearField('embeddings')
+            self.req.ClearField('embedding_chunk_ids')
+
         if self.level == 'chunk':
             for d in self.req.docs:
                 for c in d.chunks:
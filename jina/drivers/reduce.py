@@ -1,6 +1,10 @@
 __copyright__ = "Copyright (c) 2020 Jina AI Limited. All rights reserved."
 __license__ = "Apache-2.0"
 
+import heapq
+import itertools
+from typing import List, Iterable
+
 from . import BaseDriver
 
 
@@ -20,9 +24,15 @@ class MergeTopKDriver(MergeDriver):
 
     Useful in indexer sharding (i.e. ``--replicas > 1``)
 
+    The topk results of each shard are already sorted, they are merged as sorted runs by a k-way heap merge, which
+    stops once ``top_k`` of the request is reached. The merged results are truncated to ``top_k``.
+
+    The chunk-level results are distances, they are merged in the ascending order of the score. The doc-level results
+    are scored by the rankers, where a higher score is better, they are merged in the descending order.
+
     Complexity depends on the level:
-         - ``level=chunk``: D x C x K x R
-         - ``level=doc``: D x K x R
+         - ``level=chunk``: D x C x K x log(R)
+         - ``level=doc``: D x K x log(R)
 
     where:
         - D is the number of queries
@@ -40,27 +50,30 @@ class MergeTopKDriver(MergeDriver):
         self.level = level
 
     def __call__(self, *args, **kwargs):
+        top_k = getattr(self.req, 'top_k', 0)
         if self.level == 'chunk':
             for _d_id, _doc in enumerate(self.req.docs):
                 for _c_id, _chunk in enumerate(_doc.chunks):
-                    _flat_topk = [k for r in self.prev_reqs for k in r.docs[_d_id].chunks[_c_id].topk_results]
+                    _merged = _merge_topk([r.docs[_d_id].chunks[_c_id].topk_results for r in self.prev_reqs], top_k)
                     _chunk.ClearField('topk_results')
-                    _chunk.topk_results.extend(sorted(_flat_topk, key=lambda x: x.score.value))
+                    _chunk.topk_results.extend(_merged)
         elif self.level == 'doc':
             for _d_id, _doc in enumerate(self.req.docs):
-                _flat_topk = [k for r in self.prev_reqs for k in r.docs[_d_id].topk_results]
+                _merged = _merge_topk([r.docs[_d_id].topk_results for r in self.prev_reqs], top_k,
+                                      descending=True)
                 _doc.ClearField('topk_results')
-                _doc.topk_results.extend(sorted(_flat_topk, key=lambda x: x.score.value))
+                _doc.topk_results.extend(_merged)
         elif self.level == 'all':
             for _d_id, _doc in enumerate(self.req.docs):
-                _flat_topk = [k for r in self.prev_reqs for k in r.docs[_d_id].topk_results]
+                _merged = _merge_topk([r.docs[_d_id].topk_results for r in self.prev_reqs], top_k,
+                                      descending=True)
                 _doc.ClearField('topk_results')
-                _doc.topk_results.extend(sorted(_flat_topk, key=lambda x: x.score.value))
+                _doc.topk_results.extend(_merged)
 
                 for _c_id, _chunk in enumerate(_doc.chunks):
-                    _flat_topk = [k for r in self.prev_reqs for k in r.docs[_d_id].chunks[_c_id].topk_results]
+                    _merged = _merge_topk([r.docs[_d_id].chunks[_c_id].topk_results for r in self.prev_reqs], top_k)
                     _chunk.ClearField('topk_results')
-                    _chunk.topk_results.extend(sorted(_flat_topk, key=lambda x: x.score.value))
+                    _chunk.topk_results.extend(_merged)
 
         else:
             raise TypeError(f'level={self.level} is not supported, must choose from "chunk" or "doc" ')
@@ -80,3 +93,29 @@ class DocMergeTopKDriver(MergeTopKDriver):
 
     def __init__(self, level: str = 'doc', *args, **kwargs):
         super().__init__(level, *args, **kwargs)
+
+
+def _merge_topk(runs: List[Iterable['jina_pb2.ScoredResult']], top_k: int = 0,
+                descending: bool = False) -> List['jina_pb2.ScoredResult']:
+    """Merge the topk results of multiple shards into one list sorted by the score
+
+    :param runs: the topk results from each shard
+    :param top_k: the number of merged results to keep, ``0`` keeps all
+    :param descending: sort in the descending order of the score, i.e. the higher score is the better
+    """
+    _runs = []
+    for r_id, run in enumerate(runs):
+        scores = [k.score.value for k in run]
+        order = range(len(scores))
+        if any((a < b) if descending else (a > b) for a, b in zip(scores, scores[1:])):
+            # not sorted, which is rare
+            order = sorted(order, key=scores.__getitem__, reverse=descending)
+            scores = [scores[j] for j in order]
+        # the merge works on (score, run, position), the protobuf objects are only gathered at the end
+        _runs.append(zip(scores, itertools.repeat(r_id), order))
+
+    # the ties keep the order of the runs
+    merged = heapq.merge(*_runs, key=lambda x: -x[0] if descending else x[0])
+    if top_k > 0:
+        merged = itertools.islice(merged, top_k)
+    return [runs[r_id][j] for _, r_id, j in merged]
@@ -5,7 +5,7 @@ __license__ = "Apache-2.0"
 import numpy as np
 
 from . import BaseExecutableDriver
-from .helper import pb_obj2dict
+from .helper import pb_obj2dict, pb_objs2columns
 
 
 class BaseScoreDriver(BaseExecutableDriver):
@@ -18,9 +18,25 @@ class BaseScoreDriver(BaseExecutableDriver):
 class Chunk2DocScoreDriver(BaseScoreDriver):
     """Extract chunk-level score and use the executor to compute the doc-level score
 
+    .. note::
+        By default the executor is called once per query doc. With ``batch=True``, the matches of all query docs in
+        the request are scored in one :func:`batch_score` call, and the chunk meta are extracted as numpy columns,
+        which avoids the Python loop over the query docs at large batch sizes.
     """
 
+    def __init__(self, batch: bool = False, *args, **kwargs):
+        """
+
+        :param batch: score all query docs in the request with one call of the executor
+        """
+        super().__init__(*args, **kwargs)
+        self.batch = batch
+
     def __call__(self, *args, **kwargs):
+        if self.batch:
+            self._score_batch()
+            return
+
         exec = self.exec
 
         for d in self.req.docs:  # d is a query in this context, i.e. for each query, compute separately
@@ -44,3 +60,30 @@ class Chunk2DocScoreDriver(BaseScoreDriver):
                 r.match_doc.doc_id = int(_d[0])
                 r.score.value = _d[1]
                 r.score.op_name = exec.__class__.__name__
+
+    def _score_batch(self):
+        exec = self.exec
+        match_idx = []
+        query_chunks = []
+        match_chunks = []
+        # the position of the query doc in the request is used as its id, as ``doc_id`` may not be unique here
+        for j, d in enumerate(self.req.docs):
+            for c in d.chunks:
+                query_chunks.append(c)
+                for k in c.topk_results:
+                    match_idx.append((j, k.match_chunk.doc_id, k.match_chunk.chunk_id, c.chunk_id, k.score.value))
+                    match_chunks.append(k.match_chunk)
+
+        if not match_idx:
+            return
+
+        doc_idx = exec.batch_score(np.array(match_idx, dtype=np.float64),
+                                   pb_objs2columns(query_chunks, exec.required_keys),
+                                   pb_objs2columns(match_chunks, exec.required_keys))
+
+        op_name = exec.__class__.__name__
+        for _q, _d, _s in doc_idx:
+            r = self.req.docs[int(_q)].topk_results.add()
+            r.match_doc.doc_id = int(_d)
+            r.score.value = _s
+            r.score.op_name = op_name
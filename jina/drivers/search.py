@@ -1,8 +1,14 @@
 __copyright__ = "Copyright (c) 2020 Jina AI Limited. All rights reserved."
 __license__ = "Apache-2.0"
 
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
 from . import BaseExecutableDriver
-from .helper import extract_chunks
+from .helper import extract_embeddings
+from ..helper import LRUCache
 from ..proto.jina_pb2 import ScoredResult
 
 
@@ -16,9 +22,9 @@ class BaseSearchDriver(BaseExecutableDriver):
 class KVSearchDriver(BaseSearchDriver):
     """Fill in the doc/chunk-level top-k results using the :class:`jina.executors.indexers.meta.BasePbIndexer`
 
-    .. warning::
-        This driver loops over all chunk/chunk's top-K results, each step fires a query.
-        This may not be very efficient, as the total number of queries depends on ``level``
+    All ids of the top-K results in the request are collected and deduplicated first, and then resolved
+    with a single call to the executor, i.e. :func:`jina.executors.indexers.BaseKVIndexer.query_batch`. The number of
+    looked-up keys depends on ``level``
 
              - ``level=chunk``: D x C x K
              - ``level=doc``: D x K
@@ -30,36 +36,43 @@ class KVSearchDriver(BaseSearchDriver):
             - K is the top-k
     """
 
-    def __init__(self, level: str, *args, **kwargs):
+    def __init__(self, level: str, method: str = 'query_batch', *args, **kwargs):
         """
 
         :param level: index level "chunk" or "doc", or "all"
+        :param method: the function name of the executor, which takes a list of keys and returns a list of values
         :param args:
         :param kwargs:
         """
-        super().__init__(*args, **kwargs)
+        super().__init__(*args, method=method, **kwargs)
         self.level = level
 
     def __call__(self, *args, **kwargs):
         if self.level == 'doc':
-            for d in self.req.docs:
-                self._update_topk_docs(d)
+            docs, chunks = self.req.docs, []
         elif self.level == 'chunk':
-            for d in self.req.docs:
-                for c in d.chunks:
-                    self._update_topk_chunks(c)
+            docs, chunks = [], [c for d in self.req.docs for c in d.chunks]
         elif self.level == 'all':
-            for d in self.req.docs:
-                self._update_topk_docs(d)
-                for c in d.chunks:
-                    self._update_topk_chunks(c)
+            docs, chunks = self.req.docs, [c for d in self.req.docs for c in d.chunks]
         else:
             raise TypeError(f'level={self.level} is not supported, must choose from "chunk" or "doc" ')
 
-    def _update_topk_docs(self, d):
+        # dict keeps the order and removes the duplicates
+        keys = list(dict.fromkeys([f'd{tk.match_doc.doc_id}' for d in docs for tk in d.topk_results] +
+                                  [f'c{tk.match_chunk.chunk_id}' for c in chunks for tk in c.topk_results]))
+        if not keys:
+            return
+
+        hits = dict(zip(keys, self.exec_fn(keys)))
+        for d in docs:
+            self._update_topk_docs(d, hits)
+        for c in chunks:
+            self._update_topk_chunks(c, hits)
+
+    def _update_topk_docs(self, d, hits):
         hit_sr = []  #: hited scored results, not some search may not ends with result. especially in shards
         for tk in d.topk_results:
-            r = self.exec_fn(f'd{tk.match_doc.doc_id}')
+            r = hits.get(f'd{tk.match_doc.doc_id}')
             if r:
                 sr = ScoredResult()
                 sr.score.CopyFrom(tk.score)
@@ -68,10 +81,10 @@ class KVSearchDriver(BaseSearchDriver):
         d.ClearField('topk_results')
         d.topk_results.extend(hit_sr)
 
-    def _update_topk_chunks(self, c):
+    def _update_topk_chunks(self, c, hits):
         hit_sr = []  #: hited scored results, not some search may not ends with result. especially in shards
         for tk in c.topk_results:
-            r = self.exec_fn(f'c{tk.match_chunk.chunk_id}')
+            r = hits.get(f'c{tk.match_chunk.chunk_id}')
             if r:
                 sr = ScoredResult()
                 sr.score.CopyFrom(tk.score)
@@ -98,10 +111,53 @@ class ChunkKVSearchDriver(KVSearchDriver):
 class VectorSearchDriver(BaseSearchDriver):
     """Extract chunk-level embeddings from the request and use the executor to query it
 
+    When the request has a ``filter``, only the chunks of the documents whose ``tags`` match all of it are searched.
+    The filter is evaluated by the executor as a mask in the top-k search, so no extra results have to be fetched.
+
+    With ``cache_size > 0``, the top-k of each query chunk is cached, keyed by its embedding quantized to ``float16``,
+    ``top_k`` and the filter. A repeated query chunk skips the executor. The cache is cleared whenever the
+    ``generation`` of the executor changes, i.e. vectors are added, updated, deleted or compacted, also by the other
+    indexers sharing the index files. Its hits and misses are reported in the stats of the pea.
     """
 
+    def __init__(self, cache_size: int = 0, cache_memory_limit: int = 64 * 1024 * 1024, cache_ttl: float = 0,
+                 *args, **kwargs):
+        """
+
+        :param cache_size: the max number of cached query chunks, ``0`` disables the cache
+        :param cache_memory_limit: the max total size of the cached results in bytes
+        :param cache_ttl: the time-to-live of a cached result in seconds, ``0`` for no expiry
+        :param args:
+        :param kwargs:
+        """
+        super().__init__(*args, **kwargs)
+        self.cache_size = cache_size
+        self.cache_memory_limit = cache_memory_limit
+        self.cache_ttl = cache_ttl
+        self._cache = None
+        self._cached_generation = None
+
+    @property
+    def cache(self) -> Optional['LRUCache']:
+        """The cache of the query results, created on the first use, ``None`` when it is disabled """
+        if self._cache is None and self.cache_size > 0:
+            self._cache = LRUCache(self.cache_size, self.cache_memory_limit, self.cache_ttl)
+        return self._cache
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        if self._cache is None:
+            return {}
+        return {f'cache_{k}': v for k, v in self._cache.stats.items()}
+
+    def __getstate__(self):
+        d = super().__getstate__()
+        d['_cache'] = None
+        d['_cached_generation'] = None
+        return d
+
     def __call__(self, *args, **kwargs):
-        embed_vecs, chunk_pts, no_chunk_docs, bad_chunk_ids = extract_chunks(self.req.docs, embedding=True)
+        embed_vecs, chunk_pts, no_chunk_docs, bad_chunk_ids = extract_embeddings(self.req, self.buffers)
 
         if no_chunk_docs:
             self.logger.warning('these docs contain no chunk: %s' % no_chunk_docs)
@@ -109,11 +165,43 @@ class VectorSearchDriver(BaseSearchDriver):
         if bad_chunk_ids:
             self.logger.warning('these bad chunks can not be added: %s' % bad_chunk_ids)
 
-        idx, dist = self.exec_fn(embed_vecs, top_k=self.req.top_k)
+        kwargs = {'filter': dict(self.req.filter)} if self.req.filter else {}
+        if self.cache is not None and chunk_pts:
+            idx, dist = self._query_with_cache(embed_vecs, self.req.top_k, kwargs)
+        else:
+            idx, dist = self.exec_fn(embed_vecs, top_k=self.req.top_k, **kwargs)
         op_name = self.exec.__class__.__name__
         for c, topks, scs in zip(chunk_pts, idx, dist):
             for m, s in zip(topks, scs):
+                if np.isinf(s):
+                    # the padding of a query with less than top-k results
+                    continue
                 r = c.topk_results.add()
                 r.match_chunk.chunk_id = m
                 r.score.value = s
                 r.score.op_name = op_name
+
+    def _query_with_cache(self, embed_vecs: 'np.ndarray', top_k: int,
+                          kwargs: Dict) -> Tuple[List['np.ndarray'], List['np.ndarray']]:
+        """Look up the top-k of each query chunk in the cache, and only query the executor with the missed ones """
+        generation = self.exec.generation
+        if generation != self._cached_generation:
+            self.cache.clear()
+            self._cached_generation = generation
+
+        prefix = repr((embed_vecs.shape[1], top_k, sorted(kwargs.get('filter', {}).items()))).encode()
+        keys = [hashlib.md5(prefix + row.tobytes()).digest() for row in embed_vecs.astype(np.float16)]
+        results = [self.cache.get(k) for k in keys]
+        # the duplicated chunks in the same request are queried once
+        missed = {}
+        for j, (k, r) in enumerate(zip(keys, results)):
+            if r is None and k not in missed:
+                missed[k] = j
+        if missed:
+            idx, dist = self.exec_fn(embed_vecs[list(missed.values())], top_k=top_k, **kwargs)
+            new_results = {}
+            for k, _idx, _dist in zip(missed, idx, dist):
+                new_results[k] = (np.array(_idx), np.array(_dist))
+                self.cache.put(k, new_results[k])
+            results = [new_results[k] if r is None else r for k, r in zip(keys, results)]
+        return [r[0] for r in results], [r[1] for r in results]
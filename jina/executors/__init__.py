@@ -57,7 +57,7 @@ class ExecutorType(type):
     @staticmethod
     def register_class(cls):
         prof_funcs = ['train', 'encode', 'add', 'query', 'craft', 'score']
-        update_funcs = ['train', 'add']
+        update_funcs = ['train', 'add', 'update', 'delete', 'compact']
         train_funcs = ['train']
 
         def wrap_func(func_lst, wrapper):
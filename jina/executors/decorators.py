@@ -20,7 +20,7 @@ def as_update_method(func: Callable):
     @wraps(func)
     def arg_wrapper(self, *args, **kwargs):
         f = func(self, *args, **kwargs)
-        self.is_updated = True
+        self.touch()
         return f
 
     return arg_wrapper
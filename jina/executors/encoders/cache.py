@@ -0,0 +1,195 @@
+__copyright__ = "Copyright (c) 2020 Jina AI Limited. All rights reserved."
+__license__ = "Apache-2.0"
+
+import fcntl
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from ...helper import LRUCache
+
+DIGEST_SIZE = 20  #: the size of a content hash in bytes
+
+
+class EmbeddingCache:
+    """A content-addressed cache of the embeddings, used to skip encoding the contents seen before.
+
+    Each content is keyed by the SHA-1 hash of its bytes. The embeddings are kept in an in-memory LRU tier, and
+    optionally in an on-disk tier, which is persisted across restarts. With the on-disk tier, the embeddings are
+    appended to ``path`` and memory-mapped for the lookups, their content hashes are appended to ``path.keys``, and the
+    dtype and shape of the embeddings are kept in ``path.json``.
+
+    The on-disk tier can be shared by several processes, e.g. the workers of ``--num-workers`` or the replicas sharing
+    a workspace. The appends are serialized by an ``fcntl`` lock on ``path.lock``, the row of a new embedding is taken
+    from the length of the files under the lock, and the content hashes appended by the other processes are loaded
+    when a content is missed.
+
+    .. note::
+        The cache does not know the model. The on-disk tier must be removed when the model of the encoder changes.
+        The on-disk tier is never evicted.
+    """
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 0, path: str = None):
+        """
+        :param max_entries: the max number of embeddings in the in-memory tier
+        :param max_bytes: the max total size of the embeddings in the in-memory tier in bytes, ``0`` for no limit
+        :param path: the file path of the on-disk tier, ``None`` to disable it
+        """
+        self.memory = LRUCache(max_entries, max_bytes)
+        self.path = path
+        self.disk_hits = 0
+        self._disk_rows = {}  # type: Dict[bytes, int]
+        self._num_disk_rows = 0  #: the number of the rows loaded from ``path.keys``
+        self._disk_vecs = None  # type: Optional[np.ndarray]
+        self._meta = None  # type: Optional[Dict[str, Any]]
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """The counters of the cache, a hit in the on-disk tier is also a miss in the in-memory tier """
+        s = self.memory.stats
+        s['hits'] += self.disk_hits
+        s['misses'] -= self.disk_hits
+        if self.path:
+            s['disk_hits'] = self.disk_hits
+            s['disk_entries'] = len(self._disk_rows)
+        return s
+
+    def encode(self, data: 'np.ndarray', encode_fn: Callable[['np.ndarray'], 'np.ndarray']) -> 'np.ndarray':
+        """Get the embeddings of the contents, only the contents not in the cache are sent to ``encode_fn``
+
+        :param data: the contents in a `B x ...` ndarray
+        :param encode_fn: the function encoding the contents in a `B' x ...` ndarray into a `B' x D` ndarray
+        :return: the `B x D` embeddings in the same order of ``data``
+        """
+        keys = [_get_content_hash(d) for d in data]
+        results = [self.memory.get(k) for k in keys]
+        if self.path and any(r is None for r in results):
+            results = self._get_disk(keys, results)
+        # the duplicated contents in the same batch are encoded once
+        missed = {}
+        for j, (k, r) in enumerate(zip(keys, results)):
+            if r is None and k not in missed:
+                missed[k] = j
+        if missed:
+            embeds = encode_fn(data[list(missed.values())])
+            if embeds is None or len(embeds) != len(missed):
+                raise ValueError(f'{len(missed)} contents are encoded into '
+                                 f'{"nothing" if embeds is None else len(embeds)} embeddings')
+            embeds = np.asarray(embeds)
+            new_results = dict(zip(missed, embeds))
+            for k, emb in new_results.items():
+                # a copy does not hold the whole batch in the memory
+                self.memory.put(k, emb.copy())
+            self._put_disk(list(missed), embeds)
+            results = [new_results[k] if r is None else r for k, r in zip(keys, results)]
+        return np.stack(results)
+
+    def _get_disk(self, keys: List[bytes], results: List[Optional['np.ndarray']]) -> List[Optional['np.ndarray']]:
+        """Look up the contents missed in the in-memory tier in the on-disk tier """
+        with self._lock:
+            if any(r is None and k not in self._disk_rows for k, r in zip(keys, results)):
+                # the embeddings may be appended by the other processes
+                with self._file_lock(fcntl.LOCK_SH):
+                    self._load_disk()
+            results = list(results)
+            for j, (k, r) in enumerate(zip(keys, results)):
+                row = self._disk_rows.get(k) if r is None else None
+                if row is not None:
+                    results[j] = np.array(self._get_disk_vecs()[row])
+                    self.memory.put(k, results[j])
+                    self.disk_hits += 1
+        return results
+
+    def _put_disk(self, keys: List[bytes], embeds: 'np.ndarray'):
+        """Append the new embeddings to the on-disk tier """
+        if not self.path:
+            return
+        meta = {'dtype': embeds.dtype.str, 'shape': list(embeds.shape[1:])}
+        with self._lock, self._file_lock(fcntl.LOCK_EX):
+            self._load_disk()
+            if self._meta is None:
+                with open(self.path + '.json', 'w') as fp:
+                    json.dump(meta, fp)
+                self._meta = meta
+            elif self._meta != meta:
+                # e.g. the model has changed, the embeddings can not be appended
+                return
+            # drop the embeddings written partially, so that the new ones are appended to the right rows
+            for f, row_size in ((self.path, self._get_row_size()), (self.path + '.keys', DIGEST_SIZE)):
+                if _get_file_size(f) > self._num_disk_rows * row_size:
+                    os.truncate(f, self._num_disk_rows * row_size)
+            # the contents may be appended by the other processes in the meantime
+            new_rows = [j for j, k in enumerate(keys) if k not in self._disk_rows]
+            if not new_rows:
+                return
+            # the embeddings are written before their keys, so a loaded key always has its embedding
+            with open(self.path, 'ab') as fp:
+                fp.write(np.ascontiguousarray(embeds[new_rows]).tobytes())
+            with open(self.path + '.keys', 'ab') as fp:
+                fp.write(b''.join(keys[j] for j in new_rows))
+            for j in new_rows:
+                self._disk_rows[keys[j]] = self._num_disk_rows
+                self._num_disk_rows += 1
+            self._disk_vecs = None
+
+    def _load_disk(self):
+        """Load the content hashes appended to ``path.keys`` since the last load, it must be called under the file
+        lock """
+        if self._meta is None:
+            if not os.path.exists(self.path + '.json'):
+                return
+            with open(self.path + '.json') as fp:
+                self._meta = json.load(fp)
+        num_rows = min(_get_file_size(self.path + '.keys') // DIGEST_SIZE,
+                       _get_file_size(self.path) // self._get_row_size())
+        if num_rows > self._num_disk_rows:
+            with open(self.path + '.keys', 'rb') as fp:
+                fp.seek(self._num_disk_rows * DIGEST_SIZE)
+                raw = fp.read((num_rows - self._num_disk_rows) * DIGEST_SIZE)
+            for j in range(len(raw) // DIGEST_SIZE):
+                self._disk_rows.setdefault(raw[j * DIGEST_SIZE:(j + 1) * DIGEST_SIZE], self._num_disk_rows + j)
+            self._num_disk_rows = num_rows
+            self._disk_vecs = None
+
+    @contextmanager
+    def _file_lock(self, operation: int):
+        with open(self.path + '.lock', 'a') as fp:
+            fcntl.flock(fp, operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(fp, fcntl.LOCK_UN)
+
+    def _get_disk_vecs(self) -> 'np.ndarray':
+        if self._disk_vecs is None:
+            self._disk_vecs = np.memmap(self.path, dtype=self._meta['dtype'], mode='r',
+                                        shape=(self._num_disk_rows, *self._meta['shape']))
+        return self._disk_vecs
+
+    def _get_row_size(self) -> int:
+        return int(np.dtype(self._meta['dtype']).itemsize * np.prod(self._meta['shape'], dtype=np.int64))
+
+
+def _get_file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return 0
+
+
+def _get_content_hash(content: Any) -> bytes:
+    """Get the hash of a text, bytes or ndarray content, independent from the padding of the batch """
+    if isinstance(content, str):
+        b = content.encode()
+    elif isinstance(content, bytes):
+        b = content
+    else:
+        content = np.ascontiguousarray(content)
+        b = f'{content.dtype.str}{content.shape}'.encode() + content.tobytes()
+    return hashlib.sha1(b).digest()
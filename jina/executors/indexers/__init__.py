@@ -2,7 +2,7 @@ __copyright__ = "Copyright (c) 2020 Jina AI Limited. All rights reserved."
 __license__ = "Apache-2.0"
 
 import os
-from typing import Tuple
+from typing import Tuple, List, Any
 
 import numpy as np
 
@@ -54,10 +54,26 @@ class BaseIndexer(BaseExecutor):
         """
         pass
 
+    def update(self, keys: 'np.ndarray', vectors: 'np.ndarray', *args, **kwargs):
+        """Replace the vector representations of the existing chunks
+
+        :param keys: ``chunk_id`` in 1D-ndarray, shape B x 1
+        :param vectors: vector representations in B x D
+        """
+        raise NotImplementedError
+
+    def delete(self, keys: 'np.ndarray', *args, **kwargs):
+        """Delete the chunks and their vector representations
+
+        :param keys: ``chunk_id`` in 1D-ndarray, shape B x 1
+        """
+        raise NotImplementedError
+
     def post_init(self):
         """query handler and write handler can not be serialized, thus they must be put into :func:`post_init`. """
         self._query_handler = None
         self._write_handler = None
+        self._generation = 0
 
     def query(self, vectors: 'np.ndarray', top_k: int, *args, **kwargs) -> Tuple['np.ndarray', 'np.ndarray']:
         """Find k-NN using query vectors, return chunk ids and chunk scores
@@ -120,6 +136,20 @@ class BaseIndexer(BaseExecutor):
         """The number of vectors/chunks indexed """
         return self._size
 
+    @property
+    def generation(self) -> int:
+        """A counter of the changes to the indexed data, it changes on every :func:`add`, :func:`update`,
+        :func:`delete` and :func:`compact`. Useful to invalidate the cached query results.
+
+        .. note::
+            The counter is not persisted, it only tells whether the data is changed since it is read last time.
+        """
+        return self._generation
+
+    def touch(self):
+        super().touch()
+        self._generation += 1
+
     def __getstate__(self):
         d = super().__getstate__()
         self.flush()
@@ -154,6 +184,18 @@ class BaseKVIndexer(BaseIndexer):
     It can be used to tell whether an indexer is key-value indexer, via ``isinstance(a, BaseKVIndexer)``
     """
 
+    def query_batch(self, keys: List[str], *args, **kwargs) -> List[Any]:
+        """Find the values of multiple keys in one call
+
+        :param keys: a list of keys
+        :return: a list of values in the same order of ``keys``, ``None`` for the keys that can not be found
+
+        .. note::
+            The default implementation calls :func:`query` for every key. Indexers that can look up multiple keys
+            natively should override it.
+        """
+        return [self.query(k, *args, **kwargs) for k in keys]
+
 
 class ChunkIndexer(CompoundExecutor):
     """A Frequently used pattern for combining A :class:`BaseVectorIndexer` and :class:`BaseKVIndexer`.
@@ -163,6 +205,8 @@ class ChunkIndexer(CompoundExecutor):
             - 1. stores the vector via :class:`BaseVectorIndexer`
             - 2. remove all vector information (embedding, raw_bytes, blob, text)
             - 3. store the remained meta information via :class:`BaseKVIndexer`
+        -  In the update time, same as the index time, but the existing vectors and meta information are replaced
+        -  In the delete time, delete the vector and the meta information of the chunks
         - In the query time
             - 1. Find the knn using the vector via :class:`BaseVectorIndexer`
             - 2. remove all vector information (embedding, raw_bytes, blob, text)
@@ -231,6 +275,17 @@ class ChunkIndexer(CompoundExecutor):
                 executor: BaseKVIndexer
           ControlRequest:
             - !ControlReqDriver {}
+          UpdateRequest:
+            # same as IndexRequest, with "method: update" in VectorIndexDriver and KVIndexDriver
+            ...
+          DeleteRequest:
+            - !VectorDeleteDriver
+              with:
+                executor: BaseVectorIndexer
+            - !KVDeleteDriver
+              with:
+                level: chunk
+                executor: BaseKVIndexer
     """
 
     pass
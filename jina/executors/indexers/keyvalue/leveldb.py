@@ -2,21 +2,29 @@ __copyright__ = "Copyright (c) 2020 Jina AI Limited. All rights reserved."
 __license__ = "Apache-2.0"
 
 import json
-from typing import Union
+from typing import Union, List, Optional
 
-from google.protobuf.json_format import Parse
-from jina.executors.indexers.keyvalue.proto import BasePbIndexer
+from jina.executors.indexers.keyvalue.proto import BasePbIndexer, parse_pb, pb2bytes
 from jina.executors.indexers.keyvalue.proto import jina_pb2
 
+FORMAT_KEY = b'__jina_format__'  #: the key marking the value format of the database
+FORMAT_PB = b'pb'  #: values are binary serialized protobuf
+
 
 class LeveldbIndexer(BasePbIndexer):
     """
     :class:`LeveldbIndexer` use `LevelDB` to save and query protobuf chunk/document.
+
+    .. note::
+        Values are stored as binary serialized protobuf. Databases built by the older versions store JSON values,
+        they are still readable and can be converted once via :func:`convert_from_json`, which is also done
+        automatically before adding to such a database.
     """
 
     def post_init(self):
         super().post_init()
         self._db_handler = None
+        self._is_legacy = None
 
     @property
     def db_handler(self):
@@ -25,6 +33,23 @@ class LeveldbIndexer(BasePbIndexer):
             self._db_handler = plyvel.DB(self.index_abspath, create_if_missing=True)
         return self._db_handler
 
+    @property
+    def is_legacy_file(self) -> bool:
+        """Return ``True`` when the database is not empty and stores JSON values """
+        if self._is_legacy is None:
+            db = self.db_handler
+            if db.get(FORMAT_KEY) == FORMAT_PB:
+                self._is_legacy = False
+            elif next(db.iterator(include_value=False), None) is None:
+                # an empty database, mark it as binary from now on
+                db.put(FORMAT_KEY, FORMAT_PB)
+                self._is_legacy = False
+            else:
+                self._is_legacy = True
+                self.logger.warning(f'{self.index_abspath} is in the legacy JSON format, '
+                                    f'call "convert_from_json()" to convert it to the faster binary format')
+        return self._is_legacy
+
     def get_add_handler(self):
         """Get the database handler
 
@@ -38,15 +63,43 @@ class LeveldbIndexer(BasePbIndexer):
         return self.db_handler
 
     def add(self, objs):
-        """Add a JSON-friendly object to the indexer
+        """Add protobuf chunks/docs to the indexer
 
-        :param objs: objects can be serialized into JSON format
+        :param objs: a dict, where the key is ``chunk_id`` or ``doc_id`` prefixed by ``c`` or ``d``, the value is the
+            serialized protobuf. JSON strings (``MessageToJson``) and protobuf objects are also accepted.
         """
+        if self.is_legacy_file:
+            # the binary values can not be mixed with the JSON values
+            self.logger.warning(f'{self.index_abspath} is in the legacy JSON format, converting it before adding')
+            self.convert_from_json()
         with self.write_handler.write_batch() as h:
             for k, obj in objs.items():
-                key = k.encode('utf8')
-                value = json.dumps(obj).encode('utf8')
-                h.put(key, value)
+                h.put(k.encode('utf8'), pb2bytes(k, obj))
+
+    def update(self, objs):
+        """Replace protobuf chunks/docs in the indexer, the keys that do not exist are added
+
+        :param objs: a dict, where the key is ``chunk_id`` or ``doc_id`` prefixed by ``c`` or ``d``, the value is the
+            serialized protobuf, same as :func:`add`
+        """
+        self.add(objs)
+
+    def delete(self, keys: List[str], *args, **kwargs):
+        """Delete protobuf chunks/docs from the indexer, the keys that do not exist are ignored
+
+        :param keys: a list of ``chunk_id`` or ``doc_id`` prefixed by ``c`` or ``d``
+        """
+        with self.write_handler.write_batch() as h:
+            for k in keys:
+                h.delete(k.encode('utf8'))
+
+    def compact(self) -> int:
+        """Compact the whole database, LevelDB reclaims the space of the deleted records in its own compaction
+
+        :return: always ``0``, as the number of removed records is not tracked by LevelDB
+        """
+        self.db_handler.compact_range()
+        return 0
 
     def get_query_handler(self):
         """Get the database handler
@@ -60,12 +113,44 @@ class LeveldbIndexer(BasePbIndexer):
         :param key: ``chunk_id`` or ``doc_id``
         :return: protobuf chunk or protobuf document
         """
-        v = self.query_handler.get(key.encode('utf8'))
-        value = None
+        return self._parse(key, self.query_handler.get(key.encode('utf8')))
+
+    def query_batch(self, keys: List[str], *args, **kwargs) -> List[Optional[Union['jina_pb2.Chunk', 'jina_pb2.Document']]]:
+        """Find the protobuf chunks/docs of multiple ids in one call, all keys are read from the same snapshot
+
+        :param keys: a list of ``chunk_id`` or ``doc_id``
+        :return: a list of protobuf chunk or protobuf document, ``None`` for the ids that can not be found
+        """
+        sn = self.query_handler.snapshot()
+        try:
+            return [self._parse(k, sn.get(k.encode('utf8'))) for k in keys]
+        finally:
+            sn.close()
+
+    def convert_from_json(self) -> int:
+        """Convert the JSON values in the database to the binary format in place
+
+        :return: the number of converted records
+        """
+        if not self.is_legacy_file:
+            self.logger.info(f'{self.index_abspath} is not in the legacy JSON format, nothing to convert')
+            return 0
+
+        num_records = 0
+        db = self.db_handler
+        with db.snapshot() as sn, db.write_batch() as h:
+            for key, value in sn.iterator():
+                k = key.decode('utf8')
+                h.put(key, pb2bytes(k, json.loads(value.decode('utf8'))))
+                num_records += 1
+            h.put(FORMAT_KEY, FORMAT_PB)
+        self._is_legacy = False
+        self.logger.success(f'converted {num_records} records in {self.index_abspath} to the binary format')
+        return num_records
+
+    def _parse(self, key: str, v: Optional[bytes]) -> Optional[Union['jina_pb2.Chunk', 'jina_pb2.Document']]:
         if v is not None:
-            _parser = jina_pb2.Chunk if key[0] == 'c' else jina_pb2.Document
-            value = Parse(json.loads(v.decode('utf8')), _parser())
-        return value
+            return parse_pb(key, json.loads(v.decode('utf8')) if self.is_legacy_file else v)
 
     def close(self):
         """Close the database handler
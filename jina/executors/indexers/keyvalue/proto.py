@@ -2,53 +2,203 @@ __copyright__ = "Copyright (c) 2020 Jina AI Limited. All rights reserved."
 __license__ = "Apache-2.0"
 
 import gzip
+import io
 import json
-from typing import Union
+import mmap
+import os
+import struct
+from collections import OrderedDict
+from typing import Union, List, Optional, Dict, Iterator, Tuple, Mapping
 
+import numpy as np
 from google.protobuf.json_format import Parse
 from jina.executors.indexers import BaseKVIndexer
+from jina.helper import call_obj_fn
 from jina.proto import jina_pb2
 
+HEADER_MAGIC = b'JINAPB01'  #: the leading bytes of a binary protobuf index file
+RECORD_HEADER = struct.Struct('<HI')  #: the length of the key and the length of the serialized protobuf
+OFFSET_KEY_HEADER = struct.Struct('<H')  #: the length of the key
+OFFSET_VALUE = struct.Struct('<QI')  #: the offset and the length of the serialized protobuf in the index file
+TOMBSTONE = 0xFFFFFFFF  #: the value length of a deleted record in the index file, no value follows
+SORTED_OFFSET_MAGIC = b'JINAOFS1'  #: the leading bytes of a sorted offset index file
+#: magic, the width of the keys, the number of keys, the size of the offset index covered by the sorted one
+SORTED_OFFSET_HEADER = struct.Struct('<8sIQQ')
+SORTED_OFFSET_HEADER_SIZE = 32  #: the header is padded to 32 bytes so that the keys start on an 8-byte boundary
+
 
 class BasePbIndexer(BaseKVIndexer):
-    """Storing and querying protobuf chunk/document using gzip and Python dict. """
+    """Storing and querying protobuf chunk/document using a binary record file and a sorted offset index.
+
+    Each record in the index file is ``key_length, value_length, key, value``, where ``value`` is the protobuf
+    serialized by ``SerializeToString``. The ``offset`` and ``length`` of each value are written to an offset index,
+    i.e. ``index_filename.offset``, at the same time.
+
+    In the query time, the latest offset of each key is looked up in a sorted copy of the offset index, i.e.
+    ``index_filename.offset.sorted``, which is memory-mapped, so that loading it does not depend on the number of
+    records. Only the entries appended to the offset index after it was written are parsed, and it is rewritten once
+    they are more than ``sorted_offset_rebuild_ratio`` of its keys, see :class:`SortedOffsets`. The index file is
+    memory-mapped as well and a record is parsed when it is asked by :func:`query`, the parsed records are kept in a
+    LRU cache of ``cache_size``.
+
+    The index file is append-only. :func:`update` appends the new records, which shadow the old ones of the same keys.
+    :func:`delete` appends a tombstone record for each key, i.e. a record with a value length of ``TOMBSTONE`` and no
+    value. The space of the shadowed and deleted records is reclaimed by :func:`compact`.
+
+    .. note::
+        Index files built by the older versions (gzip-compressed JSON lines) are still readable and appendable,
+        and can be converted to the binary format once via :func:`convert_from_json`. They are fully loaded into
+        memory in the query time.
+    """
 
     compress_level = 1  #: The compresslevel argument is an integer from 0 to 9 controlling the level of compression
+    sorted_offset_rebuild_ratio = 0.1  #: rewrite the sorted offset index when the new entries exceed this ratio
+
+    def __init__(self, cache_size: int = 10000, *args, **kwargs):
+        """
+        :param cache_size: the maximum number of parsed protobuf kept in memory in the query time,
+            ``0`` disables the cache
+        """
+        super().__init__(*args, **kwargs)
+        self.cache_size = cache_size
+
+    @property
+    def offset_abspath(self) -> str:
+        """Get the file path of the offset index """
+        return self.index_abspath + '.offset'
+
+    @property
+    def sorted_offset_abspath(self) -> str:
+        """Get the file path of the sorted offset index """
+        return self.offset_abspath + '.sorted'
+
+    @property
+    def is_legacy_file(self) -> bool:
+        """Return ``True`` when the index file exists and is in the gzip-compressed JSON format """
+        if not os.path.exists(self.index_abspath):
+            return False
+        with open(self.index_abspath, 'rb') as fp:
+            return fp.read(2) == b'\x1f\x8b'
 
     def get_query_handler(self):
-        r = {}
-        with gzip.open(self.index_abspath, 'rt') as fp:
-            for l in fp:
-                if l:
-                    tmp = json.loads(l)
-                    for k, v in tmp.items():
-                        _parser = jina_pb2.Chunk if k[0] == 'c' else jina_pb2.Document
-                        r[k] = Parse(v, _parser())
-        return r
+        if self.is_legacy_file:
+            self.logger.warning(f'{self.index_abspath} is in the legacy JSON format, '
+                                f'call "convert_from_json()" to convert it to the faster binary format')
+            return {k: parse_pb(k, v) for k, v in self._iter_json_records()}
+
+        return LazyPbReader(self.index_abspath, self._load_sorted_offsets(), self.cache_size)
 
     def get_add_handler(self):
-        """Append to the existing gzip file using text appending mode """
+        """Append to the existing index file, the format follows the one of the existing file """
 
         # note this write mode must be append, otherwise the index will be overwrite in the search time
-        return gzip.open(self.index_abspath, 'at', compresslevel=self.compress_level)
+        if self.is_legacy_file:
+            self.logger.warning(f'{self.index_abspath} is in the legacy JSON format, new records are appended in '
+                                f'the same format, call "convert_from_json()" to convert it to the binary format')
+            return gzip.open(self.index_abspath, 'at', compresslevel=self.compress_level)
+        return open(self.index_abspath, 'ab')
 
     def get_create_handler(self):
-        """Create a new gzip file
+        """Create a new binary file with the header written
+
+        :return: a binary file stream
+        """
+        for path in (self.offset_abspath, self.sorted_offset_abspath):
+            if os.path.exists(path):
+                os.remove(path)
+        fp = open(self.index_abspath, 'wb')
+        fp.write(HEADER_MAGIC)
+        return fp
+
+    def add(self, objs: Dict[str, Union[bytes, str, 'jina_pb2.Chunk', 'jina_pb2.Document']]):
+        """Add protobuf chunks/docs to the indexer
+
+        :param objs: a dict, where the key is ``chunk_id`` or ``doc_id`` prefixed by ``c`` or ``d``, the value is the
+            serialized protobuf. JSON strings (``MessageToJson``) and protobuf objects are also accepted.
+        """
+        if isinstance(self.write_handler, io.TextIOBase):
+            json.dump({k: pb2json(k, v) for k, v in objs.items()}, self.write_handler)
+            self.write_handler.write('\n')
+        else:
+            offsets = []
+            for k, v in objs.items():
+                key, value = k.encode('utf8'), pb2bytes(k, v)
+                offset = self.write_handler.tell() + RECORD_HEADER.size + len(key)
+                self.write_handler.write(RECORD_HEADER.pack(len(key), len(value)) + key + value)
+                offsets.append(OFFSET_KEY_HEADER.pack(len(key)) + key + OFFSET_VALUE.pack(offset, len(value)))
+            with open(self.offset_abspath, 'ab') as fp:
+                fp.write(b''.join(offsets))
+        self.flush()
 
-        :return: a gzip file stream
+    def update(self, objs: Dict[str, Union[bytes, str, 'jina_pb2.Chunk', 'jina_pb2.Document']]):
+        """Replace protobuf chunks/docs in the indexer, the keys that do not exist are added
+
+        :param objs: a dict, where the key is ``chunk_id`` or ``doc_id`` prefixed by ``c`` or ``d``, the value is the
+            serialized protobuf, same as :func:`add`
         """
-        return gzip.open(self.index_abspath, 'wt', compresslevel=self.compress_level)
+        self.add(objs)
+        self._reset_query_handler()
 
-    def add(self, obj):
-        """Add a JSON-friendly object to the indexer
+    def delete(self, keys: List[str], *args, **kwargs):
+        """Delete protobuf chunks/docs from the indexer, the keys that do not exist are ignored
 
-        :param obj: an object can be jsonified
+        :param keys: a list of ``chunk_id`` or ``doc_id`` prefixed by ``c`` or ``d``
         """
-        json.dump(obj, self.write_handler)
-        self.write_handler.write('\n')
+        if isinstance(self.write_handler, io.TextIOBase):
+            self.logger.warning(f'{self.index_abspath} is in the legacy JSON format, '
+                                f'call "convert_from_json()" before deleting data')
+            return
+        records, offsets = [], []
+        for k in keys:
+            key = k.encode('utf8')
+            records.append(RECORD_HEADER.pack(len(key), TOMBSTONE) + key)
+            # the zero offset marks a deleted record, as no record starts before the header ends
+            offsets.append(OFFSET_KEY_HEADER.pack(len(key)) + key + OFFSET_VALUE.pack(0, 0))
+        self.write_handler.write(b''.join(records))
+        with open(self.offset_abspath, 'ab') as fp:
+            fp.write(b''.join(offsets))
         self.flush()
+        self._reset_query_handler()
+
+    def compact(self) -> int:
+        """Rewrite the index file with the latest record of each key only, so that the space of the updated and
+        deleted records is reclaimed
+
+        :return: the number of removed records
+        """
+        if not os.path.exists(self.index_abspath) or self.is_legacy_file:
+            self.logger.info(f'{self.index_abspath} is missing or in the legacy JSON format, nothing to compact')
+            return 0
+
+        self.close()
+        offsets = self._load_offsets()
+        num_entries = sum(1 for _ in self._iter_offsets())
+        tmp_path = self.index_abspath + '.tmp'
+        new_offsets = []
+        with open(self.index_abspath, 'rb') as fi, open(tmp_path, 'wb') as fo:
+            fo.write(HEADER_MAGIC)
+            for k, (offset, length) in offsets.items():
+                key = k.encode('utf8')
+                fi.seek(offset)
+                new_offsets.append(OFFSET_KEY_HEADER.pack(len(key)) + key +
+                                   OFFSET_VALUE.pack(fo.tell() + RECORD_HEADER.size + len(key), length))
+                fo.write(RECORD_HEADER.pack(len(key), length) + key + fi.read(length))
+        with open(self.offset_abspath + '.tmp', 'wb') as fp:
+            fp.write(b''.join(new_offsets))
+        os.replace(tmp_path, self.index_abspath)
+        os.replace(self.offset_abspath + '.tmp', self.offset_abspath)
+        self._remove_sorted_offsets()
+        self.post_init()
+        num_removed = num_entries - len(offsets)
+        self.logger.success(f'removed {num_removed} updated or deleted records from {self.index_abspath}')
+        return num_removed
+
+    def _reset_query_handler(self):
+        """Reload the query handler in the next query, so that the updated and deleted records are visible """
+        call_obj_fn(self._query_handler, 'close')
+        self._query_handler = None
 
-    def query(self, key: int) -> Union['jina_pb2.Chunk', 'jina_pb2.Document']:
+    def query(self, key: str, *args, **kwargs) -> Optional[Union['jina_pb2.Chunk', 'jina_pb2.Document']]:
         """ Find the protobuf chunk/doc using id
 
         :param key: ``chunk_id`` or ``doc_id``
@@ -57,6 +207,329 @@ class BasePbIndexer(BaseKVIndexer):
         if self.query_handler is not None and key in self.query_handler:
             return self.query_handler[key]
 
+    def query_batch(self, keys: List[str], *args, **kwargs) -> List[Optional[Union['jina_pb2.Chunk', 'jina_pb2.Document']]]:
+        """ Find the protobuf chunks/docs of multiple ids in one call
+
+        :param keys: a list of ``chunk_id`` or ``doc_id``
+        :return: a list of protobuf chunk or protobuf document, ``None`` for the ids that can not be found
+        """
+        if self.query_handler is None:
+            return [None] * len(keys)
+        return [self.query_handler.get(k) for k in keys]
+
+    def convert_from_json(self) -> int:
+        """Convert the index file from the legacy gzip-compressed JSON format to the binary format in place
+
+        :return: the number of converted records
+        """
+        if not self.is_legacy_file:
+            self.logger.info(f'{self.index_abspath} is not in the legacy JSON format, nothing to convert')
+            return 0
+
+        self.close()
+        tmp_path = self.index_abspath + '.tmp'
+        num_records = 0
+        offsets = []
+        with open(tmp_path, 'wb') as fp:
+            fp.write(HEADER_MAGIC)
+            for k, v in self._iter_json_records():
+                key, value = k.encode('utf8'), pb2bytes(k, v)
+                offsets.append(OFFSET_KEY_HEADER.pack(len(key)) + key +
+                               OFFSET_VALUE.pack(fp.tell() + RECORD_HEADER.size + len(key), len(value)))
+                fp.write(RECORD_HEADER.pack(len(key), len(value)) + key + value)
+                num_records += 1
+        with open(self.offset_abspath, 'wb') as fp:
+            fp.write(b''.join(offsets))
+        os.replace(tmp_path, self.index_abspath)
+        self._remove_sorted_offsets()
+        self.post_init()
+        self.logger.success(f'converted {num_records} records in {self.index_abspath} to the binary format')
+        return num_records
+
+    def _iter_json_records(self) -> Iterator[Tuple[str, str]]:
+        with gzip.open(self.index_abspath, 'rt') as fp:
+            for l in fp:
+                if l.strip():
+                    yield from json.loads(l).items()
+
+    def _load_offsets(self) -> Dict[str, Tuple[int, int]]:
+        """Load the offset index, the offset index is rebuilt from the index file if it is missing """
+        if not os.path.exists(self.offset_abspath):
+            self.logger.warning(f'{self.offset_abspath} is missing, rebuilding it from {self.index_abspath}')
+            self._rebuild_offsets()
+
+        r = {}
+        for key, offset, length in self._iter_offsets():
+            if offset:
+                r[key] = (offset, length)
+            else:
+                r.pop(key, None)
+        return r
+
+    def _load_sorted_offsets(self) -> 'SortedOffsets':
+        """Load the sorted offset index, together with the entries appended to the offset index after it was written.
+        It is rebuilt from the offset index if it is missing or outdated, and rewritten when there are too many new
+        entries. """
+        if not os.path.exists(self.offset_abspath):
+            self.logger.warning(f'{self.offset_abspath} is missing, rebuilding it from {self.index_abspath}')
+            self._rebuild_offsets()
+        size = os.path.getsize(self.offset_abspath)
+        header = _read_sorted_offset_header(self.sorted_offset_abspath)
+        if header is None or header[3] > size:
+            self.logger.info(f'{self.sorted_offset_abspath} is missing or outdated, building it from '
+                             f'{self.offset_abspath}')
+            offsets = self._load_offsets()
+            keys = np.array([k.encode('utf8') for k in offsets], dtype=bytes)
+            _save_sorted_offsets(self.sorted_offset_abspath, keys, np.array(list(offsets.values()), dtype=np.uint64),
+                                 size)
+            return SortedOffsets(self.sorted_offset_abspath)
+
+        recent = {}
+        for key, offset, length in self._iter_offsets(header[3], size):
+            recent[key] = (offset, length) if offset else None
+        table = SortedOffsets(self.sorted_offset_abspath, recent)
+        if len(recent) > self.sorted_offset_rebuild_ratio * table.num_sorted:
+            table.merge_to(self.sorted_offset_abspath, size)
+            table = SortedOffsets(self.sorted_offset_abspath)
+        return table
+
+    def _remove_sorted_offsets(self):
+        """Remove the sorted offset index, as it can not be reused once the offset index is rewritten """
+        if os.path.exists(self.sorted_offset_abspath):
+            os.remove(self.sorted_offset_abspath)
+
+    def _iter_offsets(self, start: int = 0, end: int = None) -> Iterator[Tuple[str, int, int]]:
+        """Iterate over the entries in the offset index, including the ones of the updated and deleted records
+
+        :param start: the position of the first entry in the offset index
+        :param end: the position where the iteration stops, by default the end of the offset index
+        """
+        with open(self.offset_abspath, 'rb') as fp:
+            fp.seek(start)
+            data = fp.read() if end is None else fp.read(end - start)
+        p = 0
+        while p < len(data):
+            key_len, = OFFSET_KEY_HEADER.unpack_from(data, p)
+            p += OFFSET_KEY_HEADER.size
+            key = data[p:p + key_len].decode('utf8')
+            p += key_len
+            yield (key, *OFFSET_VALUE.unpack_from(data, p))
+            p += OFFSET_VALUE.size
+
+    def _rebuild_offsets(self):
+        offsets = []
+        with open(self.index_abspath, 'rb') as fp:
+            fp.seek(len(HEADER_MAGIC))
+            while True:
+                h = fp.read(RECORD_HEADER.size)
+                if len(h) < RECORD_HEADER.size:
+                    break
+                key_len, value_len = RECORD_HEADER.unpack(h)
+                key = fp.read(key_len)
+                if value_len == TOMBSTONE:
+                    offsets.append(OFFSET_KEY_HEADER.pack(key_len) + key + OFFSET_VALUE.pack(0, 0))
+                    continue
+                offsets.append(OFFSET_KEY_HEADER.pack(key_len) + key + OFFSET_VALUE.pack(fp.tell(), value_len))
+                fp.seek(value_len, os.SEEK_CUR)
+        with open(self.offset_abspath, 'wb') as fp:
+            fp.write(b''.join(offsets))
+        self._remove_sorted_offsets()
+
+
+class SortedOffsets(Mapping):
+    """A read-only dict-like view of the offset index, mapping from the key to the ``offset`` and ``length`` of the
+    latest record, the deleted keys are excluded
+
+    The sorted offset index file is ``header, keys, values``. The keys are encoded in UTF-8 and padded to the same
+    width in ascending order, the values are the ``offset`` and ``length`` of each key as two ``uint64``. Both are
+    memory-mapped, and a key is looked up by binary search via ``np.searchsorted``.
+
+    :param path: the path of the sorted offset index
+    :param recent: the entries appended to the offset index after the sorted one was written, which shadow the sorted
+        ones, ``None`` marks a deleted key
+    """
+
+    def __init__(self, path: str, recent: Dict[str, Optional[Tuple[int, int]]] = None):
+        self._recent = recent or {}
+        _, width, num_keys, _ = _read_sorted_offset_header(path)
+        if num_keys:
+            keys_size = _get_keys_size(width, num_keys)
+            self._keys = np.memmap(path, dtype=f'S{width}', mode='r', offset=SORTED_OFFSET_HEADER_SIZE,
+                                   shape=(num_keys,))
+            self._values = np.memmap(path, dtype=np.uint64, mode='r', offset=SORTED_OFFSET_HEADER_SIZE + keys_size,
+                                     shape=(num_keys, 2))
+        else:
+            self._keys = np.empty(0, dtype=f'S{width}')
+            self._values = np.empty([0, 2], dtype=np.uint64)
+        shadowed = sum(self._search(k) is not None for k in self._recent)
+        self._len = num_keys - shadowed + sum(v is not None for v in self._recent.values())
+
+    @property
+    def num_sorted(self) -> int:
+        """The number of keys in the sorted offset index """
+        return self._keys.shape[0]
+
+    def _search(self, key: str) -> Optional[int]:
+        """Get the position of the key in the sorted keys, ``None`` if it is not there """
+        key = key.encode('utf8')
+        if len(key) > self._keys.dtype.itemsize or not self.num_sorted:
+            return None
+        # the same dtype as the keys, so that the memory-mapped keys are not copied
+        pos = int(np.searchsorted(self._keys, np.array(key, dtype=self._keys.dtype)))
+        if pos < self.num_sorted and self._keys[pos] == key:
+            return pos
+
+    def __getitem__(self, key: str) -> Tuple[int, int]:
+        if key in self._recent:
+            value = self._recent[key]
+        else:
+            pos = self._search(key)
+            value = None if pos is None else (int(self._values[pos, 0]), int(self._values[pos, 1]))
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key) -> bool:
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[str]:
+        for k in self._keys:
+            k = k.decode('utf8')
+            if k not in self._recent:
+                yield k
+        yield from (k for k, v in self._recent.items() if v is not None)
+
+    def merge_to(self, path: str, size: int):
+        """Write the sorted keys merged with the recent entries as a new sorted offset index
+
+        :param size: the size of the offset index covered by the new sorted offset index
+        """
+        recent_keys = np.array([k.encode('utf8') for k in self._recent], dtype=bytes)
+        live = np.array([v is not None for v in self._recent.values()], dtype=bool)
+        keep = ~np.isin(self._keys, recent_keys)
+        width = max(self._keys.dtype.itemsize, recent_keys.dtype.itemsize)
+        keys = np.concatenate([self._keys[keep].astype(f'S{width}'), recent_keys[live].astype(f'S{width}')])
+        values = np.concatenate([self._values[keep], np.array([v for v in self._recent.values() if v is not None],
+                                                              dtype=np.uint64).reshape([-1, 2])])
+        _save_sorted_offsets(path, keys, values, size)
+
+
+def _get_keys_size(width: int, num_keys: int) -> int:
+    """Get the size of the keys in the sorted offset index, padded to 8 bytes so that the values are aligned """
+    return (width * num_keys + 7) // 8 * 8
+
+
+def _read_sorted_offset_header(path: str) -> Optional[Tuple[bytes, int, int, int]]:
+    """Read the header of a sorted offset index, ``None`` if the file is missing or not a sorted offset index """
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as fp:
+        header = fp.read(SORTED_OFFSET_HEADER.size)
+    if len(header) < SORTED_OFFSET_HEADER.size or header[:len(SORTED_OFFSET_MAGIC)] != SORTED_OFFSET_MAGIC:
+        return None
+    return SORTED_OFFSET_HEADER.unpack(header)
+
+
+def _save_sorted_offsets(path: str, keys: 'np.ndarray', values: 'np.ndarray', size: int):
+    """Sort the keys and write them with their values as a sorted offset index, the file is replaced atomically
+
+    :param keys: the UTF-8 encoded keys in a ``bytes`` ndarray
+    :param values: the ``offset`` and ``length`` of each key in shape N x 2
+    :param size: the size of the offset index covered by the sorted offset index
+    """
+    width = max(1, keys.dtype.itemsize)
+    order = np.argsort(keys, kind='stable')
+    with open(path + '.tmp', 'wb') as fp:
+        fp.write(SORTED_OFFSET_HEADER.pack(SORTED_OFFSET_MAGIC, width, keys.shape[0], size)
+                 .ljust(SORTED_OFFSET_HEADER_SIZE, b'\0'))
+        fp.write(keys[order].astype(f'S{width}').tobytes().ljust(_get_keys_size(width, keys.shape[0]), b'\0'))
+        fp.write(values.reshape([-1, 2])[order].astype('<u8').tobytes())
+    os.replace(path + '.tmp', path)
+
+
+class LazyPbReader:
+    """A read-only dict-like view of a binary protobuf index file, records are parsed on access
+
+    :param path: the path of the index file
+    :param offsets: a mapping from the key to the ``offset`` and ``length`` of the record, e.g. :class:`SortedOffsets`
+    :param cache_size: the maximum number of parsed records kept in the LRU cache
+    """
+
+    def __init__(self, path: str, offsets: Mapping[str, Tuple[int, int]], cache_size: int = 10000):
+        self._offsets = offsets
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        with open(path, 'rb') as fp:
+            self._data = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __getitem__(self, key: str) -> Union['jina_pb2.Chunk', 'jina_pb2.Document']:
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        offset, length = self._offsets[key]
+        obj = parse_pb(key, self._data[offset:offset + length])
+        if self._cache_size > 0:
+            self._cache[key] = obj
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return obj
+
+    def get(self, key: str, default=None):
+        return self[key] if key in self._offsets else default
+
+    def keys(self):
+        return self._offsets.keys()
+
+    def close(self):
+        self._cache.clear()
+        self._data.close()
+
+
+def get_pb_type(key: str):
+    """Get the protobuf type from the key, ``c`` prefixed keys are chunks, otherwise documents """
+    return jina_pb2.Chunk if key[0] == 'c' else jina_pb2.Document
+
+
+def parse_pb(key: str, value: Union[bytes, str]) -> Union['jina_pb2.Chunk', 'jina_pb2.Document']:
+    """Parse a serialized protobuf (binary or JSON) into a protobuf chunk/document """
+    obj = get_pb_type(key)()
+    if isinstance(value, str):
+        return Parse(value, obj)
+    obj.ParseFromString(value)
+    return obj
+
+
+def pb2bytes(key: str, value: Union[bytes, str, 'jina_pb2.Chunk', 'jina_pb2.Document']) -> bytes:
+    """Serialize a protobuf, or convert a JSON serialized protobuf, into the binary format """
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, str):
+        value = parse_pb(key, value)
+    return value.SerializeToString()
+
+
+def pb2json(key: str, value: Union[bytes, str, 'jina_pb2.Chunk', 'jina_pb2.Document']) -> str:
+    """Serialize a protobuf, or convert a binary serialized protobuf, into the JSON format """
+    from google.protobuf.json_format import MessageToJson
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bytes):
+        value = parse_pb(key, value)
+    return MessageToJson(value)
+
 
 class ChunkPbIndexer(BasePbIndexer):
     """Shortcut for :class:`BasePbIndexer` equipped with ``requests.on`` for storing chunk-level protobuf info,
@@ -1,7 +1,8 @@
 __copyright__ = "Copyright (c) 2020 Jina AI Limited. All rights reserved."
 __license__ = "Apache-2.0"
 
-from typing import Tuple
+from concurrent.futures import Future
+from typing import Tuple, Optional, Dict, Union, Iterable
 
 import numpy as np
 
@@ -16,41 +17,92 @@ class AnnoyIndexer(NumpyIndexer):
 
     .. note::
         Annoy package dependency is only required at the query time.
+
+    .. note::
+        The built index is saved next to the vectors, i.e. ``index_filename.ann``, and is loaded directly
+        in the next start, unless the vectors or ``n_trees`` have changed.
+
+    .. warning::
+        The deleted vectors and the vectors not matching ``filter`` stay in the trees. The query over-fetches
+        ``top_k`` plus the number of the excluded vectors and drops them afterwards, which costs almost a full scan
+        for a selective filter. The trees may still return less than that with a small ``search_k``, then less than
+        ``top_k`` results are returned and a warning is logged.
     """
 
-    def __init__(self, metric: str = 'euclidean', n_trees: int = 10, *args, **kwargs):
+    def __init__(self, metric: str = 'euclidean', n_trees: int = 10, search_k: int = -1,
+                 num_threads: int = 1, build_in_background: bool = False,
+                 *args, **kwargs):
         """
         Initialize an AnnoyIndexer
 
         :param metric: Metric can be "angular", "euclidean", "manhattan", "hamming", or "dot"
         :param n_trees: builds a forest of n_trees trees. More trees gives higher precision when querying.
+        :param search_k: the number of nodes to inspect during searching, ``-1`` means ``n_trees * top_k``
+        :param num_threads: the number of threads used for building the trees and querying a batch of vectors.
+            Annoy releases the GIL, so the threads run in parallel.
+        :param build_in_background: start building the index in a background thread once the indexer is loaded,
+            the first query waits for the building to finish
         :param args:
         :param kwargs:
         """
-        super().__init__(*args, **kwargs)
+        super().__init__(num_threads=num_threads, *args, **kwargs)
         self.metric = metric
         self.n_trees = n_trees
+        self.search_k = search_k
+        self.build_in_background = build_in_background
+
+    def post_init(self):
+        super().post_init()
+        self._build_future = None  # type: Optional[Future]
+        if self.build_in_background and self.num_dim:
+            self._build_future = self.thread_pool.submit(self._build_index)
 
     def get_query_handler(self):
+        if self._build_future is not None:
+            future, self._build_future = self._build_future, None
+            return future.result()
+        return self._build_index()
+
+    def _build_index(self):
         vecs = super().get_query_handler()
         if vecs is not None:
             from annoy import AnnoyIndex
             _index = AnnoyIndex(self.num_dim, self.metric)
-            vecs = vecs.astype(np.float32)
-            for idx, v in enumerate(vecs):
-                _index.add_item(idx, v)
-            _index.build(self.n_trees)
+            params = {'metric': self.metric, 'n_trees': self.n_trees}
+            if self.load_ann_index(_index.load, params):
+                return _index
+            num_vecs = vecs.shape[0]
+            step = max(1, num_vecs // 10)
+            for j in range(0, num_vecs, step):
+                # converting by blocks keeps the memory bounded on a memmap file
+                for idx, v in enumerate(vecs[j:j + step].astype(np.float32), start=j):
+                    _index.add_item(idx, v)
+                self.logger.info(f'added {min(j + step, num_vecs)}/{num_vecs} vectors to the index')
+            self.logger.info(f'building {self.n_trees} trees...')
+            _index.build(self.n_trees, n_jobs=self.num_threads)
+            self.logger.success(f'built the index with {num_vecs} vectors')
+            self.save_ann_index(_index.save, params)
             return _index
         else:
             return None
 
-    def query(self, keys: 'np.ndarray', top_k: int, *args, **kwargs) -> Tuple['np.ndarray', 'np.ndarray']:
+    def query(self, keys: 'np.ndarray', top_k: int, filter: Dict[str, Union[str, Iterable[str]]] = None,
+              *args, **kwargs) -> Tuple['np.ndarray', 'np.ndarray']:
         if keys.dtype != np.float32:
             raise ValueError('vectors should be ndarray of float32')
-        all_idx = []
-        all_dist = []
-        for k in keys:
-            ret, dist = self.query_handler.get_nns_by_vector(k, top_k, include_distances=True)
-            all_idx.append(self.int2ext_key[ret])
-            all_dist.append(dist)
-        return np.array(all_idx), np.array(all_dist)
+        _index = self.query_handler
+        # the deleted and filtered-out vectors are still in the trees, more results are queried to make up for them
+        mask = self._get_mask(self.int2ext_key.shape[0], filter)
+        num_candidates = self._get_num_candidates(top_k, mask)
+
+        def _query(batch):
+            return [_index.get_nns_by_vector(k, num_candidates, search_k=self.search_k, include_distances=True)
+                    for k in batch]
+
+        if self.num_threads > 1 and keys.shape[0] > 1:
+            results = [r for rs in self.thread_pool.map(_query, np.array_split(keys, self.num_threads)) for r in rs]
+        else:
+            results = _query(keys)
+        idx, dist = self._remove_deleted(np.array([ret for ret, _ in results]),
+                                         np.array([dist for _, dist in results]), top_k, mask)
+        return self.int2ext_key[idx], dist
@@ -0,0 +1,152 @@
+__copyright__ = "Copyright (c) 2020 Jina AI Limited. All rights reserved."
+__license__ = "Apache-2.0"
+
+import json
+import os
+from typing import Dict, Iterable, Optional, Sequence, Union
+
+import numpy as np
+
+MISSING = -1  #: the code of a row without a value in the column
+
+
+class AttributeStore:
+    """A columnar store of the string attributes of the stored vectors, used to filter the vectors in the search.
+
+    Each column is dictionary-encoded, i.e. the distinct values are kept in ``prefix.attr`` and each row is stored as
+    an ``int32`` code in ``prefix.attr.<column number>``, in the same order as the vectors. A filter is then evaluated
+    with one vectorized comparison over the codes, without touching the vectors.
+
+    .. note::
+        The columns are appended and never rewritten except by :func:`compact`. A column can be shorter than the
+        number of stored vectors, when the vectors are added without this attribute; the missing rows never match.
+    """
+
+    def __init__(self, prefix: str):
+        """
+        :param prefix: the file path prefix of the store, usually the path of the index file
+        """
+        self.prefix = prefix
+        self._columns = None  # type: Optional[Dict[str, Dict[str, int]]]
+        self._columns_mtime = None
+        self._codes = {}  # type: Dict[str, tuple]
+
+    @property
+    def manifest_abspath(self) -> str:
+        """Get the file path of the column names and their distinct values """
+        return self.prefix + '.attr'
+
+    def column_abspath(self, column_id: int) -> str:
+        """Get the file path of the codes of a column """
+        return f'{self.prefix}.attr.{column_id}'
+
+    @property
+    def columns(self) -> Dict[str, Dict[str, int]]:
+        """The map from each column name to its value-to-code map, reloaded when changed by another indexer """
+        try:
+            mtime = os.stat(self.manifest_abspath).st_mtime_ns
+        except FileNotFoundError:
+            return {}
+        if mtime != self._columns_mtime:
+            with open(self.manifest_abspath) as fp:
+                self._columns = {k: {v: j for j, v in enumerate(vs)} for k, vs in json.load(fp).items()}
+            self._columns_mtime = mtime
+        return self._columns
+
+    def add(self, start: int, attributes: Dict[str, Sequence[Optional[str]]]):
+        """Append the attributes of the new vectors
+
+        :param start: the row number of the first new vector
+        :param attributes: the map from each column name to the values of the new vectors, ``None`` for no value
+        """
+        if not attributes:
+            return
+        columns = {k: dict(v) for k, v in self.columns.items()}
+        for name, values in attributes.items():
+            vocab = columns.setdefault(str(name), {})
+            codes = np.array([MISSING if v is None else vocab.setdefault(str(v), len(vocab)) for v in values],
+                             dtype=np.int32)
+            path = self.column_abspath(list(columns).index(str(name)))
+            num_rows = os.path.getsize(path) // codes.itemsize if os.path.exists(path) else 0
+            with open(path, 'ab') as fp:
+                if num_rows < start:
+                    # the vectors added without this attribute in between
+                    fp.write(np.full(start - num_rows, MISSING, dtype=np.int32).tobytes())
+                fp.write(codes.tobytes())
+        self._save_manifest(columns)
+
+    def get(self, num_rows: int) -> Dict[str, 'np.ndarray']:
+        """Decode all columns of the first ``num_rows`` vectors
+
+        :return: the map from each column name to an object ndarray of the values, ``None`` for no value
+        """
+        result = {}
+        for name, vocab in self.columns.items():
+            values = np.array(list(vocab) + [None], dtype=object)
+            # the missing code -1 picks the trailing None
+            result[name] = values[self._load_codes(name, num_rows)]
+        return result
+
+    def match(self, filter: Dict[str, Union[str, Iterable[str]]], num_rows: int) -> 'np.ndarray':
+        """Evaluate a filter on the first ``num_rows`` vectors
+
+        :param filter: the map from each column name to the required value, or an iterable of accepted values.
+            A vector matches when all columns match.
+        :return: a boolean mask of the matched vectors
+        """
+        matched = np.ones(num_rows, dtype=bool)
+        columns = self.columns
+        for name, values in filter.items():
+            vocab = columns.get(str(name))
+            values = values if isinstance(values, (list, tuple, set, frozenset)) else [values]
+            wanted = [vocab[str(v)] for v in values if str(v) in vocab] if vocab else []
+            if not wanted:
+                return np.zeros(num_rows, dtype=bool)
+            codes = self._load_codes(str(name), num_rows)
+            matched &= (codes == wanted[0]) if len(wanted) == 1 else np.isin(codes, wanted)
+        return matched
+
+    def compact(self, keep: 'np.ndarray'):
+        """Drop the rows not in ``keep`` from all columns
+
+        :param keep: a boolean mask of the rows to keep
+        """
+        for name in self.columns:
+            path = self.column_abspath(list(self.columns).index(name))
+            self._load_codes(name, keep.shape[0])[keep].tofile(path + '.tmp')
+            os.replace(path + '.tmp', path)
+        self._codes.clear()
+
+    def remove(self):
+        """Remove all files of the store """
+        for j in range(len(self.columns)):
+            if os.path.exists(self.column_abspath(j)):
+                os.remove(self.column_abspath(j))
+        if os.path.exists(self.manifest_abspath):
+            os.remove(self.manifest_abspath)
+        self._columns = None
+        self._columns_mtime = None
+        self._codes.clear()
+
+    def _load_codes(self, name: str, num_rows: int) -> 'np.ndarray':
+        """Load the codes of a column, padded with :data:`MISSING` or truncated to ``num_rows`` """
+        path = self.column_abspath(list(self.columns).index(name))
+        if not os.path.exists(path):
+            return np.full(num_rows, MISSING, dtype=np.int32)
+        st = os.stat(path)
+        cached = self._codes.get(name)
+        if cached is None or cached[0] != (st.st_mtime_ns, st.st_size):
+            cached = ((st.st_mtime_ns, st.st_size), np.fromfile(path, dtype=np.int32))
+            self._codes[name] = cached
+        codes = cached[1]
+        if codes.shape[0] >= num_rows:
+            return codes[:num_rows]
+        return np.concatenate([codes, np.full(num_rows - codes.shape[0], MISSING, dtype=np.int32)])
+
+    def _save_manifest(self, columns: Dict[str, Dict[str, int]]):
+        with open(self.manifest_abspath + '.tmp', 'w') as fp:
+            # the values are listed in the order of their codes
+            json.dump({k: list(v) for k, v in columns.items()}, fp)
+        os.replace(self.manifest_abspath + '.tmp', self.manifest_abspath)
+        self._columns = columns
+        self._columns_mtime = os.stat(self.manifest_abspath).st_mtime_ns
@@ -0,0 +1,86 @@
+__copyright__ = "Copyright (c) 2020 Jina AI Limited. All rights reserved."
+__license__ = "Apache-2.0"
+
+from typing import Tuple, Dict, Union, Iterable
+
+import numpy as np
+
+from .numpy import NumpyIndexer
+
+POPCOUNT_TABLE = np.array([bin(j).count('1') for j in range(256)], dtype=np.uint8)  #: the number of 1-bits in a byte
+
+
+class BinaryNumpyIndexer(NumpyIndexer):
+    """An exhaustive Hamming-distance vector indexer for binary embeddings, implemented with numpy.
+
+    The vectors are binarized by ``threshold`` and stored as bits packed by ``np.packbits``, i.e. one bit per
+    dimension. The Hamming distance is computed by XOR-ing the packed bits, in 64-bit words when the number of bytes
+    allows, and counting the 1-bits via ``np.bitwise_count`` (numpy>=2.0) or a lookup table.
+
+    The returned distance is the number of different bits.
+
+    .. note::
+        The scan is blocked by ``query_memory_limit`` and partitioned by ``num_threads`` as :class:`NumpyIndexer`.
+    """
+
+    store_norms = False
+
+    def __init__(self, threshold: float = 0., *args, **kwargs):
+        """
+        :param threshold: a dimension is set to ``1`` if its value is larger than ``threshold``, otherwise ``0``
+        """
+        super().__init__(*args, **kwargs)
+        self.metric = 'hamming'
+        self.threshold = threshold
+        self.num_bits = None
+
+    def add(self, keys: 'np.ndarray', vectors: 'np.ndarray', *args, **kwargs):
+        if len(vectors.shape) != 2:
+            raise ValueError('vectors shape %s is not valid, expecting "vectors" to have rank of 2' % vectors.shape)
+        if not self.num_bits:
+            self.num_bits = vectors.shape[1]
+        elif self.num_bits != vectors.shape[1]:
+            raise ValueError("vectors' shape [%d, %d] does not match with indexers's dim: %d" %
+                             (vectors.shape[0], vectors.shape[1], self.num_bits))
+        super().add(keys, self._pack(vectors), *args, **kwargs)
+
+    def query(self, keys: 'np.ndarray', top_k: int, filter: Dict[str, Union[str, Iterable[str]]] = None,
+              *args, **kwargs) -> Tuple['np.ndarray', 'np.ndarray']:
+        """ Find the top-k vectors with smallest Hamming distance and return their ids.
+
+        :param filter: only the vectors whose attributes match it are searched, see :func:`_get_mask`
+        :return: a tuple of two ndarray.
+            The first is ids in shape B x K (`dtype=int`), the second is the number of different bits in shape B x K
+        """
+        if self.query_handler is None:
+            return np.empty([keys.shape[0], 0], dtype=np.int64), np.empty([keys.shape[0], 0], dtype=np.float32)
+        idx, dist = self._search(self._pack(keys), self.query_handler, None, top_k,
+                                 self._get_mask(self.query_handler.shape[0], filter))
+        return self.int2ext_key[idx], dist.astype(np.float32)
+
+    def _pack(self, vectors: 'np.ndarray') -> 'np.ndarray':
+        return np.packbits(vectors > self.threshold, axis=1)
+
+    def _get_search_block_size(self, queries: 'np.ndarray', vecs: 'np.ndarray') -> int:
+        # the XOR-ed bytes and their bit counts are materialized for each (query, vector) pair
+        return self._get_block_size(queries.shape[0] * self.num_dim * 2, 1)
+
+    def _prepare_queries(self, queries: 'np.ndarray', vecs: 'np.ndarray') -> 'np.ndarray':
+        return _as_words(np.ascontiguousarray(queries))
+
+    def _get_distance(self, queries: 'np.ndarray', vecs: 'np.ndarray', sq_norms: 'np.ndarray',
+                      start: int, end: int) -> 'np.ndarray':
+        block = _as_words(np.ascontiguousarray(vecs[start:end]))
+        return _popcount(queries[:, None, :] ^ block[None, :, :]).sum(axis=2, dtype=np.int32)
+
+
+def _as_words(A: 'np.ndarray') -> 'np.ndarray':
+    """View the packed bits as 64-bit words if possible, so that XOR runs on fewer and wider elements """
+    return A.view(np.uint64) if A.shape[1] % 8 == 0 else A
+
+
+def _popcount(A: 'np.ndarray') -> 'np.ndarray':
+    """Count the 1-bits in each byte (or word) of ``A`` """
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(A)
+    return POPCOUNT_TABLE[A.view(np.uint8)]
@@ -1,7 +1,7 @@
 __copyright__ = "Copyright (c) 2020 Jina AI Limited. All rights reserved."
 __license__ = "Apache-2.0"
 
-from typing import Tuple
+from typing import Tuple, Dict, Union, Iterable
 
 import numpy as np
 
@@ -17,6 +17,16 @@ class FaissIndexer(NumpyIndexer):
 
     .. note::
         Faiss package dependency is only required at the query time.
+
+    .. note::
+        The built index is saved next to the vectors, i.e. ``index_filename.ann``, and is loaded directly
+        in the next start, unless the vectors or ``index_key`` have changed.
+
+    .. warning::
+        ``filter`` and the deletions are applied to the search results, not inside the Faiss index. The index is
+        searched for ``top_k`` plus the number of the excluded vectors. An inverted-file index only scans ``nprobe``
+        lists and may return ``-1`` for the rest, so less than ``top_k`` results can be left. This is logged as a
+        warning.
     """
 
     def __init__(self, index_key: str, *args, **kwargs):
@@ -32,15 +42,25 @@ class FaissIndexer(NumpyIndexer):
         """Load all vectors (in numpy ndarray) into Faiss indexers """
         import faiss
         data = super().get_query_handler()
-        _index = faiss.index_factory(self.num_dim, self.index_key)
-        _index.add(data)
+        if data is None:
+            return None
+        params = {'index_key': self.index_key}
+        _index = self.load_ann_index(faiss.read_index, params)
+        if _index is None:
+            _index = faiss.index_factory(self.num_dim, self.index_key)
+            _index.add(data)
+            self.save_ann_index(lambda path: faiss.write_index(_index, path), params)
         return _index
 
-    def query(self, keys: 'np.ndarray', top_k: int, *args, **kwargs) -> Tuple['np.ndarray', 'np.ndarray']:
+    def query(self, keys: 'np.ndarray', top_k: int, filter: Dict[str, Union[str, Iterable[str]]] = None,
+              *args, **kwargs) -> Tuple['np.ndarray', 'np.ndarray']:
         if keys.dtype != np.float32:
             raise ValueError('vectors should be ndarray of float32')
 
-        dist, ids = self.query_handler.search(keys, top_k)
+        _index = self.query_handler
+        mask = self._get_mask(self.int2ext_key.shape[0], filter)
+        dist, ids = _index.search(keys, self._get_num_candidates(top_k, mask))
 
         # ids is already a numpy array
+        ids, dist = self._remove_deleted(ids, dist, top_k, mask)
         return self.int2ext_key[ids], dist
@@ -0,0 +1,263 @@
+__copyright__ = "Copyright (c) 2020 Jina AI Limited. All rights reserved."
+__license__ = "Apache-2.0"
+
+import hashlib
+import os
+from typing import Tuple, Optional, Dict, Union, Iterable
+
+import numpy as np
+
+from .numpy import NumpyIndexer, _get_sorted_topk, _merge_topk, _normalize, _sq_euclidean, _kmeans, \
+    _euclidean, _cosine, _mask_deleted
+from ...decorators import require_train
+
+
+class IVFNumpyIndexer(NumpyIndexer):
+    """An inverted-file vector indexer implemented with numpy.
+
+    The vectors are partitioned into ``nlist`` lists by k-means, each vector belongs to the list of its nearest
+    centroid. In the query time, only the ``nprobe`` lists whose centroids are the nearest to the query are scanned
+    exhaustively, so the search cost is roughly ``nprobe / nlist`` of :class:`NumpyIndexer`.
+
+    The centroids must be trained via :func:`train` before the first :func:`add`, on a sample of at least ``nlist``
+    vectors.
+
+    .. note::
+        The vectors are appended to ``index_filename`` as :class:`NumpyIndexer` does, and the list id of each vector is
+        appended to ``index_filename.lists``. In the query time, the vectors are rearranged into one contiguous block
+        per list, i.e. ``index_filename.ann``, which is memory-mapped, so that a query only touches the pages of the
+        probed lists. The vectors added after that are not rearranged, the ones in the probed lists are read from
+        ``index_filename`` directly, until they are more than ``rebuild_ratio`` of the rearranged vectors and the
+        rearranged file is rebuilt.
+    """
+
+    def __init__(self, nlist: int = 100, nprobe: int = 10, num_iters: int = 20, storage: str = 'memmap',
+                 rebuild_ratio: float = 0.1, *args, **kwargs):
+        """
+        :param nlist: the number of lists, i.e. the number of k-means centroids
+        :param nprobe: the number of lists scanned for each query
+        :param num_iters: the number of k-means iterations when training the centroids
+        :param storage: the storage of the raw vectors, see :class:`NumpyIndexer`
+        :param rebuild_ratio: the rearranged file is rebuilt when the vectors added after it are more than this ratio
+            of the rearranged vectors
+        """
+        super().__init__(storage=storage, *args, **kwargs)
+        if self.metric not in {'euclidean', 'cosine'}:
+            raise ValueError(f'{self.__class__.__name__} only supports "euclidean" and "cosine", not {self.metric}')
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.num_iters = num_iters
+        self.rebuild_ratio = rebuild_ratio
+        self.centroids = None  # type: Optional[np.ndarray]
+        self.is_trained = False
+
+    def post_init(self):
+        super().post_init()
+        self._lists = None
+        self._tail = None
+
+    @property
+    def lists_abspath(self) -> str:
+        """Get the file path of the list ids of the stored vectors """
+        return self.index_abspath + '.lists'
+
+    @property
+    def lists(self) -> Optional[Tuple['np.ndarray', 'np.ndarray', 'np.ndarray', 'np.ndarray']]:
+        """The stored vectors rearranged by the lists, loaded from :attr:`ann_abspath`, or rebuilt when the vectors
+        added after it are too many, see :attr:`tail`
+
+        :return: a tuple of the rearranged vectors, their squared L2-norms, their row indices in
+            :attr:`query_handler`, and the offset where each list starts
+        """
+        if self.centroids is None or self.query_handler is None:
+            return None
+        params = {'nlist': self.centroids.shape[0],
+                  'centroids': hashlib.md5(self.centroids.tobytes()).hexdigest()}
+        if self._lists is None:
+            self._lists = self.load_ann_index(self._load_lists, params, append_only=True)
+        if self._lists is None or self.tail is None \
+                or self.tail[0].shape[0] > self.rebuild_ratio * self._lists[2].shape[0]:
+            self.save_ann_index(self._save_lists, params)
+            self._lists = self._load_lists(self.ann_abspath)
+            self._tail = None
+        return self._lists
+
+    @property
+    def tail(self) -> Optional[Tuple['np.ndarray', 'np.ndarray']]:
+        """The vectors added after :attr:`lists` is rearranged, sorted by the lists
+
+        :return: a tuple of their row indices in :attr:`query_handler` and the offset where each list starts,
+            ``None`` when :attr:`lists_abspath` does not match the vectors
+        """
+        start, end = self._lists[2].shape[0], self.query_handler.shape[0]
+        if self._tail is None or self._tail[0] != (start, end):
+            lists = np.fromfile(self.lists_abspath, dtype=np.int32, count=end - start, offset=start * 4)
+            if lists.shape[0] != end - start:
+                return None
+            rows = np.argsort(lists, kind='stable')
+            offsets = np.searchsorted(lists[rows], np.arange(self.centroids.shape[0] + 1))
+            self._tail = ((start, end), rows + start, offsets)
+        return self._tail[1:]
+
+    def train(self, data: 'np.ndarray', *args, **kwargs):
+        """Train the centroids of the lists with k-means
+
+        :param data: a `B x D` numpy ``ndarray`` of training vectors
+        """
+        nlist = min(self.nlist, data.shape[0])
+        if nlist < self.nlist:
+            self.logger.warning(f'only {data.shape[0]} vectors are given, {nlist} lists are trained '
+                                f'instead of {self.nlist}')
+        self.centroids = _kmeans(self._preprocess(data), nlist, self.num_iters, np.random.RandomState(0))
+        self._lists = None
+        self._tail = None
+        self.is_trained = True
+        self.logger.success(f'trained {nlist} lists from {data.shape[0]} vectors')
+
+    def get_create_handler(self):
+        self._remove_lists()
+        if os.path.exists(self.lists_abspath):
+            os.remove(self.lists_abspath)
+        return super().get_create_handler()
+
+    @require_train
+    def add(self, keys: 'np.ndarray', vectors: 'np.ndarray', *args, **kwargs):
+        super().add(keys, vectors, *args, **kwargs)
+        # the new vectors are searched in the tail until the next rebuild
+        with open(self.lists_abspath, 'ab') as fp:
+            fp.write(self._assign(vectors).astype(np.int32).tobytes())
+
+    def query(self, keys: 'np.ndarray', top_k: int, filter: Dict[str, Union[str, Iterable[str]]] = None,
+              *args, **kwargs) -> Tuple['np.ndarray', 'np.ndarray']:
+        """ Find the top-k vectors with smallest ``metric`` in the ``nprobe`` nearest lists and return their ids.
+
+        :return: a tuple of two ndarray.
+            The first is ids in shape B x K (`dtype=int`), the second is metric in shape B x K (`dtype=float`)
+
+        :param filter: only the vectors whose attributes match it are searched, see :func:`_get_mask`
+
+        .. note::
+            When the probed lists contain less than ``top_k`` vectors in total for some query, ``K`` is the largest
+            number of vectors found for a query, the rows of the other queries are padded with the key ``0`` at an
+            infinite distance.
+        """
+        if self.lists is None:
+            return np.empty([keys.shape[0], 0], dtype=np.int64), np.empty([keys.shape[0], 0], dtype=np.float32)
+        vecs, sq_norms, rows, offsets = self.lists
+        tail_rows, tail_offsets = self.tail
+        num_rearranged = rows.shape[0]
+        tombstones = self._get_mask(num_rearranged + tail_rows.shape[0], filter)
+
+        dtype = np.result_type(vecs.dtype, np.float32)
+        queries = self._preprocess(keys).astype(dtype, copy=False)
+        nprobe = min(self.nprobe, self.centroids.shape[0])
+        probes = _get_sorted_topk(_sq_euclidean(queries, self.centroids), nprobe)[0]
+
+        idx = np.full([queries.shape[0], top_k], -1, dtype=np.int64)
+        dist = np.full([queries.shape[0], top_k], np.inf, dtype=dtype)
+        # scan each probed list once for all the queries probing it
+        for l in np.unique(probes):
+            q_rows = np.nonzero(np.any(probes == l, axis=1))[0]
+            start, end = offsets[l], offsets[l + 1]
+            if start < end:
+                _dist = self._get_list_distance(queries[q_rows], vecs[start:end], sq_norms[start:end],
+                                                rows[start:end], tombstones)
+                idx[q_rows], dist[q_rows] = _merge_topk(idx[q_rows], dist[q_rows], start, _dist, top_k)
+            # the vectors added after the rearrangement follow the rearranged ones
+            start, end = tail_offsets[l], tail_offsets[l + 1]
+            if start < end:
+                _rows = tail_rows[start:end]
+                _dist = self._get_list_distance(queries[q_rows], self.query_handler[_rows], self.sq_norms[_rows],
+                                                _rows, tombstones)
+                idx[q_rows], dist[q_rows] = _merge_topk(idx[q_rows], dist[q_rows], num_rearranged + start, _dist,
+                                                        top_k)
+
+        idx, dist = _get_sorted_topk(dist, top_k, idx)
+        # the deleted vectors and the unfilled columns are at infinite distance
+        found = np.isfinite(dist)
+        num_found = found.sum(axis=1)
+        if num_found.min() < top_k:
+            self.logger.warning(f'only {num_found.min()} vectors are found in {nprobe} lists for some queries, '
+                                f'consider increasing nprobe')
+            num_cols = int(num_found.max())
+            idx, dist, found = idx[:, :num_cols], dist[:, :num_cols], found[:, :num_cols]
+        in_lists = found & (idx < num_rearranged)
+        in_tail = found & ~in_lists
+        ids = np.zeros(idx.shape, dtype=self.int2ext_key.dtype)
+        ids[in_lists] = self.int2ext_key[rows[idx[in_lists]]]
+        ids[in_tail] = self.int2ext_key[tail_rows[idx[in_tail] - num_rearranged]]
+        return ids, dist
+
+    def _get_list_distance(self, queries: 'np.ndarray', block: 'np.ndarray', block_sq_norms: 'np.ndarray',
+                           block_rows: 'np.ndarray', tombstones: Optional['np.ndarray']) -> 'np.ndarray':
+        """Compute the distances between the queries and the vectors of a list
+
+        :param block_rows: the row indices of the vectors in :attr:`query_handler`
+        :param tombstones: the mask of the excluded vectors given by :func:`_get_mask`
+        """
+        block = np.asarray(block, dtype=queries.dtype)
+        block_sq_norms = np.asarray(block_sq_norms, dtype=queries.dtype)
+        if self.metric == 'cosine':
+            _dist = _cosine(queries, block, block_sq_norms)
+        else:
+            _dist = _euclidean(queries, block, block_sq_norms)
+        if tombstones is not None:
+            _dist = _mask_deleted(_dist, tombstones[block_rows])
+        return _dist
+
+    def _compact_files(self, keep: 'np.ndarray'):
+        lists = np.fromfile(self.lists_abspath, dtype=np.int32)
+        if lists.shape[0] == keep.shape[0]:
+            lists[keep].tofile(self.lists_abspath)
+        else:
+            # all vectors are reassigned when the lists are rebuilt
+            self.logger.warning(f'{self.lists_abspath} does not match the vectors, it is not compacted')
+        self._remove_lists()
+
+    def _remove_lists(self):
+        """Remove the rearranged vectors, as they can not be reused once the vectors are rewritten """
+        if os.path.exists(self.ann_abspath + '.meta'):
+            os.remove(self.ann_abspath + '.meta')
+        self._lists = None
+        self._tail = None
+
+    def _preprocess(self, vectors: 'np.ndarray') -> 'np.ndarray':
+        vectors = vectors.astype(np.float32, copy=False)
+        return _normalize(vectors) if self.metric == 'cosine' else vectors
+
+    def _assign(self, vectors: 'np.ndarray') -> 'np.ndarray':
+        """Get the id of the nearest centroid for each vector """
+        return _sq_euclidean(self._preprocess(vectors), self.centroids).argmin(axis=1)
+
+    def _save_lists(self, path: str):
+        """Rearrange the stored vectors into one contiguous block per list """
+        vecs = self.query_handler
+        lists = np.fromfile(self.lists_abspath, dtype=np.int32)
+        if lists.shape[0] != vecs.shape[0]:
+            self.logger.warning(f'{self.lists_abspath} does not match the vectors, reassigning all vectors')
+            block_size = self._get_block_size(self.centroids.shape[0], 4)
+            lists = np.concatenate([self._assign(vecs[j:j + block_size]) for j in range(0, vecs.shape[0], block_size)]
+                                   or [np.empty(0, dtype=np.int32)]).astype(np.int32)
+            lists.tofile(self.lists_abspath)
+
+        rows = np.argsort(lists, kind='stable')
+        offsets = np.searchsorted(lists[rows], np.arange(self.centroids.shape[0] + 1))
+        block_size = self._get_block_size(self.num_dim, vecs.dtype.itemsize)
+        with open(path, 'wb') as fp:
+            for j in range(0, rows.shape[0], block_size):
+                fp.write(np.asarray(vecs[rows[j:j + block_size]]).tobytes())
+        rows.astype(np.int64).tofile(path + '.rows')
+        offsets.astype(np.int64).tofile(path + '.offsets')
+        self.logger.info(f'rearranged {rows.shape[0]} vectors into {self.centroids.shape[0]} lists')
+
+    def _load_lists(self, path: str) -> Optional[Tuple['np.ndarray', 'np.ndarray', 'np.ndarray', 'np.ndarray']]:
+        rows = np.fromfile(path + '.rows', dtype=np.int64)
+        offsets = np.fromfile(path + '.offsets', dtype=np.int64)
+        # the vectors added after the rearrangement are in the tail
+        if rows.shape[0] > self.query_handler.shape[0] or offsets.shape[0] != self.centroids.shape[0] + 1:
+            return None
+        if rows.shape[0]:
+            vecs = np.memmap(path, dtype=self.dtype, mode='r', shape=(rows.shape[0], self.num_dim))
+        else:
+            vecs = np.empty([0, self.num_dim], dtype=self.dtype)
+        return vecs, np.asarray(self.sq_norms, dtype=self.norm_dtype)[rows], rows, offsets
@@ -1,7 +1,7 @@
 __copyright__ = "Copyright (c) 2020 Jina AI Limited. All rights reserved."
 __license__ = "Apache-2.0"
 
-from typing import Tuple
+from typing import Tuple, Dict, Union, Iterable
 
 import numpy as np
 
@@ -18,6 +18,16 @@ class NmslibIndexer(NumpyIndexer):
 
     .. note::
         Nmslib package dependency is only required at the query time.
+
+    .. note::
+        The built index is saved next to the vectors, i.e. ``index_filename.ann``, and is loaded directly
+        in the next start, unless the vectors, ``space`` or ``method`` have changed.
+
+    .. warning::
+        nmslib can not exclude vectors from the search, the deleted vectors and the vectors not matching ``filter``
+        are removed from the results afterwards. To make up for them, more neighbours are queried, up to the whole
+        index. A graph method like ``hnsw`` may not reach that many neighbours, in which case less than ``top_k``
+        results are returned with a warning.
     """
 
     def __init__(self, space: str = 'cosinesimil', method: str = 'hnsw', print_progress: bool = False,
@@ -44,15 +54,28 @@ class NmslibIndexer(NumpyIndexer):
         if vecs is not None:
             import nmslib
             _index = nmslib.init(method=self.method, space=self.space)
+            params = {'method': self.method, 'space': self.space}
+
+            def _load(path):
+                _index.loadIndex(path, load_data=True)
+                return _index
+
+            if self.load_ann_index(_load, params) is not None:
+                return _index
             _index.addDataPointBatch(vecs.astype(np.float32))
             _index.createIndex({'post': 2}, print_progress=self.print_progress)
+            self.save_ann_index(lambda path: _index.saveIndex(path, save_data=True), params)
             return _index
         else:
             return None
 
-    def query(self, keys: 'np.ndarray', top_k: int, *args, **kwargs) -> Tuple['np.ndarray', 'np.ndarray']:
+    def query(self, keys: 'np.ndarray', top_k: int, filter: Dict[str, Union[str, Iterable[str]]] = None,
+              *args, **kwargs) -> Tuple['np.ndarray', 'np.ndarray']:
         if keys.dtype != np.float32:
             raise ValueError('vectors should be ndarray of float32')
-        ret = self.query_handler.knnQueryBatch(keys, k=top_k, num_threads=self.num_threads)
+        _index = self.query_handler
+        mask = self._get_mask(self.int2ext_key.shape[0], filter)
+        ret = _index.knnQueryBatch(keys, k=self._get_num_candidates(top_k, mask), num_threads=self.num_threads)
         idx, dist = zip(*ret)
-        return self.int2ext_key[np.array(idx)], np.array(dist)
+        idx, dist = self._remove_deleted(np.array(idx), np.array(dist), top_k, mask)
+        return self.int2ext_key[idx], dist
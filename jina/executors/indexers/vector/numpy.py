@@ -1,19 +1,40 @@
 __copyright__ = "Copyright (c) 2020 Jina AI Limited. All rights reserved."
 __license__ = "Apache-2.0"
 
+import glob
 import gzip
-from typing import Tuple, Optional
+import hashlib
+import json
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple, Optional, Callable, Any, Dict, Sequence, Union, Iterable
 
 import numpy as np
 from jina.executors.indexers import BaseVectorIndexer
+from jina.helper import call_obj_fn
+
+from .attribute import AttributeStore
+
+HEADER_MAGIC = b'JINAVEC1'  #: the leading bytes of an uncompressed vector file
+HEADER_FORMAT = '<8s16sQ'  #: magic, dtype name, number of dimensions
+HEADER_SIZE = 64  #: the header is padded to 64 bytes so that the first vector starts on a cache line
+#: the number of B x block arrays alive at the same time when scanning a block, i.e. the distances and the
+#: intermediate results of :func:`_euclidean`, and the distances and int64 indices concatenated by :func:`_merge_topk`
+NUM_TEMPORARIES = 4
 
 
 class NumpyIndexer(BaseVectorIndexer):
     """An exhaustive vector indexers implemented with numpy and scipy. """
 
+    store_norms = True  #: store the squared L2-norm of each vector next to the index file, see :attr:`sq_norms`
+
     def __init__(self, metric: str = 'euclidean',
                  compress_level: int = 1,
                  backend: str = 'numpy',
+                 storage: str = 'gzip',
+                 query_memory_limit: int = 256 * 1024 * 1024,
+                 num_threads: int = 1,
                  *args, **kwargs):
         """
         :param metric: The distance metric to use. `braycurtis`, `canberra`, `chebyshev`, `cityblock`, `correlation`, 
@@ -26,10 +47,44 @@ class NumpyIndexer(BaseVectorIndexer):
                         level of compression; 1 is fastest and produces the least compression,
                         and 9 is slowest and produces the most compression. 0 is no compression
                         at all. The default is 9.
+        :param storage: `gzip` or `memmap`. `gzip` stores the vectors as a compressed stream, which has to be fully
+                        decompressed into memory at the query time. `memmap` stores the vectors uncompressed in a
+                        fixed-stride binary file with a small header, which is opened via ``np.memmap`` at the query
+                        time, so that the start-up is almost instant and replicas on the same host share the
+                        page cache. ``compress_level`` is ignored in `memmap` storage.
+        :param query_memory_limit: the max size (in bytes) of the distance matrix computed at once for a query batch,
+                        the index is scanned in blocks fitting this limit. Only effective with the `numpy` backend.
+        :param num_threads: the number of threads searching the index in parallel. The stored vectors are split into
+                        ``num_threads`` partitions, each is scanned in a thread and the partial top-k are merged.
+                        numpy releases the GIL in the matrix multiplication, so the threads run on multiple cores
+                        within one pea. Only effective with the `numpy` backend.
 
         .. note::
             Metrics other than `cosine` and `euclidean` requires ``scipy`` installed.
 
+        .. note::
+            The storage format of an existing index file is detected from its header, so an index built
+            in `gzip` storage is always readable, regardless of ``storage``.
+
+        .. note::
+            The squared L2-norm of each vector is computed at the index time and stored next to the index file,
+            i.e. ``index_filename.norm``, so that `euclidean` and `cosine` distances are computed without
+            touching the stored vectors more than once per query.
+
+        .. note::
+            :func:`delete` does not rewrite the stored vectors, the deleted vectors are marked in a bitmap of
+            tombstones, i.e. ``index_filename.deleted``, and are masked out in the top-k search. Their space is
+            reclaimed by :func:`compact`.
+
+        .. note::
+            The string attributes given to :func:`add`, e.g. the tags of the documents, are stored in a columnar
+            :class:`AttributeStore` next to the index file. :func:`query` takes a ``filter`` on these attributes,
+            the vectors not matching it are masked out in the top-k search in the same way as the deleted vectors.
+
+        .. note::
+            With ``num_threads > 1``, consider limiting the threads of the BLAS library, e.g. ``OMP_NUM_THREADS=1``,
+            so that the partitions do not compete for the cores with the BLAS threads.
+
         """
         super().__init__(*args, **kwargs)
         self.num_dim = None
@@ -37,34 +92,180 @@ class NumpyIndexer(BaseVectorIndexer):
         self.metric = metric
         self.backend = backend
         self.compress_level = compress_level
-        self.key_bytes = b''
+        self.storage = storage
+        self.query_memory_limit = query_memory_limit
+        self.num_threads = num_threads
+        self.key_bytes = b''  #: only used by the indexes built with the older versions, see :attr:`keys_abspath`
         self.key_dtype = None
         self.int2ext_key = None
 
+    def post_init(self):
+        super().post_init()
+        self._sq_norms = None
+        self._thread_pool = None
+        self._tombstones = None
+        self._tombstones_mtime = None
+        self._attributes = None
+
+    @property
+    def thread_pool(self) -> 'ThreadPoolExecutor':
+        """A thread pool of ``num_threads`` workers, created on the first use """
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(max_workers=max(1, self.num_threads),
+                                                   thread_name_prefix=self.__class__.__name__)
+        return self._thread_pool
+
+    def close(self):
+        super().close()
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=True)
+            self._thread_pool = None
+
+    @property
+    def norm_abspath(self) -> str:
+        """Get the file path of the squared L2-norms of the stored vectors """
+        return self.index_abspath + '.norm'
+
+    @property
+    def keys_abspath(self) -> str:
+        """Get the file path of the keys of the stored vectors, in the same order as the vectors """
+        return self.index_abspath + '.keys'
+
+    @property
+    def deleted_abspath(self) -> str:
+        """Get the file path of the tombstones of the deleted vectors, stored as a bitmap """
+        return self.index_abspath + '.deleted'
+
+    @property
+    def attributes(self) -> 'AttributeStore':
+        """The attributes of the stored vectors, stored in ``index_filename.attr*`` """
+        if self._attributes is None:
+            self._attributes = AttributeStore(self.index_abspath)
+        return self._attributes
+
+    @property
+    def norm_dtype(self) -> 'np.dtype':
+        return np.result_type(self.dtype, np.float32)
+
+    @property
+    def sq_norms(self) -> Optional['np.ndarray']:
+        """The squared L2-norm of each stored vector, in the same order as the vectors in :attr:`query_handler`
+
+        The norms are loaded from :attr:`norm_abspath`. They are recomputed from the vectors and persisted again,
+        when the file is missing or does not match the vectors, e.g. the index is built with an older version.
+        """
+        if self._sq_norms is None and self.query_handler is not None:
+            vecs = self.query_handler
+            if os.path.exists(self.norm_abspath) and \
+                    os.path.getsize(self.norm_abspath) == vecs.shape[0] * self.norm_dtype.itemsize:
+                self._sq_norms = np.fromfile(self.norm_abspath, dtype=self.norm_dtype)
+            else:
+                self.logger.warning(f'{self.norm_abspath} is missing or outdated, recomputing the norms')
+                block_size = max(1, self.query_memory_limit // (self.num_dim * self.norm_dtype.itemsize))
+                self._sq_norms = np.concatenate(
+                    [_get_sq_norms(vecs[j:j + block_size], self.norm_dtype)
+                     for j in range(0, vecs.shape[0], block_size)] or [np.empty(0, dtype=self.norm_dtype)])
+                self._sq_norms.tofile(self.norm_abspath)
+        return self._sq_norms
+
+    @property
+    def is_memmap_file(self) -> bool:
+        """Return ``True`` when the index file exists and is in the uncompressed `memmap` format """
+        return _is_memmap_file(self.index_abspath)
+
+    @property
+    def ann_abspath(self) -> str:
+        """Get the file path of the approximate nearest neighbour index built from the vectors, used by subclasses """
+        return self.index_abspath + '.ann'
+
+    def load_ann_index(self, load_fn: Callable[[str], Any], params: Dict, append_only: bool = False) -> Optional[Any]:
+        """Load the approximate nearest neighbour index persisted by :func:`save_ann_index`
+
+        :param load_fn: the function loading the index from :attr:`ann_abspath`
+        :param params: the parameters the index is built with
+        :param append_only: accept an index built before new vectors are appended, i.e. from the first vectors only.
+            The caller must handle the appended vectors, and remove :attr:`ann_abspath` when the vectors are rewritten
+        :return: the result of ``load_fn``, ``None`` when the index is missing, or it was built from different vectors
+            or with different ``params``
+        """
+        meta_path = self.ann_abspath + '.meta'
+        if not os.path.exists(self.ann_abspath) or not os.path.exists(meta_path):
+            return None
+
+        with open(meta_path) as fp:
+            meta = json.load(fp)
+        st = os.stat(self.index_abspath)
+        if meta.get('params') != json.loads(json.dumps(params)):
+            self.logger.warning(f'{self.ann_abspath} is built with {meta.get("params")}, rebuilding it with {params}')
+            return None
+        # the appended vectors only make the file longer
+        appended = append_only and meta.get('size', st.st_size) < st.st_size
+        if not appended and (meta.get('size') != st.st_size or (
+                meta.get('mtime') != st.st_mtime_ns and meta.get('checksum') != _get_checksum(self.index_abspath))):
+            self.logger.warning(f'{self.index_abspath} has changed since {self.ann_abspath} was built, rebuilding it')
+            return None
+
+        _index = load_fn(self.ann_abspath)
+        self.logger.success(f'loaded the prebuilt index from {self.ann_abspath}')
+        return _index
+
+    def save_ann_index(self, save_fn: Callable[[str], Any], params: Dict):
+        """Persist the approximate nearest neighbour index next to the vectors, with a checksum of the vectors
+
+        :param save_fn: the function saving the index to a given file path
+        :param params: the parameters the index is built with
+        """
+        tmp_path = self.ann_abspath + '.tmp'
+        try:
+            save_fn(tmp_path)
+        except Exception as ex:
+            self.logger.error(f'failed to save the index to {self.ann_abspath}: {ex!r}')
+            return
+        # the index may be saved to multiple files sharing the same prefix
+        for f in glob.glob(glob.escape(tmp_path) + '*'):
+            os.replace(f, self.ann_abspath + f[len(tmp_path):])
+
+        st = os.stat(self.index_abspath)
+        meta = {'params': params, 'size': st.st_size, 'mtime': st.st_mtime_ns,
+                'checksum': _get_checksum(self.index_abspath)}
+        with open(self.ann_abspath + '.meta.tmp', 'w') as fp:
+            json.dump(meta, fp)
+        os.replace(self.ann_abspath + '.meta.tmp', self.ann_abspath + '.meta')
+        self.logger.success(f'saved the index to {self.ann_abspath}')
+
     def get_add_handler(self):
-        """Open a binary gzip file for adding new vectors
+        """Open a binary file for adding new vectors, the format follows the one of the existing file
 
-        :return: a gzip file stream
+        :return: a gzip file stream or a raw binary file stream
         """
+        if self.is_memmap_file:
+            return open(self.index_abspath, 'ab')
+        if self.storage == 'memmap':
+            self.logger.warning(f'{self.index_abspath} is in gzip format, new vectors are appended in gzip format '
+                                f'and storage="memmap" is only effective on a new index')
         return gzip.open(self.index_abspath, 'ab', compresslevel=self.compress_level)
 
     def get_query_handler(self) -> Optional['np.ndarray']:
-        """Open a gzip file and load it as a numpy ndarray
+        """Load the index file as a numpy ndarray
+
+        A `memmap` file is mapped read-only into the memory, a gzip file is decompressed into the memory.
 
         :return: a numpy ndarray of vectors
         """
+        vecs = None
         try:
             if self.num_dim and self.dtype:
-                with gzip.open(self.index_abspath, 'rb') as fp:
-                    vecs = np.frombuffer(fp.read(), dtype=self.dtype).reshape([-1, self.num_dim])
+                if self.is_memmap_file:
+                    vecs = self._load_memmap()
+                else:
+                    with gzip.open(self.index_abspath, 'rb') as fp:
+                        vecs = np.frombuffer(fp.read(), dtype=self.dtype).reshape([-1, self.num_dim])
         except EOFError:
             self.logger.error(
                 f'{self.index_abspath} is broken/incomplete, perhaps forgot to ".close()" in the last usage?')
             return None
 
-        if self.key_bytes and self.key_dtype:
-            self.int2ext_key = np.frombuffer(self.key_bytes, dtype=self.key_dtype)
-
+        self.int2ext_key = self._load_keys()
         if self.int2ext_key is not None and vecs is not None:
             if self.int2ext_key.shape[0] != vecs.shape[0]:
                 self.logger.error(
@@ -75,14 +276,213 @@ class NumpyIndexer(BaseVectorIndexer):
         else:
             return None
 
+    def _load_memmap(self) -> Optional['np.ndarray']:
+        with open(self.index_abspath, 'rb') as fp:
+            magic, dtype, num_dim = struct.unpack(HEADER_FORMAT, fp.read(struct.calcsize(HEADER_FORMAT)))
+        dtype = dtype.rstrip(b'\0').decode()
+        if dtype != self.dtype or num_dim != self.num_dim:
+            self.logger.error(f'the header of {self.index_abspath} says dtype={dtype} and num_dim={num_dim}, '
+                              f'but this indexer expects dtype={self.dtype} and num_dim={self.num_dim}')
+            return None
+        # ignore the trailing partial vector if the last write was interrupted
+        num_vecs = (os.path.getsize(self.index_abspath) - HEADER_SIZE) // (np.dtype(dtype).itemsize * num_dim)
+        if num_vecs <= 0:
+            return np.empty([0, num_dim], dtype=dtype)
+        return np.memmap(self.index_abspath, dtype=dtype, mode='r', offset=HEADER_SIZE, shape=(num_vecs, num_dim))
+
     def get_create_handler(self):
-        """Create a new gzip file for adding new vectors
+        """Create a new file for adding new vectors
 
-        :return: a gzip file stream
+        :return: a gzip file stream, or a raw binary file stream with the header written when ``storage='memmap'``
         """
+        for path in (self.norm_abspath, self.keys_abspath, self.deleted_abspath):
+            if os.path.exists(path):
+                os.remove(path)
+        self.attributes.remove()
+        self.key_bytes = b''
+        if self.storage == 'memmap':
+            fp = open(self.index_abspath, 'wb')
+            fp.write(_make_header(self.dtype, self.num_dim))
+            return fp
         return gzip.open(self.index_abspath, 'wb', compresslevel=self.compress_level)
 
-    def add(self, keys: 'np.ndarray', vectors: 'np.ndarray', *args, **kwargs):
+    def add(self, keys: 'np.ndarray', vectors: 'np.ndarray',
+            attributes: Dict[str, Sequence[Optional[str]]] = None, *args, **kwargs):
+        """Add the vectors and their keys to the index
+
+        :param attributes: the map from each attribute name to the values of the new vectors, ``None`` for no value,
+            which can be filtered on in :func:`query`
+        """
+        self._check_vectors(keys, vectors)
+        self._check_attributes(keys, attributes)
+        self.write_handler.write(vectors.tobytes())
+        if self.store_norms:
+            with open(self.norm_abspath, 'ab') as fp:
+                fp.write(_get_sq_norms(vectors, self.norm_dtype).tobytes())
+        self._sq_norms = None
+        with open(self.keys_abspath, 'ab') as fp:
+            if self.key_bytes:
+                # move the keys of an index built with the older versions out of the pickled executor
+                fp.write(self.key_bytes)
+                self.key_bytes = b''
+            fp.write(keys.tobytes())
+            num_rows = fp.tell() // keys.dtype.itemsize
+        self.key_dtype = keys.dtype.name
+        self.attributes.add(num_rows - keys.shape[0], attributes)
+        self._size += keys.shape[0]
+        if self._query_handler is not None:
+            # reload the file so that the new vectors are searchable right away
+            self.flush()
+            if not self.is_memmap_file:
+                # a gzip file is only readable after the write handler is closed
+                call_obj_fn(self._write_handler, 'close')
+                self._write_handler = None
+            self._query_handler = None
+
+    def update(self, keys: 'np.ndarray', vectors: 'np.ndarray',
+               attributes: Dict[str, Sequence[Optional[str]]] = None, *args, **kwargs):
+        """Replace the vectors of the existing keys, the keys that do not exist are added
+
+        The old vectors are marked as deleted via :func:`delete`, and the new vectors are appended via :func:`add`.
+        """
+        self.delete(keys)
+        self.add(keys, vectors, attributes)
+
+    def delete(self, keys: 'np.ndarray', *args, **kwargs):
+        """Mark the vectors of the given keys as deleted, the keys that do not exist are ignored
+
+        :param keys: ``chunk_id`` in 1D-ndarray
+        """
+        all_keys = self._load_keys()
+        if all_keys is None:
+            return
+        tombstones = self._get_tombstones(all_keys.shape[0])
+        if tombstones is None:
+            tombstones = np.zeros(all_keys.shape[0], dtype=bool)
+        deleted = np.isin(all_keys, keys) & ~tombstones
+        num_deleted = int(np.count_nonzero(deleted))
+        if num_deleted:
+            self._save_tombstones(tombstones | deleted)
+            self._size -= num_deleted
+            self.logger.info(f'deleted {num_deleted} vectors')
+
+    def compact(self) -> int:
+        """Rewrite the index without the deleted vectors, so that their space is reclaimed
+
+        :return: the number of removed vectors
+        """
+        # a gzip file is only readable after the write handler is closed
+        self.flush()
+        call_obj_fn(self._write_handler, 'close')
+        self._write_handler = None
+        # the raw vectors, as the query handler of the subclasses can be an approximate nearest neighbour index
+        vecs = NumpyIndexer.get_query_handler(self)
+        tombstones = self._get_tombstones(vecs.shape[0]) if vecs is not None else None
+        if tombstones is None or not tombstones.any():
+            return 0
+
+        keep = ~tombstones
+        call_obj_fn(self._query_handler, 'close')
+
+        block_size = self._get_block_size(self.num_dim, vecs.dtype.itemsize)
+        tmp_path = self.index_abspath + '.tmp'
+        if self.is_memmap_file:
+            fp = open(tmp_path, 'wb')
+            fp.write(_make_header(self.dtype, self.num_dim))
+        else:
+            fp = gzip.open(tmp_path, 'wb', compresslevel=self.compress_level)
+        with fp:
+            for j in range(0, vecs.shape[0], block_size):
+                fp.write(np.ascontiguousarray(vecs[j:j + block_size][keep[j:j + block_size]]).tobytes())
+        if os.path.exists(self.norm_abspath):
+            sq_norms = np.fromfile(self.norm_abspath, dtype=self.norm_dtype)
+            if sq_norms.shape[0] == keep.shape[0]:
+                sq_norms[keep].tofile(self.norm_abspath + '.tmp')
+                os.replace(self.norm_abspath + '.tmp', self.norm_abspath)
+            else:
+                # recomputed in the next query
+                os.remove(self.norm_abspath)
+        self.int2ext_key[keep].tofile(self.keys_abspath + '.tmp')
+        os.replace(self.keys_abspath + '.tmp', self.keys_abspath)
+        self.attributes.compact(keep)
+        self._compact_files(keep)
+        os.replace(tmp_path, self.index_abspath)
+        os.remove(self.deleted_abspath)
+
+        self.key_bytes = b''
+        self._query_handler = None
+        self._sq_norms = None
+        self._tombstones = None
+        self._tombstones_mtime = None
+        num_removed = int(np.count_nonzero(tombstones))
+        self.logger.success(f'removed {num_removed} deleted vectors from {self.index_abspath}')
+        return num_removed
+
+    def _compact_files(self, keep: 'np.ndarray'):
+        """Drop the deleted rows from the files stored next to the index by the subclasses
+
+        :param keep: a boolean mask of the rows to keep
+        """
+        pass
+
+    def _load_keys(self) -> Optional['np.ndarray']:
+        """Load the keys of all stored vectors """
+        if self.key_bytes and self.key_dtype:
+            return np.frombuffer(self.key_bytes, dtype=self.key_dtype)
+        elif self.key_dtype and os.path.exists(self.keys_abspath):
+            return np.fromfile(self.keys_abspath, dtype=self.key_dtype)
+
+    @property
+    def generation(self) -> int:
+        """A counter of the changes to the indexed data, including the deletions by the other indexers """
+        self._reload_tombstones()
+        return self._generation
+
+    def _get_tombstones(self, num_vecs: int) -> Optional['np.ndarray']:
+        """Get the tombstones of the first ``num_vecs`` stored vectors as a boolean mask, ``True`` marks a deleted
+        vector. The bitmap is reloaded when it is changed by another indexer.
+
+        :return: the mask, ``None`` when no vector is deleted
+        """
+        return _resize_mask(self._tombstones, num_vecs) if self._reload_tombstones() else None
+
+    def _reload_tombstones(self) -> bool:
+        """Reload the tombstones if the bitmap is changed by another indexer
+
+        :return: ``True`` if any vector is deleted
+        """
+        try:
+            mtime = os.stat(self.deleted_abspath).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if mtime != self._tombstones_mtime:
+            self._tombstones = _load_bitmap(self.deleted_abspath)
+            self._tombstones_mtime = mtime
+            self._generation += 1
+        return True
+
+    def _get_mask(self, num_vecs: int,
+                  filter: Dict[str, Union[str, Iterable[str]]] = None) -> Optional['np.ndarray']:
+        """Get a boolean mask of the first ``num_vecs`` stored vectors excluded from the search, i.e. the deleted
+        vectors and the vectors not matching ``filter``
+
+        :param filter: the map from each attribute name to the required value, or an iterable of accepted values,
+            see :meth:`AttributeStore.match`
+        :return: the mask, ``None`` when no vector is excluded
+        """
+        mask = self._get_tombstones(num_vecs)
+        if filter:
+            unmatched = ~self.attributes.match(filter, num_vecs)
+            mask = unmatched if mask is None else mask | unmatched
+        return mask
+
+    def _save_tombstones(self, tombstones: 'np.ndarray'):
+        _save_bitmap(self.deleted_abspath, tombstones)
+        self._tombstones = tombstones
+        self._tombstones_mtime = os.stat(self.deleted_abspath).st_mtime_ns
+
+    def _check_vectors(self, keys: 'np.ndarray', vectors: 'np.ndarray'):
+        """Check the shape and dtype of the new keys and vectors, ``num_dim`` and ``dtype`` are set on the first add """
         if len(vectors.shape) != 2:
             raise ValueError('vectors shape %s is not valid, expecting "vectors" to have rank of 2' % vectors.shape)
 
@@ -104,59 +504,286 @@ class NumpyIndexer(BaseVectorIndexer):
                 "keys' dtype %s does not match with indexers keys's dtype: %s" %
                 (keys.dtype.name, self.key_dtype))
 
-        self.write_handler.write(vectors.tobytes())
-        self.key_bytes += keys.tobytes()
-        self.key_dtype = keys.dtype.name
-        self._size += keys.shape[0]
+    def _check_attributes(self, keys: 'np.ndarray', attributes: Optional[Dict[str, Sequence[Optional[str]]]]):
+        for name, values in (attributes or {}).items():
+            if len(values) != keys.shape[0]:
+                raise ValueError('number of values of attribute "%s" %d not equal to number of keys %d' %
+                                 (name, len(values), keys.shape[0]))
 
-    def query(self, keys: np.ndarray, top_k: int, *args, **kwargs) -> Tuple['np.ndarray', 'np.ndarray']:
+    def query(self, keys: np.ndarray, top_k: int, filter: Dict[str, Union[str, Iterable[str]]] = None,
+              *args, **kwargs) -> Tuple['np.ndarray', 'np.ndarray']:
         """ Find the top-k vectors with smallest ``metric`` and return their ids.
 
+        :param filter: only the vectors whose attributes match it are searched, see :func:`_get_mask`
         :return: a tuple of two ndarray.
             The first is ids in shape B x K (`dtype=int`), the second is metric in shape B x K (`dtype=float`)
 
-        .. warning::
-            This operation is memory-consuming.
+        .. note::
+            With the `numpy` backend, the index is scanned block by block and only a running top-k is kept, so the
+            memory usage is bounded by ``query_memory_limit`` rather than growing with the size of the index.
 
             Distance (the smaller the better) is returned, not the score.
 
+        .. note::
+            When less than ``top_k`` vectors remain after the deletion or the filtering, ``K`` is the number of
+            remaining vectors.
+
         """
+        tombstones = self._get_mask(self.query_handler.shape[0], filter) if self.query_handler is not None else None
         if self.metric not in {'cosine', 'euclidean'} or self.backend == 'scipy':
             try:
                 from scipy.spatial.distance import cdist
                 dist = cdist(keys, self.query_handler, metric=self.metric)
             except ModuleNotFoundError:
                 self.logger.error(f'your metric {self.metric} requires scipy, but scipy is not found')
-        elif self.metric == 'euclidean':
-            dist = _euclidean(keys, self.query_handler)
-        elif self.metric == 'cosine':
-            dist = _cosine(keys, self.query_handler)
-
-        idx = dist.argsort(axis=1)[:, :top_k]
-        dist = np.take_along_axis(dist, idx, axis=1)
+            if tombstones is not None:
+                dist = _mask_deleted(dist, tombstones)
+            idx, dist = _trim_deleted(*_get_sorted_topk(dist, top_k), tombstones)
+        else:
+            idx, dist = self._search(keys, self.query_handler, self.sq_norms, top_k, tombstones)
         return self.int2ext_key[idx], dist
 
+    def _remove_deleted(self, idx: 'np.ndarray', dist: 'np.ndarray', top_k: int,
+                        tombstones: Optional['np.ndarray']) -> Tuple['np.ndarray', 'np.ndarray']:
+        """Remove the deleted or filtered-out vectors from the sorted results of an approximate nearest neighbour index,
+        which can not mask them out in the search. The index should be queried with :func:`_get_num_candidates` results.
+
+        :param idx: the row indices of the results in shape B x K'
+        :param tombstones: the mask of the excluded vectors given by :func:`_get_mask`
+        :return: the top-k results without the excluded vectors
+
+        .. warning::
+            The excluded vectors are removed after the search. An approximate index may return less than the
+                over-fetched candidates, e.g. when most of the vectors are filtered out, then less than ``top_k``
+                results are left although enough vectors are not excluded. A warning is logged in this case.
+        """
+        if tombstones is None:
+            return idx[:, :top_k], dist[:, :top_k]
+        # the results that are not found are marked as -1 by some libraries
+        deleted = (idx < 0) | tombstones[idx]
+        # move the deleted results to the end of each row, keeping the order of the others
+        order = np.argsort(deleted, axis=1, kind='stable')
+        num_found = min(top_k, int(np.min(np.sum(~deleted, axis=1))))
+        num_expected = min(top_k, tombstones.shape[0] - int(np.count_nonzero(tombstones)))
+        if num_found < num_expected:
+            self.logger.warning(f'only {num_found} of the top {num_expected} results are left after removing the '
+                                f'deleted or filtered-out vectors, {self.__class__.__name__} removes them after the '
+                                f'search, NumpyIndexer and SegmentNumpyIndexer mask them in the search')
+        return np.take_along_axis(idx, order, axis=1)[:, :num_found], \
+               np.take_along_axis(dist, order, axis=1)[:, :num_found]
+
+    def _get_num_candidates(self, top_k: int, tombstones: Optional['np.ndarray']) -> int:
+        """Get the number of results to query from an approximate nearest neighbour index, so that at least ``top_k``
+        results remain after :func:`_remove_deleted` """
+        num_vecs = self.int2ext_key.shape[0]
+        if tombstones is None:
+            return min(top_k, num_vecs)
+        return min(top_k + int(np.count_nonzero(tombstones)), num_vecs)
+
+    def _get_block_size(self, num_values: int, itemsize: int) -> int:
+        """Get the number of stored vectors processed at once, so that a block fits in the memory limit
+
+        :param num_values: the number of values held in the memory for each stored vector in the block
+        """
+        return max(1, self.query_memory_limit // max(1, num_values * itemsize))
+
+    def _get_search_block_size(self, queries: 'np.ndarray', vecs: 'np.ndarray') -> int:
+        """Get the number of stored vectors scanned at once by :func:`_search`. Each of them takes a column of every
+        B x block temporary, and its values and norm converted to the dtype of the queries """
+        return self._get_block_size(queries.shape[0] * NUM_TEMPORARIES + vecs.shape[1] + 1, queries.dtype.itemsize)
+
+    def _search(self, queries: 'np.ndarray', vecs: 'np.ndarray', sq_norms: 'np.ndarray',
+                top_k: int, tombstones: Optional['np.ndarray'] = None) -> Tuple['np.ndarray', 'np.ndarray']:
+        """Scan ``vecs`` in blocks and merge the top-k of each block into a running top-k. With ``num_threads > 1``,
+        ``vecs`` is split into partitions scanned in parallel, and the top-k of the partitions are merged at the end.
+
+        :param sq_norms: the squared L2-norm of each row in ``vecs``
+        :param tombstones: a boolean mask of the deleted or filtered-out rows in ``vecs``, which never get into
+            the top-k
+
+        :return: a tuple of two ndarray, the row indices of ``vecs`` in shape B x K and the distances in shape B x K
+        """
+        queries = self._prepare_queries(queries, vecs)
+
+        num_partitions = max(1, min(self.num_threads, vecs.shape[0]))
+        # the memory limit is shared by the partitions scanned at the same time
+        block_size = max(1, self._get_search_block_size(queries, vecs) // num_partitions)
+        if num_partitions == 1:
+            idx, dist = self._search_partition(queries, vecs, sq_norms, tombstones, 0, vecs.shape[0], block_size,
+                                               top_k)
+        else:
+            bounds = np.linspace(0, vecs.shape[0], num_partitions + 1).astype(np.int64)
+            results = list(self.thread_pool.map(
+                lambda p: self._search_partition(queries, vecs, sq_norms, tombstones, p[0], p[1], block_size, top_k),
+                zip(bounds[:-1], bounds[1:])))
+            idx = np.concatenate([r[0] for r in results], axis=1)
+            dist = np.concatenate([r[1] for r in results], axis=1)
+        return _trim_deleted(*_get_sorted_topk(dist, top_k, idx), tombstones)
+
+    def _search_partition(self, queries: 'np.ndarray', vecs: 'np.ndarray', sq_norms: 'np.ndarray',
+                          tombstones: Optional['np.ndarray'], start: int, end: int, block_size: int,
+                          top_k: int) -> Tuple['np.ndarray', 'np.ndarray']:
+        """Scan the rows ``start:end`` of ``vecs`` in blocks, and return the unsorted top-k of these rows """
+        idx = np.empty([queries.shape[0], 0], dtype=np.int64)
+        dist = np.empty([queries.shape[0], 0], dtype=queries.dtype)
+        for b_start in range(start, end, block_size):
+            b_end = min(b_start + block_size, end)
+            if tombstones is not None and tombstones[b_start:b_end].all():
+                # none of the rows can get into the top-k, e.g. they are filtered out
+                continue
+            _dist = self._get_distance(queries, vecs, sq_norms, b_start, b_end)
+            if tombstones is not None:
+                _dist = _mask_deleted(_dist, tombstones[b_start:b_end])
+            idx, dist = _merge_topk(idx, dist, b_start, _dist, top_k)
+        return idx, dist
+
+    def _prepare_queries(self, queries: 'np.ndarray', vecs: 'np.ndarray') -> 'np.ndarray':
+        """Convert the queries into the form taken by :func:`_get_distance` """
+        queries = queries.astype(np.result_type(vecs.dtype, np.float32), copy=False)
+        if self.metric == 'cosine':
+            queries = _normalize(queries)
+        return queries
+
+    def _get_distance(self, queries: 'np.ndarray', vecs: 'np.ndarray', sq_norms: 'np.ndarray',
+                      start: int, end: int) -> 'np.ndarray':
+        """Compute the distances between the queries and the rows ``start:end`` of ``vecs`` """
+        block = np.asarray(vecs[start:end], dtype=queries.dtype)
+        block_sq_norms = np.asarray(sq_norms[start:end], dtype=queries.dtype)
+        if self.metric == 'cosine':
+            return _cosine(queries, block, block_sq_norms)
+        return _euclidean(queries, block, block_sq_norms)
+
+
+def _get_topk(dist: 'np.ndarray', top_k: int) -> 'np.ndarray':
+    """Get the (unsorted) column indices of the ``top_k`` smallest values in each row, in O(N) via ``argpartition`` """
+    if top_k >= dist.shape[1]:
+        return np.broadcast_to(np.arange(dist.shape[1]), dist.shape)
+    return np.argpartition(dist, top_k - 1, axis=1)[:, :top_k]
+
+
+def _get_sorted_topk(dist: 'np.ndarray', top_k: int, idx: 'np.ndarray' = None) -> Tuple['np.ndarray', 'np.ndarray']:
+    """Get the ``top_k`` smallest values in each row sorted in ascending order, and their indices
+
+    :param idx: the indices of ``dist``, if not given then the column indices are used
+    """
+    _idx = _get_topk(dist, top_k)
+    dist = np.take_along_axis(dist, _idx, axis=1)
+    _order = dist.argsort(axis=1)
+    dist = np.take_along_axis(dist, _order, axis=1)
+    _idx = np.take_along_axis(_idx, _order, axis=1)
+    if idx is not None:
+        _idx = np.take_along_axis(idx, _idx, axis=1)
+    return _idx, dist
+
+
+def _merge_topk(idx: 'np.ndarray', dist: 'np.ndarray', offset: int, new_dist: 'np.ndarray',
+                top_k: int) -> Tuple['np.ndarray', 'np.ndarray']:
+    """Merge a block of distances, whose first column corresponds to the ``offset``-th vector, into a running top-k """
+    _idx = np.concatenate([idx, np.broadcast_to(np.arange(offset, offset + new_dist.shape[1]),
+                                                new_dist.shape)], axis=1)
+    _dist = np.concatenate([dist, new_dist], axis=1)
+    _topk = _get_topk(_dist, top_k)
+    return np.take_along_axis(_idx, _topk, axis=1), np.take_along_axis(_dist, _topk, axis=1)
+
+
+def _mask_deleted(dist: 'np.ndarray', deleted: 'np.ndarray') -> 'np.ndarray':
+    """Set the distances to the deleted vectors (the columns) to the largest value, so that they never get into the
+    top-k before a vector that is not deleted """
+    if deleted.any():
+        dist[:, deleted] = np.inf if np.issubdtype(dist.dtype, np.floating) else np.iinfo(dist.dtype).max
+    return dist
+
+
+def _trim_deleted(idx: 'np.ndarray', dist: 'np.ndarray',
+                  tombstones: Optional['np.ndarray']) -> Tuple['np.ndarray', 'np.ndarray']:
+    """Remove the deleted vectors from the sorted top-k, they can only be there when less than ``top_k`` vectors
+    are not deleted """
+    if tombstones is not None:
+        num_vecs = tombstones.shape[0] - int(np.count_nonzero(tombstones))
+        if num_vecs < idx.shape[1]:
+            return idx[:, :num_vecs], dist[:, :num_vecs]
+    return idx, dist
+
+
+def _load_bitmap(path: str) -> 'np.ndarray':
+    return np.unpackbits(np.fromfile(path, dtype=np.uint8), bitorder='little').astype(bool)
+
+
+def _save_bitmap(path: str, mask: 'np.ndarray'):
+    """Save a boolean mask as a bitmap, the file is replaced atomically """
+    np.packbits(mask, bitorder='little').tofile(path + '.tmp')
+    os.replace(path + '.tmp', path)
+
+
+def _resize_mask(mask: 'np.ndarray', size: int) -> 'np.ndarray':
+    """Truncate or pad a boolean mask with ``False`` to ``size``, the bitmap is padded to bytes and the vectors added
+    after the last deletion are not in the bitmap """
+    if mask.shape[0] >= size:
+        return mask[:size]
+    return np.concatenate([mask, np.zeros(size - mask.shape[0], dtype=bool)])
+
+
+def _make_header(dtype: str, num_dim: int) -> bytes:
+    return struct.pack(HEADER_FORMAT, HEADER_MAGIC, dtype.encode(), num_dim).ljust(HEADER_SIZE, b'\0')
+
+
+def _get_checksum(path: str, block_size: int = 1 << 24) -> str:
+    h = hashlib.md5()
+    with open(path, 'rb') as fp:
+        for b in iter(lambda: fp.read(block_size), b''):
+            h.update(b)
+    return h.hexdigest()
+
+
+def _is_memmap_file(path: str) -> bool:
+    if not os.path.exists(path):
+        return False
+    with open(path, 'rb') as fp:
+        return fp.read(len(HEADER_MAGIC)) == HEADER_MAGIC
+
+
+def _normalize(A: 'np.ndarray') -> 'np.ndarray':
+    return A / np.linalg.norm(A, ord=2, axis=1, keepdims=True)
+
+
+def _get_sq_norms(A: 'np.ndarray', dtype) -> 'np.ndarray':
+    A = np.asarray(A, dtype=dtype)
+    return np.einsum('ij,ij->i', A, A)
+
+
+def _euclidean(A: 'np.ndarray', B: 'np.ndarray', B_sq_norm: 'np.ndarray') -> 'np.ndarray':
+    """Compute the euclidean distance between ``A`` (B x D) and ``B`` (N x D) with a single GEMM
+
+    :param B_sq_norm: the squared L2-norm of each row of ``B``, in shape N
+    """
+    sqdist = np.einsum('ij,ij->i', A, A)[:, None] - 2 * A.dot(B.T) + B_sq_norm[None, :]
+    return np.sqrt(sqdist.clip(min=0))
+
 
-def _ext_arrs(A, B):
-    nA, dim = A.shape
-    A_ext = np.ones((nA, dim * 3))
-    A_ext[:, dim:2 * dim] = A
-    A_ext[:, 2 * dim:] = A ** 2
+def _cosine(A_norm: 'np.ndarray', B: 'np.ndarray', B_sq_norm: 'np.ndarray') -> 'np.ndarray':
+    """Compute the cosine distance between the L2-normalized ``A_norm`` (B x D) and ``B`` (N x D) with a single GEMM,
+    ``B`` is normalized on the result via its norms rather than being copied
 
-    nB = B.shape[0]
-    B_ext = np.ones((dim * 3, nB))
-    B_ext[:dim] = (B ** 2).T
-    B_ext[dim:2 * dim] = -2.0 * B.T
-    return A_ext, B_ext
+    :param B_sq_norm: the squared L2-norm of each row of ``B``, in shape N
+    """
+    return (1 - A_norm.dot(B.T) / np.sqrt(B_sq_norm)[None, :]).clip(min=0)
 
 
-def _euclidean(A, B):
-    A_ext, B_ext = _ext_arrs(A, B)
-    sqdist = A_ext.dot(B_ext).clip(min=0)
-    return np.sqrt(sqdist)
+def _sq_euclidean(A: 'np.ndarray', B: 'np.ndarray') -> 'np.ndarray':
+    sqdist = np.einsum('ij,ij->i', A, A)[:, None] - 2 * A.dot(B.T) + np.einsum('ij,ij->i', B, B)[None, :]
+    return sqdist.clip(min=0)
 
 
-def _cosine(A, B):
-    A_ext, B_ext = _ext_arrs(A / np.linalg.norm(A, ord=2, axis=1, keepdims=True),
-                             B / np.linalg.norm(B, ord=2, axis=1, keepdims=True))
-    return A_ext.dot(B_ext).clip(min=0) / 2
+def _kmeans(data: 'np.ndarray', num_centroids: int, num_iters: int, rng: 'np.random.RandomState') -> 'np.ndarray':
+    """Lloyd's k-means, the empty clusters are re-seeded with random vectors """
+    centroids = data[rng.choice(data.shape[0], num_centroids, replace=False)].copy()
+    for _ in range(num_iters):
+        assign = _sq_euclidean(data, centroids).argmin(axis=1)
+        counts = np.bincount(assign, minlength=num_centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, data)
+        empty = counts == 0
+        centroids[~empty] = sums[~empty] / counts[~empty, None]
+        if np.any(empty):
+            centroids[empty] = data[rng.choice(data.shape[0], int(np.sum(empty)))]
+    return centroids
@@ -0,0 +1,195 @@
+__copyright__ = "Copyright (c) 2020 Jina AI Limited. All rights reserved."
+__license__ = "Apache-2.0"
+
+import os
+from typing import Tuple, Optional, Dict, Union, Iterable
+
+import numpy as np
+
+from .numpy import NumpyIndexer, _get_sorted_topk, _merge_topk, _normalize, _sq_euclidean, _kmeans, _mask_deleted, \
+    _trim_deleted
+from ...decorators import require_train
+
+
+class PQIndexer(NumpyIndexer):
+    """A product-quantization vector indexer implemented with numpy.
+
+    Each vector is split into ``num_subspaces`` sub-vectors, and each sub-vector is encoded as the id of its nearest
+    centroid in the codebook of the subspace, i.e. one ``uint8`` per subspace. In the query time, only the codes are
+    loaded into memory, which takes ``num_subspaces`` bytes per vector instead of ``4 * num_dim`` bytes for
+    ``float32``. The distances are approximated by summing up the lookup tables of the query-to-centroid distances,
+    a.k.a. asymmetric distance computation.
+
+    The codebooks must be trained via :func:`train` with k-means before the first :func:`add`, on a sample of at
+    least ``num_centroids`` vectors.
+
+    .. note::
+        The raw vectors are still stored in ``index_filename`` as :class:`NumpyIndexer` does, but they are only read
+        when ``rerank_top_k`` is set. In that case, the top ``rerank_top_k`` candidates by the approximated distance are
+        re-ranked by the exact distance computed from the memory-mapped raw vectors.
+
+    .. note::
+        The codes are stored next to the vectors, i.e. ``index_filename.codes``.
+    """
+
+    store_norms = False
+
+    def __init__(self, num_subspaces: int = 8, num_centroids: int = 256, num_iters: int = 20,
+                 rerank_top_k: int = 0, storage: str = 'memmap', *args, **kwargs):
+        """
+        :param num_subspaces: the number of subspaces, i.e. the number of bytes of the code of each vector,
+            ``num_dim`` must be divisible by it
+        :param num_centroids: the number of centroids in each subspace, at most 256
+        :param num_iters: the number of k-means iterations when training the codebooks
+        :param rerank_top_k: the number of candidates re-ranked by the exact distance, ``0`` disables the re-ranking
+        :param storage: the storage of the raw vectors, see :class:`NumpyIndexer`
+        """
+        super().__init__(storage=storage, *args, **kwargs)
+        if self.metric not in {'euclidean', 'cosine'}:
+            raise ValueError(f'{self.__class__.__name__} only supports "euclidean" and "cosine", not {self.metric}')
+        if not 0 < num_centroids <= 256:
+            raise ValueError(f'num_centroids must be in (0, 256], got {num_centroids}')
+        self.num_subspaces = num_subspaces
+        self.num_centroids = num_centroids
+        self.num_iters = num_iters
+        self.rerank_top_k = rerank_top_k
+        self.codebooks = None  # type: Optional[np.ndarray]
+        self.is_trained = False
+
+    def post_init(self):
+        super().post_init()
+        self._codes = None
+
+    @property
+    def codes_abspath(self) -> str:
+        """Get the file path of the codes of the stored vectors """
+        return self.index_abspath + '.codes'
+
+    @property
+    def codes(self) -> Optional['np.ndarray']:
+        """The ``uint8`` codes of the stored vectors in shape N x ``num_subspaces``, loaded into memory once """
+        if self._codes is None and self.codebooks is not None and os.path.exists(self.codes_abspath):
+            codes = np.fromfile(self.codes_abspath, dtype=np.uint8).reshape([-1, self.num_subspaces])
+            keys = self._load_keys()
+            num_keys = keys.shape[0] if keys is not None else 0
+            if codes.shape[0] != num_keys:
+                self.logger.error(f'the number of codes and keys are inconsistent ({codes.shape[0]} != {num_keys}), '
+                                  f'did you write to this index twice?')
+                return None
+            self._codes = codes
+        return self._codes
+
+    def train(self, data: 'np.ndarray', *args, **kwargs):
+        """Train the codebooks with k-means in each subspace
+
+        :param data: a `B x D` numpy ``ndarray`` of training vectors
+        """
+        if data.shape[1] % self.num_subspaces:
+            raise ValueError(f'the dimension {data.shape[1]} is not divisible by num_subspaces={self.num_subspaces}')
+        data = self._preprocess(data)
+        num_centroids = min(self.num_centroids, data.shape[0])
+        if num_centroids < self.num_centroids:
+            self.logger.warning(f'only {data.shape[0]} vectors are given, {num_centroids} centroids are trained '
+                                f'instead of {self.num_centroids}')
+        rng = np.random.RandomState(0)
+        self.codebooks = np.stack([_kmeans(sub, num_centroids, self.num_iters, rng)
+                                   for sub in self._split(data)])
+        self._codes = None
+        self.is_trained = True
+        self.logger.success(f'trained {self.num_subspaces} codebooks with {num_centroids} centroids '
+                            f'from {data.shape[0]} vectors')
+
+    def get_create_handler(self):
+        if os.path.exists(self.codes_abspath):
+            os.remove(self.codes_abspath)
+        return super().get_create_handler()
+
+    @require_train
+    def add(self, keys: 'np.ndarray', vectors: 'np.ndarray', *args, **kwargs):
+        super().add(keys, vectors, *args, **kwargs)
+        with open(self.codes_abspath, 'ab') as fp:
+            fp.write(self._encode(vectors).tobytes())
+        self._codes = None
+
+    def query(self, keys: 'np.ndarray', top_k: int, filter: Dict[str, Union[str, Iterable[str]]] = None,
+              *args, **kwargs) -> Tuple['np.ndarray', 'np.ndarray']:
+        """ Find the top-k vectors with smallest ``metric`` and return their ids.
+
+        :return: a tuple of two ndarray.
+            The first is ids in shape B x K (`dtype=int`), the second is metric in shape B x K (`dtype=float`)
+
+        .. note::
+            Without re-ranking, the returned distances are approximated.
+
+        :param filter: only the vectors whose attributes match it are searched, see :func:`_get_mask`
+        """
+        codes = self.codes
+        if codes is None or self.query_handler is None:
+            return np.empty([keys.shape[0], 0], dtype=np.int64), np.empty([keys.shape[0], 0], dtype=np.float32)
+
+        queries = self._preprocess(keys)
+        num_candidates = max(top_k, self.rerank_top_k)
+        idx, dist = self._search_codes(queries, codes, num_candidates, self._get_mask(codes.shape[0], filter))
+        if self.rerank_top_k > top_k:
+            idx, dist = self._rerank(queries, idx, top_k)
+        elif self.metric == 'euclidean':
+            dist = np.sqrt(dist)
+        else:
+            dist = dist / 2
+        return self.int2ext_key[idx], dist
+
+    def _search_codes(self, queries: 'np.ndarray', codes: 'np.ndarray', top_k: int,
+                      tombstones: Optional['np.ndarray'] = None) -> Tuple['np.ndarray', 'np.ndarray']:
+        """Scan the codes in blocks with the lookup tables, and keep a running top-k of the squared L2 distances
+
+        :param tombstones: a boolean mask of the deleted or filtered-out vectors, which never get into the top-k
+        """
+        # tables[b, m, k] is the squared distance from the m-th sub-vector of the b-th query to the k-th centroid
+        tables = np.stack([_sq_euclidean(sub, cb) for sub, cb in zip(self._split(queries), self.codebooks)], axis=1)
+        subspaces = np.arange(self.num_subspaces)
+        block_size = self._get_block_size(queries.shape[0] * self.num_subspaces, tables.dtype.itemsize)
+
+        idx = np.empty([queries.shape[0], 0], dtype=np.int64)
+        dist = np.empty([queries.shape[0], 0], dtype=tables.dtype)
+        for start in range(0, codes.shape[0], block_size):
+            block = codes[start:start + block_size]
+            _dist = tables[:, subspaces[None, :], block].sum(axis=2)
+            if tombstones is not None:
+                _dist = _mask_deleted(_dist, tombstones[start:start + block_size])
+            idx, dist = _merge_topk(idx, dist, start, _dist, top_k)
+        return _trim_deleted(*_get_sorted_topk(dist, top_k, idx), tombstones)
+
+    def _rerank(self, queries: 'np.ndarray', idx: 'np.ndarray', top_k: int) -> Tuple['np.ndarray', 'np.ndarray']:
+        """Compute the exact distances of the candidates from the raw vectors, and keep the top-k """
+        # reading the rows in the order of the file is friendlier to the page cache of the memmap
+        rows, inv = np.unique(idx, return_inverse=True)
+        vecs = np.asarray(self.query_handler[rows], dtype=queries.dtype)
+        if self.metric == 'cosine':
+            vecs = _normalize(vecs)
+            dist = 1 - np.einsum('ij,ikj->ik', queries, vecs[inv.reshape(idx.shape)])
+        else:
+            dist = np.linalg.norm(queries[:, None, :] - vecs[inv.reshape(idx.shape)], axis=2)
+        return _get_sorted_topk(dist.clip(min=0), top_k, idx)
+
+    def _compact_files(self, keep: 'np.ndarray'):
+        codes = np.fromfile(self.codes_abspath, dtype=np.uint8).reshape([-1, self.num_subspaces])
+        if codes.shape[0] == keep.shape[0]:
+            codes[keep].tofile(self.codes_abspath)
+        else:
+            self.logger.error(f'the number of codes and keys are inconsistent ({codes.shape[0]} != {keep.shape[0]}), '
+                              f'{self.codes_abspath} is not compacted')
+        self._codes = None
+
+    def _preprocess(self, vectors: 'np.ndarray') -> 'np.ndarray':
+        vectors = vectors.astype(np.float32, copy=False)
+        return _normalize(vectors) if self.metric == 'cosine' else vectors
+
+    def _split(self, vectors: 'np.ndarray'):
+        return np.split(vectors, self.num_subspaces, axis=1)
+
+    def _encode(self, vectors: 'np.ndarray') -> 'np.ndarray':
+        """Encode the vectors as the ids of the nearest centroids in each subspace """
+        return np.stack([_sq_euclidean(sub, cb).argmin(axis=1)
+                         for sub, cb in zip(self._split(self._preprocess(vectors)), self.codebooks)],
+                        axis=1).astype(np.uint8)
+
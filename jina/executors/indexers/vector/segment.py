@@ -0,0 +1,350 @@
+__copyright__ = "Copyright (c) 2020 Jina AI Limited. All rights reserved."
+__license__ = "Apache-2.0"
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Tuple, Optional, List, NamedTuple, Dict, Sequence, Union, Iterable
+
+import numpy as np
+
+from .attribute import AttributeStore
+from .numpy import NumpyIndexer, HEADER_SIZE, _make_header, _get_sq_norms, _get_sorted_topk, _load_bitmap, \
+    _save_bitmap, _resize_mask
+
+
+class Segment(NamedTuple):
+    """An immutable segment of the vectors, their keys, squared L2-norms and attributes, only the tombstones can be
+    changed """
+    id: int
+    vecs: 'np.ndarray'
+    keys: 'np.ndarray'
+    sq_norms: 'np.ndarray'
+    tombstones: Optional['np.ndarray'] = None
+    attributes: Optional['AttributeStore'] = None
+
+    @property
+    def size(self) -> int:
+        return self.keys.shape[0]
+
+    @property
+    def num_deleted(self) -> int:
+        return int(np.count_nonzero(self.tombstones)) if self.tombstones is not None else 0
+
+
+class SegmentNumpyIndexer(NumpyIndexer):
+    """An exhaustive vector indexer storing the vectors in append-only segments.
+
+    Each :func:`add` writes the vectors, keys and norms as a new immutable segment, i.e.
+    ``index_filename.000001.vec``, ``index_filename.000001.keys`` and ``index_filename.000001.norm``, and registers
+    it in the segment list in ``index_filename``. A new segment is queryable right after :func:`add` returns, by
+    the same indexer, and by any other indexer loaded from the same workspace, which reloads the segment list when
+    it has changed. So that one can keep indexing and serving from the same deployment.
+
+    As many small segments slow down the query, the segments smaller than ``min_segment_size`` are merged into one
+    segment by :func:`compact`, which runs in a background thread after :func:`add` when there are more than
+    ``max_segments`` segments. The queries and new segments are not blocked by the compaction.
+
+    :func:`delete` marks the deleted vectors in the tombstones of each segment, i.e. ``index_filename.000001.deleted``.
+    The segments with deleted vectors are always rewritten by :func:`compact`, so that their space is reclaimed. The
+    compaction also starts after :func:`delete` when more than half of the stored vectors are deleted.
+
+    The attributes of the vectors are stored in an :class:`AttributeStore` per segment, i.e.
+    ``index_filename.000001.attr*``, and are carried over to the merged segment by the compaction.
+
+    .. note::
+        The vectors are searched in the same way as :class:`NumpyIndexer` with ``storage='memmap'``, so only the
+        `numpy` backend, i.e. `euclidean` and `cosine`, is supported.
+    """
+
+    def __init__(self, min_segment_size: int = 10000, max_segments: int = 16,
+                 compact_in_background: bool = True, *args, **kwargs):
+        """
+        :param min_segment_size: the segments with fewer vectors are merged by the compaction
+        :param max_segments: the compaction starts when there are more segments than this number
+        :param compact_in_background: run the compaction in a background thread, otherwise it runs at the end
+            of :func:`add`
+        """
+        super().__init__(*args, **kwargs)
+        if self.metric not in {'euclidean', 'cosine'}:
+            raise ValueError(f'{self.__class__.__name__} only supports "euclidean" and "cosine", not {self.metric}')
+        self.min_segment_size = min_segment_size
+        self.max_segments = max_segments
+        self.compact_in_background = compact_in_background
+
+    def post_init(self):
+        super().post_init()
+        self._segments = []  # type: List[Segment]
+        self._next_segment_id = 0
+        self._manifest_mtime = None
+        self._lock = threading.RLock()
+        self._compact_lock = threading.Lock()
+        self._compact_pool = None
+        self._compact_future = None  # type: Optional[Future]
+
+    @property
+    def segments(self) -> List['Segment']:
+        """The current list of the segments, reloaded from ``index_filename`` when it was changed by another
+        indexer. The returned list is a snapshot, it is not affected by the later :func:`add` and :func:`compact` """
+        with self._lock:
+            self._refresh()
+            return list(self._segments)
+
+    @property
+    def size(self) -> int:
+        """The number of vectors that are not deleted in all segments, including those added by the other indexers """
+        with self._lock:
+            self._refresh()
+            return self._size
+
+    @property
+    def generation(self) -> int:
+        """A counter of the changes to the indexed data, including those by the other indexers """
+        with self._lock:
+            self._refresh()
+            return self._generation
+
+    def get_query_handler(self) -> List['Segment']:
+        return self.segments
+
+    def get_add_handler(self):
+        pass
+
+    def get_create_handler(self):
+        pass
+
+    def segment_abspath(self, segment_id: int) -> str:
+        """Get the file path prefix of a segment """
+        return f'{self.index_abspath}.{segment_id:06d}'
+
+    def add(self, keys: 'np.ndarray', vectors: 'np.ndarray',
+            attributes: Dict[str, Sequence[Optional[str]]] = None, *args, **kwargs):
+        self._check_vectors(keys, vectors)
+        self._check_attributes(keys, attributes)
+        self.key_dtype = keys.dtype.name
+        with self._lock:
+            # pick up the segments written by the other indexers before allocating the id
+            self._refresh()
+            segment_id = self._next_segment_id
+            self._next_segment_id += 1
+        segment = self._write_segment(segment_id, [(keys, vectors, attributes)])
+        with self._lock:
+            self._segments.append(segment)
+            self._save_manifest()
+            self._size = sum(s.size - s.num_deleted for s in self._segments)
+        self.logger.info(f'added segment {segment_id} with {segment.size} vectors')
+        self._maybe_compact()
+
+    def delete(self, keys: 'np.ndarray', *args, **kwargs):
+        """Mark the vectors of the given keys as deleted in all segments, the keys that do not exist are ignored
+
+        :param keys: ``chunk_id`` in 1D-ndarray
+        """
+        num_deleted = 0
+        with self._lock:
+            self._refresh()
+            for j, s in enumerate(self._segments):
+                tombstones = s.tombstones if s.tombstones is not None else np.zeros(s.size, dtype=bool)
+                deleted = np.isin(s.keys, keys) & ~tombstones
+                if deleted.any():
+                    self._segments[j] = s._replace(tombstones=tombstones | deleted)
+                    _save_bitmap(self.segment_abspath(s.id) + '.deleted', self._segments[j].tombstones)
+                    num_deleted += int(np.count_nonzero(deleted))
+            if num_deleted:
+                # the segment list is rewritten so that the other indexers reload the tombstones
+                self._save_manifest()
+                self._size = sum(s.size - s.num_deleted for s in self._segments)
+        if num_deleted:
+            self.logger.info(f'deleted {num_deleted} vectors')
+            self._maybe_compact()
+
+    def _maybe_compact(self):
+        if self._need_compaction():
+            if self.compact_in_background:
+                if self._compact_future is None or self._compact_future.done():
+                    self._compact_future = self.compact_pool.submit(self.compact)
+            else:
+                self.compact()
+
+    @property
+    def compact_pool(self) -> 'ThreadPoolExecutor':
+        """A single-thread pool running the compaction, created on the first use """
+        if self._compact_pool is None:
+            self._compact_pool = ThreadPoolExecutor(max_workers=1,
+                                                    thread_name_prefix=f'{self.__class__.__name__}-compact')
+        return self._compact_pool
+
+    def compact(self) -> int:
+        """Merge the segments smaller than ``min_segment_size`` and the segments with deleted vectors into one segment,
+        the deleted vectors are dropped
+
+        :return: the number of merged segments
+        """
+        with self._compact_lock:
+            segments = [s for s in self.segments if s.size < self.min_segment_size or s.num_deleted]
+            if len(segments) < 2 and not any(s.num_deleted for s in segments):
+                return 0
+            with self._lock:
+                segment_id = self._next_segment_id
+                self._next_segment_id += 1
+            data = []
+            for s in segments:
+                attributes = s.attributes.get(s.size) if s.attributes is not None else None
+                if s.tombstones is None:
+                    data.append((s.keys, s.vecs, attributes))
+                else:
+                    keep = ~s.tombstones
+                    data.append((s.keys[keep], s.vecs[keep], {k: v[keep] for k, v in (attributes or {}).items()}))
+            merged = self._write_segment(segment_id, data) if sum(k.shape[0] for k, _, _ in data) else None
+            with self._lock:
+                if merged is not None:
+                    merged = self._delete_late(merged, segments)
+                # the segments added during the compaction are kept
+                merged_ids = {s.id for s in segments}
+                self._segments = [s for s in self._segments if s.id not in merged_ids] + ([merged] if merged else [])
+                self._save_manifest()
+                self._size = sum(s.size - s.num_deleted for s in self._segments)
+            for s in segments:
+                self._remove_segment(s.id)
+            self.logger.success(f'merged {len(segments)} segments into segment {segment_id} with '
+                                f'{merged.size if merged else 0} vectors')
+            return len(segments)
+
+    def _delete_late(self, merged: 'Segment', segments: List['Segment']) -> 'Segment':
+        """Delete the vectors that are deleted from ``segments`` during the compaction again from ``merged`` """
+        current = {s.id: s for s in self._segments}
+        late_keys = []
+        for s in segments:
+            c = current[s.id]
+            if c.num_deleted > s.num_deleted:
+                late_keys.append(c.keys[c.tombstones if s.tombstones is None else c.tombstones & ~s.tombstones])
+        if not late_keys:
+            return merged
+        tombstones = np.isin(merged.keys, np.concatenate(late_keys))
+        _save_bitmap(self.segment_abspath(merged.id) + '.deleted', tombstones)
+        return merged._replace(tombstones=tombstones)
+
+    def query(self, keys: 'np.ndarray', top_k: int, filter: Dict[str, Union[str, Iterable[str]]] = None,
+              *args, **kwargs) -> Tuple['np.ndarray', 'np.ndarray']:
+        """ Find the top-k vectors with smallest ``metric`` in all segments and return their ids.
+
+        :param filter: only the vectors whose attributes match it are searched, see :meth:`AttributeStore.match`
+        :return: a tuple of two ndarray.
+            The first is ids in shape B x K (`dtype=int`), the second is metric in shape B x K (`dtype=float`)
+        """
+        all_idx, all_dist = [], []
+        for s in self.segments:
+            mask = s.tombstones
+            if filter:
+                unmatched = ~s.attributes.match(filter, s.size)
+                mask = unmatched if mask is None else mask | unmatched
+            if mask is None or not mask.all():
+                idx, dist = self._search(keys, s.vecs, s.sq_norms, top_k, mask)
+                all_idx.append(s.keys[idx])
+                all_dist.append(dist)
+        if not all_idx:
+            return np.empty([keys.shape[0], 0], dtype=np.int64), np.empty([keys.shape[0], 0], dtype=np.float32)
+        return _get_sorted_topk(np.concatenate(all_dist, axis=1), top_k, np.concatenate(all_idx, axis=1))
+
+    def close(self):
+        if self._compact_future is not None:
+            self._compact_future.result()
+            self._compact_future = None
+        if self._compact_pool is not None:
+            self._compact_pool.shutdown(wait=True)
+            self._compact_pool = None
+        super().close()
+
+    def _need_compaction(self) -> bool:
+        with self._lock:
+            too_many = len(self._segments) > self.max_segments and \
+                       sum(s.size < self.min_segment_size for s in self._segments) > 1
+            # more than half of the stored vectors are deleted
+            too_sparse = 2 * sum(s.num_deleted for s in self._segments) > sum(s.size for s in self._segments)
+            return too_many or too_sparse
+
+    def _write_segment(self, segment_id: int,
+                       data: List[Tuple['np.ndarray', 'np.ndarray', Optional[Dict[str, Sequence]]]]) -> 'Segment':
+        """Write the keys, vectors and attributes into a new segment, the files are renamed into place once they are
+        complete """
+        prefix = self.segment_abspath(segment_id)
+        attributes = AttributeStore(prefix)
+        # the leftover of an interrupted write
+        attributes.remove()
+        num_rows = 0
+        with open(prefix + '.vec.tmp', 'wb') as fv, open(prefix + '.keys.tmp', 'wb') as fk, \
+                open(prefix + '.norm.tmp', 'wb') as fn:
+            fv.write(_make_header(self.dtype, self.num_dim))
+            for keys, vectors, attrs in data:
+                fv.write(np.ascontiguousarray(vectors).tobytes())
+                fk.write(np.asarray(keys, dtype=self.key_dtype).tobytes())
+                fn.write(_get_sq_norms(vectors, self.norm_dtype).tobytes())
+                attributes.add(num_rows, attrs)
+                num_rows += keys.shape[0]
+        for ext in ('.vec', '.keys', '.norm'):
+            os.replace(prefix + ext + '.tmp', prefix + ext)
+        return self._load_segment(segment_id)
+
+    def _load_segment(self, segment_id: int) -> 'Segment':
+        prefix = self.segment_abspath(segment_id)
+        keys = np.fromfile(prefix + '.keys', dtype=self.key_dtype)
+        if keys.shape[0]:
+            vecs = np.memmap(prefix + '.vec', dtype=self.dtype, mode='r', offset=HEADER_SIZE,
+                             shape=(keys.shape[0], self.num_dim))
+            sq_norms = np.memmap(prefix + '.norm', dtype=self.norm_dtype, mode='r', shape=(keys.shape[0],))
+        else:
+            vecs = np.empty([0, self.num_dim], dtype=self.dtype)
+            sq_norms = np.empty([0], dtype=self.norm_dtype)
+        return Segment(segment_id, vecs, keys, sq_norms, self._load_tombstones(segment_id, keys.shape[0]),
+                       AttributeStore(prefix))
+
+    def _load_tombstones(self, segment_id: int, size: int) -> Optional['np.ndarray']:
+        path = self.segment_abspath(segment_id) + '.deleted'
+        if os.path.exists(path):
+            return _resize_mask(_load_bitmap(path), size)
+
+    def _remove_segment(self, segment_id: int):
+        # the segment may still be read by a running query, which keeps its memory map valid on POSIX
+        for ext in ('.vec', '.keys', '.norm', '.deleted'):
+            path = self.segment_abspath(segment_id) + ext
+            if ext == '.deleted' and not os.path.exists(path):
+                continue
+            try:
+                os.remove(path)
+            except OSError as ex:
+                self.logger.warning(f'failed to remove {path}: {ex!r}')
+        try:
+            AttributeStore(self.segment_abspath(segment_id)).remove()
+        except OSError as ex:
+            self.logger.warning(f'failed to remove the attributes of segment {segment_id}: {ex!r}')
+
+    def _save_manifest(self):
+        tmp_path = self.index_abspath + '.tmp'
+        with open(tmp_path, 'w') as fp:
+            json.dump({'segments': [s.id for s in self._segments], 'next_id': self._next_segment_id}, fp)
+        os.replace(tmp_path, self.index_abspath)
+        self._manifest_mtime = os.stat(self.index_abspath).st_mtime_ns
+
+    def _refresh(self):
+        """Reload the segment list if ``index_filename`` was changed by another indexer """
+        if not os.path.exists(self.index_abspath):
+            return
+        mtime = os.stat(self.index_abspath).st_mtime_ns
+        if mtime == self._manifest_mtime:
+            return
+        with open(self.index_abspath) as fp:
+            manifest = json.load(fp)
+        loaded = {s.id: s for s in self._segments}
+        try:
+            # the segments are immutable, but their tombstones may be changed by the other indexers
+            self._segments = [loaded[j]._replace(tombstones=self._load_tombstones(j, loaded[j].size))
+                              if j in loaded else self._load_segment(j) for j in manifest['segments']]
+        except FileNotFoundError as ex:
+            # the segment is merged and removed by the compaction in the meantime, retry in the next call
+            self.logger.warning(f'failed to load the segments listed in {self.index_abspath}: {ex!r}')
+            return
+        self._manifest_mtime = mtime
+        self._next_segment_id = max(self._next_segment_id, manifest['next_id'])
+        self._size = sum(s.size - s.num_deleted for s in self._segments)
+        self._generation += 1
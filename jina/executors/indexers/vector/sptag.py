@@ -1,7 +1,7 @@
 __copyright__ = "Copyright (c) 2020 Jina AI Limited. All rights reserved."
 __license__ = "Apache-2.0"
 
-from typing import Tuple
+from typing import Tuple, Dict, Union, Iterable
 
 import numpy as np
 
@@ -19,6 +19,10 @@ class SptagIndexer(NumpyIndexer):
 
     .. note::
         sptag package dependency is only required at the query time.
+
+    .. warning::
+        As in :class:`NmslibIndexer`, the deleted vectors and the vectors not matching ``filter`` are removed after
+        the search, less than ``top_k`` results may be left and a warning is logged then.
     """
 
     def __init__(self, dist_calc_method: str = 'L2', method: str = 'BKT',
@@ -54,10 +58,14 @@ class SptagIndexer(NumpyIndexer):
         else:
             return None
 
-    def query(self, keys: 'np.ndarray', top_k: int, *args, **kwargs) -> Tuple['np.ndarray', 'np.ndarray']:
+    def query(self, keys: 'np.ndarray', top_k: int, filter: Dict[str, Union[str, Iterable[str]]] = None,
+              *args, **kwargs) -> Tuple['np.ndarray', 'np.ndarray']:
         if keys.dtype != np.float32:
             raise ValueError('vectors should be ndarray of float32')
 
-        ret = self.query_handler.Search(keys, top_k)
+        _index = self.query_handler
+        mask = self._get_mask(self.int2ext_key.shape[0], filter)
+        ret = _index.Search(keys, self._get_num_candidates(top_k, mask))
         idx, dist = zip(*ret)
-        return self.int2ext_key[np.array(idx)], np.array(dist)
+        idx, dist = self._remove_deleted(np.array(idx), np.array(dist), top_k, mask)
+        return self.int2ext_key[idx], dist
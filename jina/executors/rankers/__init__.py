@@ -1,7 +1,7 @@
 __copyright__ = "Copyright (c) 2020 Jina AI Limited. All rights reserved."
 __license__ = "Apache-2.0"
 
-from typing import Dict
+from typing import Dict, Tuple
 
 import numpy as np
 
@@ -31,6 +31,7 @@ class BaseRanker(BaseExecutor):
         self.col_chunk_id = 1
         self.col_query_chunk_id = 2
         self.col_score = 3
+        self.col_query_doc_id = 4  #: only used internally, see :func:`batch_score`
 
     def score(self, match_idx: 'np.ndarray', query_chunk_meta: Dict, match_chunk_meta: Dict) -> 'np.ndarray':
         """Translate the chunk-level top-k results into doc-level top-k results. Some score functions may leverage the
@@ -50,12 +51,56 @@ class BaseRanker(BaseExecutor):
         :return: a [N x 2] numpy ``ndarray``, where the first column is the matched documents' ``doc_id`` (integer)
                 the second column is the score/distance/metric between the matched doc and the query doc (float).
         """
-        _groups = self.group_by_doc_id(match_idx)
-        r = []
-        for _g in _groups:
-            _doc_id, _doc_score = self._get_score(_g, query_chunk_meta, match_chunk_meta)
-            r.append((_doc_id, _doc_score))
-        return self.sort_doc_by_score(r)
+        _m = np.concatenate([match_idx[:, :4], np.zeros([match_idx.shape[0], 1])], axis=1)
+        _m, _starts = _segment(_m, self.col_query_doc_id, self.col_doc_id)
+        _doc_scores = self._get_scores(_m, _starts, _meta2columns(query_chunk_meta), _meta2columns(match_chunk_meta))
+        return self.sort_doc_by_score(np.stack([_m[_starts, self.col_doc_id], _doc_scores], axis=1))
+
+    def batch_score(self, match_idx: 'np.ndarray', query_chunk_meta: Dict[str, 'np.ndarray'],
+                    match_chunk_meta: Dict[str, 'np.ndarray']) -> 'np.ndarray':
+        """Translate the chunk-level top-k results of all query docs in a request into doc-level top-k results in
+        one call. The result is the same as calling :func:`score` on every query doc.
+
+        :param match_idx: a [N x 5] numpy ``ndarray``, column-wise:
+
+                - ``match_idx[:, 0]``: ``doc_id`` of the query docs, integer
+                - ``match_idx[:, 1]``: ``doc_id`` of the matched chunks, integer
+                - ``match_idx[:, 2]``: ``chunk_id`` of the matched chunks, integer
+                - ``match_idx[:, 3]``: ``chunk_id`` of the query chunks, integer
+                - ``match_idx[:, 4]``: distance/metric/score between the query and matched chunks, float
+        :param query_chunk_meta: the meta information of the query chunks in columns, ``query_chunk_meta['chunk_id']``
+            is the ``chunk_id`` of the query chunks, the other columns are extracted by the ``required_keys``.
+        :param match_chunk_meta: the meta information of the matched chunks in columns, in the same format of
+            ``query_chunk_meta``.
+        :return: a [M x 3] numpy ``ndarray``, where the columns are the query docs' ``doc_id``, the matched documents'
+            ``doc_id`` and the score. The rows are grouped by the query doc, and sorted by the score in the
+            descending order in each group.
+        """
+        _m = match_idx[:, [1, 2, 3, 4, 0]]
+        _m, _starts = _segment(_m, self.col_query_doc_id, self.col_doc_id)
+        _doc_scores = self._get_scores(_m, _starts, query_chunk_meta, match_chunk_meta)
+        _q_doc_ids = _m[_starts, self.col_query_doc_id]
+        r = np.stack([_q_doc_ids, _m[_starts, self.col_doc_id], _doc_scores], axis=1)
+        return r[np.lexsort([-_doc_scores, _q_doc_ids])]
+
+    def _get_scores(self, match_idx: 'np.ndarray', starts: 'np.ndarray',
+                    query_chunk_meta: Dict[str, 'np.ndarray'], match_chunk_meta: Dict[str, 'np.ndarray']) -> 'np.ndarray':
+        """Get the scores of all matched docs in one pass
+
+        :param match_idx: a [N x 5] numpy ``ndarray`` sorted by the query ``doc_id`` and then the matched ``doc_id``,
+            the last column is the query ``doc_id``
+        :param starts: the row index where each (query doc, matched doc) pair starts in ``match_idx``
+        :param query_chunk_meta: the meta information of the query chunks in columns, see :func:`batch_score`
+        :param match_chunk_meta: the meta information of the matched chunks in columns, see :func:`batch_score`
+        :return: a numpy ``ndarray`` of the doc scores, in the same order of ``starts``
+
+        .. note::
+            The default implementation calls :func:`_get_score` on every doc. Subclasses are encouraged to override it
+            with segment reductions, e.g. ``np.maximum.reduceat(match_idx[:, self.col_score], starts)``.
+        """
+        query_chunk_meta, match_chunk_meta = _columns2meta(query_chunk_meta), _columns2meta(match_chunk_meta)
+        return np.array([self._get_score(_g[:, :4], query_chunk_meta, match_chunk_meta)[1]
+                         for _g in np.split(match_idx, starts[1:])], dtype=np.float64)
 
     def group_by_doc_id(self, match_idx):
         """
@@ -100,6 +145,9 @@ class MaxRanker(BaseRanker):
     def _get_score(self, match_idx, query_chunk_meta, match_chunk_meta, *args, **kwargs):
         return self.get_doc_id(match_idx), match_idx[:, self.col_score].max()
 
+    def _get_scores(self, match_idx, starts, query_chunk_meta, match_chunk_meta):
+        return np.maximum.reduceat(match_idx[:, self.col_score], starts)
+
 
 class MinRanker(BaseRanker):
     """
@@ -112,3 +160,44 @@ class MinRanker(BaseRanker):
     def _get_score(self, match_idx, query_chunk_meta, match_chunk_meta, *args, **kwargs):
         _doc_id = match_idx[0, self.col_doc_id]
         return self.get_doc_id(match_idx), 1. / (1. + match_idx[:, self.col_score].min())
+
+    def _get_scores(self, match_idx, starts, query_chunk_meta, match_chunk_meta):
+        return 1. / (1. + np.minimum.reduceat(match_idx[:, self.col_score], starts))
+
+
+def _segment(match_idx: 'np.ndarray', *cols: int) -> Tuple['np.ndarray', 'np.ndarray']:
+    """Sort the rows by the given columns, the first column is the primary key, and find the segments of the rows
+    sharing the same values in these columns
+
+    :return: the sorted rows and the row index where each segment starts
+    """
+    _m = match_idx[np.lexsort([match_idx[:, c] for c in reversed(cols)])]
+    _keys = _m[:, cols]
+    _starts = np.concatenate([[0], np.nonzero(np.any(_keys[1:] != _keys[:-1], axis=1))[0] + 1])
+    return _m, _starts
+
+
+def _meta2columns(meta: Dict[int, Dict]) -> Dict[str, 'np.ndarray']:
+    """Convert the meta information from a dict of dicts keyed by ``chunk_id`` into columns sorted by ``chunk_id`` """
+    _ids = sorted(meta.keys())
+    r = {'chunk_id': np.array(_ids, dtype=np.float64)}
+    if _ids:
+        for k in meta[_ids[0]].keys():
+            r[k] = np.array([meta[j][k] for j in _ids])
+    return r
+
+
+def _columns2meta(columns: Dict[str, 'np.ndarray']) -> Dict[int, Dict]:
+    """Convert the meta information in columns back to a dict of dicts keyed by ``chunk_id`` """
+    _keys = [k for k in columns.keys() if k != 'chunk_id']
+    return {c_id: {k: columns[k][j] for k in _keys} for j, c_id in enumerate(columns['chunk_id'])}
+
+
+def _get_meta(columns: Dict[str, 'np.ndarray'], key: str, chunk_ids: 'np.ndarray') -> 'np.ndarray':
+    """Look up the meta information of the given chunks from the columns sorted by ``chunk_id`` """
+    pos = np.searchsorted(columns['chunk_id'], chunk_ids)
+    found = pos < columns['chunk_id'].shape[0]
+    found[found] = columns['chunk_id'][pos[found]] == chunk_ids[found]
+    if not found.all():
+        raise KeyError(f'the meta information of chunks {np.unique(chunk_ids[~found]).tolist()} is missing')
+    return columns[key][pos]
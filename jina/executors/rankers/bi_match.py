@@ -3,7 +3,7 @@ __license__ = "Apache-2.0"
 
 import numpy as np
 
-from . import BaseRanker
+from . import BaseRanker, _segment, _get_meta
 
 
 class BiMatchRanker(BaseRanker):
@@ -19,6 +19,27 @@ class BiMatchRanker(BaseRanker):
         s2 = self._directional_score(match_idx, query_chunk_meta, col=self.col_query_chunk_id)
         return self.get_doc_id(match_idx), (s1 + s2) / 2.
 
+    def _get_scores(self, match_idx, starts, query_chunk_meta, match_chunk_meta):
+        s1 = self._directional_scores(match_idx, starts, match_chunk_meta, col=self.col_chunk_id)
+        s2 = self._directional_scores(match_idx, starts, query_chunk_meta, col=self.col_query_chunk_id)
+        return (s1 + s2) / 2.
+
+    def _directional_scores(self, match_idx, starts, chunk_meta, col):
+        """The vectorized version of :func:`_directional_score` over all matched docs """
+        # sorting by ``col`` inside each doc keeps ``starts`` valid
+        _m, _pair_starts = _segment(match_idx, self.col_query_doc_id, self.col_doc_id, col)
+        # take the best match from each (doc, chunk) pair
+        _best = np.minimum.reduceat(_m[:, self.col_score], _pair_starts)
+        _doc_starts = np.searchsorted(_pair_starts, starts)
+        # doc total length
+        _c = _get_meta(chunk_meta, 'length', _m[_pair_starts[_doc_starts], col]).astype(np.float64)
+        # hit chunks
+        _h = np.diff(np.append(_doc_starts, _pair_starts.shape[0]))
+        # hit distance
+        sum_d_hit = np.add.reduceat(_best, _doc_starts)
+        # all hit => 0, all_miss => 1
+        return 1 - (sum_d_hit + self.D_MISS * (_c - _h)) / (self.D_MISS * _c)
+
     def _directional_score(self, g, chunk_meta, col):
         # col = self.col_chunk_id, from matched_chunk aspect
         # col = self.col_query_chunk_id, from query chunk aspect
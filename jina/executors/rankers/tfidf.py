@@ -1,11 +1,11 @@
 __copyright__ = "Copyright (c) 2020 Jina AI Limited. All rights reserved."
 __license__ = "Apache-2.0"
 
-from typing import Dict
+from typing import Dict, Optional
 
 import numpy as np
 
-from . import BaseRanker
+from . import BaseRanker, _segment, _get_meta, _columns2meta
 
 
 class TfIdfRanker(BaseRanker):
@@ -45,13 +45,80 @@ class TfIdfRanker(BaseRanker):
             In both `query_chunk_meta` and `match_chunk_meta`, ONLY the fields from the ``required_keys`` are kept.
 
         """
-        _groups = self.group_by_doc_id(match_idx)
-        r = []
-        _q_idf = self.get_idf(match_idx)
-        for _g in _groups:
-            _doc_id, _doc_score = self._get_score(_g, query_chunk_meta, match_chunk_meta, _q_idf)
-            r.append((_doc_id, _doc_score))
-        return self.sort_doc_by_score(r)
+        return super().score(match_idx, query_chunk_meta, match_chunk_meta)
+
+    def _get_scores(self, match_idx, starts, query_chunk_meta, match_chunk_meta):
+        """Get the scores of all matched docs in one pass, the result is the same as calling :func:`_get_score` on
+            every doc.
+
+        The rows are segmented by (query ``doc_id``, ``doc_id``, query ``chunk_id``) triples, the ``tf`` of each triple
+            and the ``idf`` of each query chunk are computed by segment reductions.
+
+        .. note::
+            The segment reductions follow :func:`get_tf` and :func:`get_idf` through :func:`_get_tf_array` and
+                :func:`_get_idf_array`. When a subclass overrides :func:`get_tf` or :func:`get_idf` without the array
+                counterpart, the docs are scored one by one with the overridden functions.
+        """
+        if self._is_overridden('get_tf', '_get_tf_array') or self._is_overridden('get_idf', '_get_idf_array'):
+            return self._get_scores_by_doc(match_idx, starts, query_chunk_meta, match_chunk_meta)
+        # sorting by the query chunk inside each doc keeps ``starts`` valid
+        _m, _pair_starts = _segment(match_idx, self.col_query_doc_id, self.col_doc_id, self.col_query_chunk_id)
+        _q_keys, _q_inv, _q_df = np.unique(_m[:, [self.col_query_doc_id, self.col_query_chunk_id]], axis=0,
+                                           return_inverse=True, return_counts=True)
+        _q_inv = _q_inv.reshape(-1)
+        # the idf is computed inside each query doc
+        _, _q_doc_inv = np.unique(_q_keys[:, 0], return_inverse=True)
+        _q_idf = self._get_idf_array(_q_df, np.bincount(_q_doc_inv.reshape(-1), weights=_q_df)[_q_doc_inv])
+
+        _hit = _m[:, self.col_score] >= self.threshold
+        _n = np.add.reduceat(_hit.astype(np.int64), _pair_starts)
+        # the length of the matched doc is read from the last hit chunk of each pair
+        _last_hit = np.maximum.reduceat(np.where(_hit, np.arange(_m.shape[0]), -1), _pair_starts)
+        _lengths = np.where(_last_hit >= 0, _get_meta(match_chunk_meta, 'length',
+                                                      _m[_last_hit, self.col_chunk_id]), 1).astype(np.float64)
+        _tf = np.where(_n > 0, self._get_tf_array(_n, _lengths, self._get_avg_lengths(_m, _pair_starts,
+                                                                                      match_chunk_meta)), 0.)
+
+        _pair_sizes = np.diff(np.append(_pair_starts, _m.shape[0]))
+        _weights = np.repeat(_tf, _pair_sizes) * _q_idf[_q_inv]
+        _sum = np.add.reduceat(_weights, starts)
+        _weighted_sum = np.add.reduceat(_weights * _m[:, self.col_score], starts)
+        return np.where(_sum == 0, 0., _weighted_sum / np.where(_sum == 0, 1., _sum))
+
+    def _get_scores_by_doc(self, match_idx, starts, query_chunk_meta, match_chunk_meta):
+        """Get the scores of all matched docs with :func:`get_idf` on every query doc and :func:`_get_score` on every
+            matched doc """
+        query_chunk_meta, match_chunk_meta = _columns2meta(query_chunk_meta), _columns2meta(match_chunk_meta)
+        _q_doc_ids = match_idx[starts, self.col_query_doc_id]
+        _q_starts = starts[np.concatenate([[True], _q_doc_ids[1:] != _q_doc_ids[:-1]])]
+        _idfs = [self.get_idf(_g[:, :4]) for _g in np.split(match_idx, _q_starts[1:])]
+        _q_idx = np.searchsorted(_q_starts, starts, side='right') - 1
+        return np.array([self._get_score(_g[:, :4], query_chunk_meta, match_chunk_meta, _idfs[_q])[1]
+                         for _g, _q in zip(np.split(match_idx, starts[1:]), _q_idx)], dtype=np.float64)
+
+    def _is_overridden(self, name: str, array_name: str) -> bool:
+        """Check if the public function ``name`` is overridden below the class defining its array counterpart
+            ``array_name``, i.e. the array counterpart does not follow the public function """
+        for cls in type(self).__mro__:
+            if name in cls.__dict__ or array_name in cls.__dict__:
+                return array_name not in cls.__dict__
+        return False
+
+    def _get_idf_array(self, df: 'np.ndarray', total_df: 'np.ndarray') -> 'np.ndarray':
+        """Get the idf of the query chunks from their document frequencies and the total document frequencies of their
+            query docs, see :func:`get_idf` """
+        return np.log10(total_df / df + 1e-10)
+
+    def _get_tf_array(self, n: 'np.ndarray', lengths: 'np.ndarray', avg_lengths: 'np.ndarray') -> 'np.ndarray':
+        """Get the tf of the (matched doc, query chunk) pairs from their frequencies and the lengths of the matched
+            docs, see :func:`get_tf` """
+        return n / lengths
+
+    def _get_avg_lengths(self, match_idx: 'np.ndarray', pair_starts: 'np.ndarray',
+                         match_chunk_meta: Dict[str, 'np.ndarray']) -> Optional['np.ndarray']:
+        """Get the average length of the matched chunks of the query doc for each (matched doc, query chunk) pair,
+            only used by the subclasses """
+        return None
 
     def get_idf(self, match_idx):
         """Get the idf dictionary for query chunks that matched a given doc.
@@ -135,8 +202,8 @@ class TfIdfRanker(BaseRanker):
         """
         tf = self.get_tf(match_idx, match_chunk_meta)
         _weights = match_idx[:, self.col_score]
-        _q_tfidf = np.vectorize(tf.get)(match_idx[:, self.col_query_chunk_id], 0) * \
-                   np.vectorize(idf.get)(match_idx[:, self.col_query_chunk_id], 0)
+        _q_tfidf = np.vectorize(tf.get, otypes=[np.float64])(match_idx[:, self.col_query_chunk_id], 0) * \
+                   np.vectorize(idf.get, otypes=[np.float64])(match_idx[:, self.col_query_chunk_id], 0)
         _sum = np.sum(_q_tfidf)
         _doc_id = self.get_doc_id(match_idx)
         _score = 0. if _sum == 0 else np.sum(_weights * _q_tfidf) * 1.0 / _sum
@@ -181,6 +248,21 @@ class BM25Ranker(TfIdfRanker):
         _total_df = np.sum(_q_df)
         return {idx: np.log10((_total_df + 1.) / (df + 0.5)) ** 2 for idx, df in zip(_q_id, _q_df)}
 
+    def _get_idf_array(self, df, total_df):
+        return np.log10((total_df + 1.) / (df + 0.5)) ** 2
+
+    def _get_tf_array(self, n, lengths, avg_lengths):
+        return (1 + self.k) * n / (self.k * (1 - self.b + self.b * lengths / avg_lengths) + n)
+
+    def _get_avg_lengths(self, match_idx, pair_starts, match_chunk_meta):
+        # the average is taken over the distinct matched chunks of each query doc
+        _c_keys = np.unique(match_idx[:, [self.col_query_doc_id, self.col_chunk_id]], axis=0)
+        _q_doc_ids, _c_q_doc_inv = np.unique(_c_keys[:, 0], return_inverse=True)
+        _c_q_doc_inv = _c_q_doc_inv.reshape(-1)
+        _avg = np.bincount(_c_q_doc_inv, weights=_get_meta(match_chunk_meta, 'length', _c_keys[:, 1])) / \
+               np.bincount(_c_q_doc_inv)
+        return _avg[np.searchsorted(_q_doc_ids, match_idx[pair_starts, self.col_query_doc_id])]
+
     def get_tf(self, match_idx, match_chunk_meta):
         """Get the tf dictionary for query chunks that matched a given doc.
 
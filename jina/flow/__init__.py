@@ -642,12 +642,65 @@ class Flow:
             with f.build(runtime='thread') as flow:
                 flow.search(bytes_gen=my_reader())
 
+        To only search the documents indexed with some ``tags``, e.g. ``lang: en``, use
+
+        .. highlight:: python
+        .. code-block:: python
+
+            with f.build(runtime='thread') as flow:
+                flow.search(bytes_gen=my_reader(), filter=['lang=en'])
+
         :param input_fn: An iterator of bytes. If not given, then you have to specify it in `kwargs`.
         :param output_fn: the callback function to invoke after searching
         :param kwargs: accepts all keyword arguments of `jina client` CLI
         """
         self._get_client(**kwargs).search(input_fn, output_fn)
 
+    def update(self, input_fn: Union[Iterator['jina_pb2.Document'], Iterator[bytes], Callable] = None,
+               output_fn: Callable[['jina_pb2.Message'], None] = None,
+               **kwargs):
+        """Do updating on the current flow, the documents go through the flow in the same way as :func:`index`,
+        and replace the documents/chunks with the same ``doc_id``/``chunk_id`` in the indexers
+
+        It will start a :py:class:`CLIClient` and call :py:func:`update`.
+
+        :param input_fn: An iterator of bytes or protobuf documents. If not given, then you have to specify it in
+            `kwargs`. The ``doc_id`` of the protobuf documents are kept when ``in_proto=True``
+        :param output_fn: the callback function to invoke after updating
+        :param kwargs: accepts all keyword arguments of `jina client` CLI
+        """
+        self._get_client(**kwargs).update(input_fn, output_fn)
+
+    def delete(self, input_fn: Union[Iterator['jina_pb2.Document'], Iterator[bytes], Callable] = None,
+               output_fn: Callable[['jina_pb2.Message'], None] = None,
+               **kwargs):
+        """Do deleting on the current flow
+
+        It will start a :py:class:`CLIClient` and call :py:func:`delete`.
+
+        Example,
+
+        .. highlight:: python
+        .. code-block:: python
+
+            def my_reader():
+                for doc_id, chunk_ids in to_delete:
+                    d = jina_pb2.Document()
+                    d.doc_id = doc_id
+                    for c_id in chunk_ids:
+                        d.chunks.add().chunk_id = c_id
+                    yield d
+
+            with f.build(runtime='thread') as flow:
+                flow.delete(my_reader(), in_proto=True)
+
+        :param input_fn: An iterator of protobuf documents, the documents are identified by ``doc_id`` and their
+            chunks by ``chunk_id``
+        :param output_fn: the callback function to invoke after deleting
+        :param kwargs: accepts all keyword arguments of `jina client` CLI
+        """
+        self._get_client(**kwargs).delete(input_fn, output_fn)
+
     def dry_run(self, **kwargs):
         """Send a DRYRUN request to this flow, passing through all pods in this flow
         useful for testing connectivity and debugging"""
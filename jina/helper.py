@@ -6,10 +6,12 @@ import os
 import random
 import re
 import sys
+import threading
 import time
+from collections import OrderedDict
 from itertools import islice
 from types import SimpleNamespace
-from typing import Iterator, Any, Union, List, Dict
+from typing import Iterator, Any, Union, List, Dict, Callable, Hashable
 
 import numpy as np
 from ruamel.yaml import YAML, nodes
@@ -19,7 +21,7 @@ from . import JINA_GLOBAL
 __all__ = ['batch_iterator', 'yaml',
            'load_contrib_module',
            'parse_arg',
-           'PathImporter', 'random_port', 'get_random_identity', 'expand_env_var',
+           'PathImporter', 'LRUCache', 'random_port', 'get_random_identity', 'expand_env_var',
            'colored', 'kwargs2list', 'valid_yaml_path']
 
 
@@ -241,6 +243,94 @@ class PathImporter:
         return module, spec
 
 
+class LRUCache:
+    """A thread-safe least-recently-used cache, bounded by the number of entries and the total size of the values.
+
+    The entries older than ``ttl`` seconds are treated as missing. The hits and misses are counted for the stats.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 0, ttl: float = 0,
+                 size_fn: Callable[[Any], int] = None):
+        """
+        :param max_entries: the max number of entries, the least recently used entries are evicted beyond it
+        :param max_bytes: the max total size of the values in bytes, ``0`` for no limit
+        :param ttl: the time-to-live of an entry in seconds, ``0`` for no expiry
+        :param size_fn: the function returning the size of a value in bytes, by default the ``nbytes`` of a numpy
+            ndarray, or the sum of it for a tuple/list of ndarrays
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size_fn = size_fn or _get_nbytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.num_bytes = 0
+        self._data = OrderedDict()  # type: OrderedDict[Hashable, tuple]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key, count=False) is not None
+
+    def get(self, key: Hashable, default: Any = None, count: bool = True) -> Any:
+        """Get the value of a key and mark it as the most recently used
+
+        :param count: count the hit or miss of this call in the stats
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and self.ttl > 0 and time.monotonic() - entry[1] > self.ttl:
+                self._pop(key)
+                entry = None
+            if entry is None:
+                if count:
+                    self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            if count:
+                self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any):
+        """Add or replace the value of a key, and evict the least recently used entries beyond the bounds """
+        size = self.size_fn(value)
+        with self._lock:
+            if key in self._data:
+                self._pop(key)
+            if 0 < self.max_bytes < size or self.max_entries <= 0:
+                # never fits
+                return
+            self._data[key] = (value, time.monotonic(), size)
+            self.num_bytes += size
+            while len(self._data) > self.max_entries or (self.max_bytes > 0 and self.num_bytes > self.max_bytes):
+                self._pop(next(iter(self._data)))
+                self.evictions += 1
+
+    def clear(self):
+        """Remove all entries, the stats are kept """
+        with self._lock:
+            self._data.clear()
+            self.num_bytes = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """The hits, misses, evictions, number of entries and total size in bytes """
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'entries': len(self._data), 'bytes': self.num_bytes}
+
+    def _pop(self, key: Hashable):
+        self.num_bytes -= self._data.pop(key)[2]
+
+
+def _get_nbytes(value: Any) -> int:
+    if isinstance(value, (tuple, list)):
+        return sum(_get_nbytes(v) for v in value)
+    return getattr(value, 'nbytes', 0)
+
+
 _random_names = (('first', 'great', 'local', 'small', 'right', 'large', 'young', 'early', 'major', 'clear', 'black',
                   'whole', 'third', 'white', 'short', 'human', 'royal', 'wrong', 'legal', 'final', 'close', 'total',
                   'prime', 'happy', 'sorry', 'basic', 'aware', 'ready', 'green', 'heavy', 'extra', 'civil', 'chief',
@@ -212,6 +212,9 @@ def set_pea_parser(parser=None):
     gp5.add_argument('--array-in-pb', action='store_true', default=False,
                      help='sending raw_bytes and numpy ndarray together within or separately from the protobuf message, '
                           'the latter often yields a better network efficiency')
+    gp5.add_argument('--zero-copy', action='store_true', default=False,
+                     help='receive messages without copying. chunk embeddings are not filled into the protobuf message, '
+                          'drivers read them directly as numpy views over the received buffers')
     gp5.add_argument('--compress-hwm', type=int, default=-1,
                      help='the high watermark that triggers the message compression. '
                           'message bigger than this HWM (in bytes) will be compressed by lz4 algorithm.'
@@ -222,6 +225,20 @@ def set_pea_parser(parser=None):
                           'compression, and will be sent. Otherwise, it will send the original message without compression')
     gp5.add_argument('--num-part', type=int, default=1,
                      help='wait until the number of parts of message are all received')
+    gp5.add_argument('--max-batch-size', type=int, default=0,
+                     help='encode the chunks of the queued requests together in one call of the encoder, '
+                          'up to this number of chunks. only effective when the first driver of the request is '
+                          'an EncodeDriver. set this to 0 to disable this feature.')
+    gp5.add_argument('--max-batch-wait', type=float, default=10,
+                     help='the max time (in ms) to wait for more requests before encoding a non-full batch, '
+                          'only effective when --max-batch-size > 0')
+    gp5.add_argument('--pipeline', action='store_true', default=False,
+                     help='receive and send the messages in two separated threads, so that the network IO and the '
+                          '(de)serialization of the messages overlap with the executor. '
+                          'the messages are still handled one by one in the received order')
+    gp5.add_argument('--pipeline-queue-size', type=int, default=16,
+                     help='the max number of the messages waiting to be handled or to be sent, '
+                          'only effective when --pipeline is on')
     gp5.add_argument('--role', type=PeaRoleType.from_string, choices=list(PeaRoleType),
                      help='the role of this pea in a pod')
 
@@ -231,6 +248,12 @@ def set_pea_parser(parser=None):
                           '-1 means no restriction')
     gp6.add_argument('--runtime', type=str, choices=['thread', 'process'], default='process',
                      help='the parallel runtime of the pod')
+    gp6.add_argument('--num-workers', type=int, default=1,
+                     help='the number of worker processes handling the search requests in parallel, each loads the '
+                          'executor and shares the memory-mapped data, e.g. the index, via the page cache. '
+                          'unlike --replicas, the sockets are owned by this pea only. the caches of the drivers are '
+                          'kept per worker. the pea is then not a daemonic process, it is not terminated with its '
+                          'parent process. 1 means no worker')
     gp6.add_argument('--max-idle-time', type=int, default=60,
                      help='label this pea as inactive when it does not '
                           'process any request after certain time (in second)')
@@ -404,12 +427,15 @@ def set_client_cli_parser(parser=None):
 
     gp1.add_argument('--batch-size', type=int, default=100,
                      help='the number of documents in each request')
-    gp1.add_argument('--mode', choices=['index', 'search', 'train'], type=str,
+    gp1.add_argument('--mode', choices=['index', 'search', 'train', 'update', 'delete'], type=str,
                      # required=True,
                      help='the mode of the client and the server')
     gp1.add_argument('--top-k', type=int,
                      default=10,
                      help='top_k results returned in the search mode')
+    gp1.add_argument('--filter', type=str, nargs='*',
+                     help='only search the documents with these tags in the search mode, each in the format of '
+                          '"KEY=VALUE"')
     gp1.add_argument('--in-proto', action='store_true', default=False,
                      help='if the input data is already in protobuf Document format, or in raw bytes')
     gp1.add_argument('--callback-on-body', action='store_true', default=False,
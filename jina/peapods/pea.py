@@ -4,22 +4,26 @@ __license__ = "Apache-2.0"
 import argparse
 import multiprocessing
 import os
+import signal
 import threading
 import time
-from collections import defaultdict
-from queue import Empty
+from collections import defaultdict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from queue import Empty, Full, Queue
 from typing import Dict, List, Optional, Union
 
 import zmq
 
 from .zmq import send_ctrl_message, Zmqlet
 from .. import __ready_msg__, __stop_msg__
+from ..drivers.encode import EncodeDriver
 from ..drivers.helper import routes2str, add_route
 from ..enums import PeaRoleType
 from ..excepts import NoExplicitMessage, ExecutorFailToLoad, MemoryOverHighWatermark, UnknownControlCommand, \
     RequestLoopEnd, \
     DriverNotInstalled, NoDriverForRequest
 from ..executors import BaseExecutor
+from ..executors.indexers import BaseIndexer
 from ..logging import get_logger
 from ..logging.profile import used_memory, TimeDict
 from ..proto import jina_pb2, is_data_request
@@ -110,7 +114,9 @@ class BasePea(metaclass=PeaMeta):
         super().__init__()
         self.args = args
         self.name = self.__class__.__name__  #: this is the process name
-        self.daemon = True
+        # a daemonic process is not allowed to have the worker processes. note that a non-daemonic pea is not
+        # terminated with its parent process, it keeps running until it receives a TERMINATE request
+        self.daemon = getattr(args, 'num_workers', 1) <= 1
 
         self.is_ready = _get_event(self)
         self.is_shutdown = _get_event(self)
@@ -131,6 +137,8 @@ class BasePea(metaclass=PeaMeta):
         self._prev_requests = None
         self._prev_messages = None
         self._pending_msgs = defaultdict(list)  # type: Dict[str, List]
+        self._worker_pool = None  # type: Optional[ProcessPoolExecutor]
+        self._worker_pool_for_update = False
 
         if isinstance(args, argparse.Namespace):
             if args.name:
@@ -202,6 +210,13 @@ class BasePea(metaclass=PeaMeta):
         """Get the current protobuf message to be processed"""
         return self._message
 
+    @property
+    def buffers(self) -> Optional[Dict[int, memoryview]]:
+        """Get the chunk embeddings received in the zero-copy mode, a map from ``chunk_id`` to the received buffer.
+        ``None`` when the zero-copy mode is disabled
+        """
+        return getattr(getattr(self, 'zmqlet', None), 'buffers', None)
+
     @property
     def request_type(self) -> str:
         return self._request.__class__.__name__
@@ -240,6 +255,15 @@ class BasePea(metaclass=PeaMeta):
             self.logger.warning('this BasePea has no executor attached, you may want to double-check '
                                 'if it is a mistake or on purpose (using this BasePea as router/map-reduce)')
 
+    @property
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """The runtime statistics of the drivers of the executor, keyed by ``DriverName.stat_name`` """
+        stats = {}
+        for drivers in getattr(getattr(self, 'executor', None), '_drivers', {}).values():
+            for d in drivers:
+                stats.update({f'{d.__class__.__name__}.{k}': v for k, v in d.stats.items()})
+        return stats
+
     def print_stats(self):
         self.logger.info(
             ' '.join('%s: %.2f' % (k, v / self._timer.accum_time['loop']) for k, v in self._timer.accum_time.items()))
@@ -263,6 +287,9 @@ class BasePea(metaclass=PeaMeta):
             self.last_dump_time = time.perf_counter()
             if hasattr(self, 'zmqlet'):
                 self.zmqlet.print_stats()
+            stats = self.stats
+            if stats:
+                self.logger.info(' '.join(f'{k}: {v}' for k, v in stats.items()))
 
     def pre_hook(self, msg: 'jina_pb2.Message') -> 'BasePea':
         """Pre-hook function, what to do after first receiving the message """
@@ -312,6 +339,34 @@ class BasePea(metaclass=PeaMeta):
         self.zmqlet = Zmqlet(self.args, logger=self.logger)
         self.set_ready()
 
+        if getattr(self.args, 'max_batch_size', 0) > 0:
+            if self.args.num_part > 1 or self.zmqlet.buffers is not None:
+                # the buffers of the zero-copy mode are cleared once the first message of a batch is sent
+                self.logger.warning('batching the requests is disabled as "num_part" > 1 or "zero_copy" is on')
+            else:
+                return self.batching_loop_body()
+
+        if getattr(self.args, 'num_workers', 1) > 1:
+            if self.args.num_part > 1 or self.zmqlet.buffers is not None:
+                self.logger.warning('workers are disabled as "num_part" > 1 or "zero_copy" is on')
+            elif multiprocessing.current_process().daemon:
+                self.logger.warning('workers are disabled as this pea runs in a daemonic process')
+            elif not hasattr(self, 'executor'):
+                self.logger.warning('workers are disabled as there is no executor')
+            elif self._get_threaded_executors():
+                self.logger.warning(f'workers are disabled as {self._get_threaded_executors()} run their own threads, '
+                                    f'set "num_threads" to 1 and turn off the background building/compaction')
+            else:
+                return self.worker_loop_body()
+
+        if getattr(self.args, 'pipeline', False):
+            if self.zmqlet.in_sock.type == zmq.DEALER or self.zmqlet.out_sock.type == zmq.ROUTER:
+                self.logger.warning('pipelining is disabled as the sockets are used for load balancing')
+            elif self.zmqlet.buffers is not None:
+                self.logger.warning('pipelining is disabled as "zero_copy" is on')
+            else:
+                return self.pipelined_loop_body()
+
         while True:
             # t_loop_start = time.perf_counter()
             msg = self.zmqlet.recv_message(callback=self.msg_callback)
@@ -326,6 +381,250 @@ class BasePea(metaclass=PeaMeta):
             # t_loop_end = time.perf_counter()
             # self.logger.info(f'handle {(t_callback - t_loop_start) / (t_loop_end - t_loop_start):2.2f}')
 
+    def batching_loop_body(self):
+        """The body of the request loop, which encodes the chunks of the queued requests together
+
+        The messages whose first driver is an :class:`EncodeDriver` are held until their chunks reach
+        ``max_batch_size`` or the first of them has waited for ``max_batch_wait`` ms. Their chunks are then encoded in
+        one call, and the messages go through the rest of the drivers and are sent one by one in the received order.
+        Any other message is handled after the held messages.
+
+        .. note::
+            When the input socket is a ``DEALER``, the upstream router sends one message at a time, so there is no
+            message to batch with.
+        """
+        batch = []  # type: List['jina_pb2.Message']
+        batch_driver = None
+        num_chunks = 0
+        deadline = 0
+        while True:
+            msg = self.zmqlet.recv_message()
+            if msg is not None:
+                driver = self._get_batch_driver(msg)
+                if batch and driver is not batch_driver:
+                    self._handle_batch(batch_driver, batch)
+                    batch, num_chunks = [], 0
+                if driver is None:
+                    self._handle_msg(self.msg_callback(msg))
+                else:
+                    if not batch:
+                        deadline = time.perf_counter() + self.args.max_batch_wait / 1e3
+                    batch.append(msg)
+                    batch_driver = driver
+                    num_chunks += sum(len(d.chunks) for d in getattr(msg.request, msg.request.WhichOneof('body')).docs)
+            if batch and (num_chunks >= self.args.max_batch_size or time.perf_counter() >= deadline):
+                self._handle_batch(batch_driver, batch)
+                batch, num_chunks = [], 0
+
+    def pipelined_loop_body(self):
+        """The body of the request loop, which receives and sends the messages in two separated threads
+
+        The receiving thread pulls and deserializes the messages, the sending thread serializes and pushes the
+        handled messages, they are connected to this thread via two bounded queues. This thread handles the messages
+        one by one in the received order as :func:`loop_body` does, so the order of the messages is kept.
+
+        .. note::
+            A ZeroMQ socket is not thread-safe, the input and the control socket are only used by the receiving thread
+            and the output socket is only used by the sending thread. The replies to the control requests are
+            therefore sent by the receiving thread.
+        """
+        recv_queue = Queue(self.args.pipeline_queue_size)
+        send_queue = Queue(self.args.pipeline_queue_size)
+        ctrl_replies = Queue()
+        is_stopped = threading.Event()
+        recv_thread = threading.Thread(target=self._recv_loop, args=(recv_queue, ctrl_replies, is_stopped),
+                                       name=f'{self.name}-recv', daemon=True)
+        send_thread = threading.Thread(target=self._send_loop, args=(send_queue, recv_queue, ctrl_replies, is_stopped),
+                                       name=f'{self.name}-send', daemon=True)
+        recv_thread.start()
+        send_thread.start()
+        try:
+            while True:
+                msg = recv_queue.get()
+                if isinstance(msg, Exception):
+                    raise msg
+                msg = self.msg_callback(msg)
+                if msg:
+                    _put(send_queue, msg, is_stopped)
+                    self.save_executor(self.args.dump_interval)
+                    self.check_memory_watermark()
+        finally:
+            # send out all handled messages before the sockets are released to this thread
+            _put(send_queue, None, is_stopped)
+            send_thread.join()
+            is_stopped.set()
+            recv_thread.join()
+
+    def worker_loop_body(self):
+        """The body of the request loop, which handles the messages in a pool of ``num_workers`` worker processes
+
+        The workers are spawned processes, each loads the executor from ``yaml_path`` as this pea does, so the
+        memory-mapped data, e.g. the index of a :class:`NumpyIndexer` with ``storage='memmap'``, is shared via the
+        page cache, while the rest, e.g. a model, is loaded by each worker. This pea still owns all sockets, it sends
+        the messages to the workers and sends out the handled messages in the received order. Its own executor is
+        saved and replaced by a forwarding one handling the control requests, so that the executor is not loaded
+        ``num_workers + 1`` times.
+
+        .. note::
+            The workers handle the requests that can not change the executor in parallel, i.e. the search requests
+            and the index requests of a non-indexer. The rest of the data requests are handled one by one in a single
+            worker, after all messages in the workers are sent out. The two kinds of workers are not alive at the same
+            time, the single worker saves the changed executor before the workers are spawned again to load it.
+
+        .. note::
+            A pea with the workers is not a daemonic process, so it keeps running when its parent process dies without
+            sending it a TERMINATE request.
+
+        .. note::
+            The state built while handling the requests, e.g. the caches of :class:`VectorSearchDriver` and
+            :class:`EncodeDriver`, is kept in each worker, it is neither shared by the workers nor reported in
+            :attr:`stats` of this pea.
+        """
+        in_flight = deque()  # type: deque[Future]
+        max_in_flight = 2 * self.args.num_workers
+        executors = [self.executor] + list(getattr(self.executor, 'components', None) or [])
+        has_indexer = any(isinstance(e, BaseIndexer) for e in executors)
+        self._release_executor()
+        try:
+            while True:
+                msg = self.zmqlet.recv_message()
+                if msg is not None:
+                    req = getattr(msg.request, msg.request.WhichOneof('body'))
+                    if not is_data_request(req):
+                        self._send_worker_results(in_flight, 0)
+                        self._handle_msg(self.msg_callback(msg))
+                    elif self._is_worker_request(req, has_indexer):
+                        in_flight.append(self._get_worker_pool().submit(_handle_in_worker, msg.SerializeToString()))
+                    else:
+                        self._send_worker_results(in_flight, 0)
+                        in_flight.append(self._get_worker_pool(for_update=True).submit(
+                            _handle_in_worker, msg.SerializeToString()))
+                        self._send_worker_results(in_flight, 0)
+                self._send_worker_results(in_flight, max_in_flight - 1)
+        finally:
+            self._close_worker_pool(save=not self.args.exit_no_dump)
+
+    def _is_worker_request(self, req: 'jina_pb2.Request', has_indexer: bool) -> bool:
+        """Return ``True`` if the request can not change the executor, so that it can be handled by any worker
+
+        :param has_indexer: whether the executor is or contains an indexer
+        """
+        if isinstance(req, jina_pb2.Request.SearchRequest):
+            return True
+        elif isinstance(req, jina_pb2.Request.IndexRequest):
+            return not has_indexer
+        return False
+
+    def _release_executor(self):
+        """Save the executor and replace it by a forwarding executor handling the control requests, so that only the
+        workers load the executor """
+        if self.executor.is_updated:
+            # the workers load the executor from the dump
+            self.save_executor(dump_interval=0)
+        self.executor.close()
+        self.executor = BaseExecutor.load_config('_forward')
+        self.executor.attach(pea=self)
+
+    def _get_threaded_executors(self) -> List[str]:
+        """Get the names of the executors running their own threads, which can not be used with the workers """
+        executors = [self.executor] + list(getattr(self.executor, 'components', None) or [])
+        return [e.name for e in executors if getattr(e, 'num_threads', 1) > 1 or
+                getattr(e, 'build_in_background', False) or getattr(e, 'compact_in_background', False)]
+
+    def _get_worker_pool(self, for_update: bool = False) -> 'ProcessPoolExecutor':
+        """Get the pool of ``num_workers`` workers, or the pool of a single worker handling the requests that can
+        change the executor. Only one of them is alive at a time, the other one is closed
+
+        :param for_update: get the pool of the single worker
+        """
+        if self._worker_pool is not None and self._worker_pool_for_update != for_update:
+            self._close_worker_pool()
+        if self._worker_pool is None:
+            num_workers = 1 if for_update else self.args.num_workers
+            self._worker_pool = ProcessPoolExecutor(num_workers, multiprocessing.get_context('spawn'),
+                                                    initializer=_init_worker, initargs=(self.args,))
+            self._worker_pool_for_update = for_update
+            self.logger.success(f'started {num_workers} workers')
+        return self._worker_pool
+
+    def _close_worker_pool(self, save: bool = True):
+        """Close the workers
+
+        :param save: save the executor changed by the single worker, so that the next workers load the changes
+        """
+        if self._worker_pool is not None:
+            if self._worker_pool_for_update and save:
+                self._worker_pool.submit(_save_in_worker).result()
+            self._worker_pool.shutdown(wait=True)
+            self._worker_pool = None
+
+    def _send_worker_results(self, in_flight: 'deque', max_pending: int):
+        """Send out the handled messages in the received order, until at most ``max_pending`` messages are in
+        the workers or the next message is not handled yet """
+        while in_flight and (in_flight[0].done() or len(in_flight) > max_pending):
+            msg_data = in_flight.popleft().result()
+            if msg_data is not None:
+                msg = jina_pb2.Message()
+                msg.ParseFromString(msg_data)
+                self._handle_msg(msg)
+
+    def _recv_loop(self, recv_queue: 'Queue', ctrl_replies: 'Queue', is_stopped: 'threading.Event'):
+        """Receive the messages into ``recv_queue`` and send the control replies, until ``is_stopped`` is set """
+        try:
+            while not is_stopped.is_set():
+                while not ctrl_replies.empty():
+                    self.zmqlet.send_message(ctrl_replies.get_nowait())
+                msg = self.zmqlet.recv_message()
+                if msg is not None:
+                    _put(recv_queue, msg, is_stopped)
+            while not ctrl_replies.empty():
+                self.zmqlet.send_message(ctrl_replies.get_nowait())
+        except Exception as ex:
+            # raise it in the handling thread
+            _put(recv_queue, ex, is_stopped)
+
+    def _send_loop(self, send_queue: 'Queue', recv_queue: 'Queue', ctrl_replies: 'Queue',
+                   is_stopped: 'threading.Event'):
+        """Send the messages from ``send_queue`` until a ``None`` is received """
+        try:
+            for msg in iter(send_queue.get, None):
+                if is_data_request(getattr(msg.request, msg.request.WhichOneof('body'))):
+                    self.zmqlet.send_message(msg)
+                else:
+                    ctrl_replies.put(msg)
+        except Exception as ex:
+            # raise it in the handling thread, the rest messages are dropped
+            _put(recv_queue, ex, is_stopped)
+            while send_queue.get() is not None:
+                pass
+
+    def _get_batch_driver(self, msg: 'jina_pb2.Message') -> Optional['EncodeDriver']:
+        """Get the :class:`EncodeDriver` encoding the message in batch, ``None`` if it can not be batched """
+        req = getattr(msg.request, msg.request.WhichOneof('body'))
+        if is_data_request(req) and hasattr(self, 'executor'):
+            drivers = self.executor._drivers.get(type(req).__name__)
+            if drivers and isinstance(drivers[0], EncodeDriver) and drivers[0].attached:
+                return drivers[0]
+
+    def _handle_batch(self, driver: 'EncodeDriver', batch: List['jina_pb2.Message']):
+        for msg in batch:
+            self.pre_hook(msg)
+        driver.encode_batch(batch)
+        self.logger.info(f'encoded {len(batch)} requests in one batch')
+        for msg in batch:
+            try:
+                self.handle(msg).post_hook(msg)
+                self.last_active_time = time.perf_counter()
+            except NoExplicitMessage:
+                continue
+            self._handle_msg(msg)
+
+    def _handle_msg(self, msg: Optional['jina_pb2.Message']):
+        if msg:
+            self.zmqlet.send_message(msg)
+            self.save_executor(self.args.dump_interval)
+            self.check_memory_watermark()
+
     def load_plugins(self):
         if self.args.py_modules:
             from ..helper import PathImporter
@@ -419,3 +718,41 @@ class BasePea(metaclass=PeaMeta):
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
+
+
+def _put(q: 'Queue', item, is_stopped: 'threading.Event'):
+    """Put an item into a bounded queue, give up when ``is_stopped`` is set """
+    while not is_stopped.is_set():
+        try:
+            return q.put(item, timeout=.1)
+        except Full:
+            pass
+
+
+_worker_pea = None  # type: Optional[BasePea]
+
+
+def _init_worker(args: 'argparse.Namespace'):
+    """Initialize a worker process of the pea and load the executor, see :func:`BasePea.worker_loop_body` """
+    global _worker_pea
+    # the pea is interrupted instead
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker_pea = BasePea(args)
+    _worker_pea.load_plugins()
+    _worker_pea.load_executor()
+
+
+def _handle_in_worker(msg_data: bytes) -> Optional[bytes]:
+    """Handle a serialized message in a worker process and return the serialized message, ``None`` if nothing is
+    to be sent out """
+    msg = jina_pb2.Message()
+    msg.ParseFromString(msg_data)
+    msg = _worker_pea.msg_callback(msg)
+    if msg:
+        _worker_pea.save_executor(_worker_pea.args.dump_interval)
+        return msg.SerializeToString()
+
+
+def _save_in_worker():
+    """Save the executor in a worker process, see :func:`BasePea.worker_loop_body` """
+    _worker_pea.save_executor(dump_interval=0)
@@ -5,7 +5,7 @@ import asyncio
 import os
 import sys
 import tempfile
-from typing import List, Callable, Optional
+from typing import List, Callable, Optional, Dict
 from typing import Tuple
 
 import zmq
@@ -48,6 +48,8 @@ class Zmqlet:
                                   f'use "pip install lz4" to install this dependency')
                 args.compress_hwm = -1  # disable the compression
         self.send_recv_kwargs = vars(args)
+        #: the chunk embeddings received in the zero-copy mode, i.e. a map from ``chunk_id`` to the received buffer
+        self.buffers = {} if getattr(args, 'zero_copy', False) else None
         self.ctrl_addr, self.ctrl_with_ipc = self.get_ctrl_address(args)
         self.opened_socks = []
         self.bytes_sent = 0
@@ -189,8 +191,11 @@ class Zmqlet:
         else:
             o_sock = self.ctrl_sock
 
-        self.bytes_sent += send_message(o_sock, msg, **self.send_recv_kwargs)
+        self.bytes_sent += send_message(o_sock, msg, buffers=self.buffers, **self.send_recv_kwargs)
         self.msg_sent += 1
+        if self.buffers:
+            # the embeddings have been sent along with the message, they are not needed anymore
+            self.buffers.clear()
 
         if o_sock == self.out_sock and self.in_sock.type == zmq.DEALER:
             self.send_idle(msg)
@@ -215,11 +220,12 @@ class Zmqlet:
         """
         i_sock = self._pull()
         if i_sock is not None:
-            msg, num_bytes = recv_message(i_sock, **self.send_recv_kwargs)
+            msg, num_bytes = recv_message(i_sock, buffers=self.buffers, **self.send_recv_kwargs)
             self.bytes_recv += num_bytes
             self.msg_recv += 1
             if callback:
                 return callback(msg)
+            return msg
 
     def clear_stats(self):
         """Reset the internal counter of send and receive bytes to zero. """
@@ -289,7 +295,8 @@ def send_ctrl_message(address: str, cmd: 'jina_pb2.Request.ControlRequest', time
 
 
 def send_message(sock: 'zmq.Socket', msg: 'jina_pb2.Message', timeout: int = -1,
-                 array_in_pb: bool = False, compress_hwm: int = -1, compress_lwm: float = 1., **kwargs) -> int:
+                 array_in_pb: bool = False, compress_hwm: int = -1, compress_lwm: float = 1.,
+                 buffers: Optional[Dict[int, memoryview]] = None, **kwargs) -> int:
     """Send a protobuf message to a socket
 
     :param sock: the target socket to send
@@ -298,10 +305,12 @@ def send_message(sock: 'zmq.Socket', msg: 'jina_pb2.Message', timeout: int = -1,
     :param array_in_pb: send the numpy array within the protobuf message, this often yields worse network efficiency
     :param compress_hwm: message bigger than this size (in bytes) will be compressed by lz4 algorithm, set to -1 to disable this feature.
     :param compress_lwm: the low watermark that enables the sending of a compressed message.
+    :param buffers: the chunk embeddings received in the zero-copy mode, they are sent for the chunks whose
+        embedding is not filled in the message
     :return: the size (in bytes) of the sent message
     """
     try:
-        _msg, num_bytes = _prep_send_msg(array_in_pb, compress_hwm, compress_lwm, msg, sock, timeout)
+        _msg, num_bytes = _prep_send_msg(array_in_pb, compress_hwm, compress_lwm, msg, sock, timeout, buffers)
 
         sock.send_multipart(_msg)
     except zmq.error.Again:
@@ -324,16 +333,19 @@ def send_message(sock: 'zmq.Socket', msg: 'jina_pb2.Message', timeout: int = -1,
     return num_bytes
 
 
-def _prep_send_msg(array_in_pb, compress_hwm, compress_lwm, msg, sock, timeout):
+def _prep_send_msg(array_in_pb, compress_hwm, compress_lwm, msg, sock, timeout, buffers=None):
     if timeout > 0:
         sock.setsockopt(zmq.SNDTIMEO, timeout)
     else:
         sock.setsockopt(zmq.SNDTIMEO, -1)
     c_id = msg.envelope.receiver_id
     if array_in_pb:
+        if buffers:
+            # the embeddings received in the zero-copy mode have to be put back into the message
+            _fill_embeddings_to_msg(msg, buffers)
         _msg, num_bytes = _prepare_send_msg(c_id, [msg.SerializeToString()], compress_hwm, compress_lwm)
     else:
-        doc_bytes, chunk_bytes, chunk_byte_type = _extract_bytes_from_msg(msg)
+        doc_bytes, chunk_bytes, chunk_byte_type = _extract_bytes_from_msg(msg, buffers)
         # now raw_bytes are removed from message, hoping for faster de/serialization
         _msg = [msg.SerializeToString(),  # 1
                 chunk_byte_type,  # 2
@@ -381,13 +393,16 @@ async def send_message_async(sock: 'zmq.Socket', msg: 'jina_pb2.Message', timeou
             pass
 
 
-def recv_message(sock: 'zmq.Socket', timeout: int = -1, check_version: bool = False, **kwargs) -> Tuple[
-    'jina_pb2.Message', int]:
+def recv_message(sock: 'zmq.Socket', timeout: int = -1, check_version: bool = False,
+                 buffers: Optional[Dict[int, memoryview]] = None, **kwargs) -> Tuple['jina_pb2.Message', int]:
     """ Receive a protobuf message from a socket
 
     :param sock: the socket to pull from
     :param timeout: max wait time for pulling, -1 means wait forever
     :param check_version: check if the jina, protobuf version info in the incoming message consists with the local versions
+    :param buffers: enable the zero-copy mode when given. The message is received without copying and the chunk
+        embeddings are not filled into the message, instead they are put into this dict as a map from ``chunk_id``
+        to the received buffer, see :func:`jina.drivers.helper.extract_chunks`
     :return: a tuple of two pieces
 
             - the received protobuf message
@@ -399,9 +414,9 @@ def recv_message(sock: 'zmq.Socket', timeout: int = -1, check_version: bool = Fa
         else:
             sock.setsockopt(zmq.RCVTIMEO, -1)
 
-        msg_data = sock.recv_multipart()
+        msg_data = sock.recv_multipart(copy=buffers is None)
 
-        return _prepare_recv_msg(sock, msg_data, check_version)
+        return _prepare_recv_msg(sock, msg_data, check_version, buffers)
 
     except zmq.error.Again:
         raise TimeoutError(
@@ -459,13 +474,13 @@ def _prepare_send_msg(client_id, bodies: List[bytes], compress_hwm: int, compres
     if isinstance(client_id, str):
         client_id = client_id.encode()
 
-    _size_before = sum(sys.getsizeof(m) for m in bodies)
+    _size_before = sum(_get_size(m) for m in bodies)
     if _size_before > compress_hwm > 0:
         from ..logging import default_logger
         import lz4.frame
         _bodies = [lz4.frame.compress(m) for m in bodies]
         is_compressed = b'1'
-        _size_after = sum(sys.getsizeof(m) for m in _bodies)
+        _size_after = sum(_get_size(m) for m in _bodies)
         rate = _size_after / _size_before
         default_logger.debug(f'compressed, before: {_size_before} after: {_size_after}, '
                              f'ratio: {(_size_after / _size_before * 100):.0f}%')
@@ -479,11 +494,11 @@ def _prepare_send_msg(client_id, bodies: List[bytes], compress_hwm: int, compres
 
     _header = [client_id, is_compressed]
     msg = _header + _bodies
-    num_bytes = sum(sys.getsizeof(m) for m in msg)
+    num_bytes = sum(_get_size(m) for m in msg)
     return msg, num_bytes
 
 
-def _prepare_recv_msg(sock, msg_data, check_version: bool):
+def _prepare_recv_msg(sock, msg_data, check_version: bool, buffers: Optional[Dict[int, memoryview]] = None):
     if sock.type == zmq.DEALER:
         # dealer consumes the first part of the message as id, we need to prepend it back
         msg_data = [' '] + msg_data
@@ -491,6 +506,11 @@ def _prepare_recv_msg(sock, msg_data, check_version: bool):
         # the router appends dealer id when receive it, we need to remove it
         msg_data.pop(0)
 
+    if buffers is not None:
+        # received in the zero-copy mode, keep the raw bytes as buffers over the frames, the headers are small
+        msg_data = [(m.bytes if j < 6 else m.buffer) if isinstance(m, zmq.Frame) else m
+                    for j, m in enumerate(msg_data)]
+
     if msg_data[1] == b'1':
         # body message is compressed
         import lz4.frame
@@ -499,7 +519,7 @@ def _prepare_recv_msg(sock, msg_data, check_version: bool):
 
     msg = jina_pb2.Message()
 
-    num_bytes = sum(sys.getsizeof(m) for m in msg_data)
+    num_bytes = sum(_get_size(m) for m in msg_data)
 
     msg.ParseFromString(msg_data[2])
 
@@ -508,7 +528,7 @@ def _prepare_recv_msg(sock, msg_data, check_version: bool):
 
     # now we have a barebone msg, we need to fill in data
     if len(msg_data) > 3:
-        _fill_raw_bytes_to_msg(msg, msg_data, offset=3)
+        _fill_raw_bytes_to_msg(msg, msg_data, offset=3, buffers=buffers)
 
     return msg, num_bytes
 
@@ -619,12 +639,13 @@ def _check_msg_version(msg: 'jina_pb2.Message'):
                                 'the message is probably sent from a very outdated JINA version')
 
 
-def _extract_bytes_from_msg(msg: 'jina_pb2.Message') -> Tuple:
+def _extract_bytes_from_msg(msg: 'jina_pb2.Message', buffers: Optional[Dict[int, memoryview]] = None) -> Tuple:
     doc_bytes = []
     chunk_bytes = []
     chunk_byte_type = b''
 
-    docs = msg.request.train.docs or msg.request.index.docs or msg.request.search.docs
+    docs = msg.request.train.docs or msg.request.index.docs or msg.request.search.docs or \
+           msg.request.update.docs or msg.request.delete.docs
     # for train request
     for d in docs:
         doc_bytes.append(d.raw_bytes)
@@ -636,7 +657,11 @@ def _extract_bytes_from_msg(msg: 'jina_pb2.Message') -> Tuple:
             # NdArray blob = 3;
             # bytes raw = 7;
             # }
-            chunk_bytes.append(c.embedding.raw_bytes)
+            if not c.embedding.raw_bytes and buffers and c.HasField('embedding'):
+                # the embedding received in the zero-copy mode and never filled into the message
+                chunk_bytes.append(buffers.get(c.chunk_id, b''))
+            else:
+                chunk_bytes.append(c.embedding.raw_bytes)
             c.embedding.ClearField('raw_bytes')
 
             ctype = c.WhichOneof('content') or ''
@@ -654,7 +679,8 @@ def _extract_bytes_from_msg(msg: 'jina_pb2.Message') -> Tuple:
     return doc_bytes, chunk_bytes, chunk_byte_type
 
 
-def _fill_raw_bytes_to_msg(msg: 'jina_pb2.Message', msg_data: List[bytes], offset: int = 2):
+def _fill_raw_bytes_to_msg(msg: 'jina_pb2.Message', msg_data: List[bytes], offset: int = 2,
+                           buffers: Optional[Dict[int, memoryview]] = None):
     chunk_byte_type = msg_data[offset].decode()
     doc_bytes_len = int(msg_data[offset + 1])
     chunk_bytes_len = int(msg_data[offset + 2])
@@ -667,28 +693,49 @@ def _fill_raw_bytes_to_msg(msg: 'jina_pb2.Message', msg_data: List[bytes], offse
         raise ValueError('"chunk_bytes_len"=%d in message, but the actual length is %d' % (
             chunk_bytes_len, len(chunk_bytes)))
 
-    docs = msg.request.train.docs or msg.request.index.docs or msg.request.search.docs
+    docs = msg.request.train.docs or msg.request.index.docs or msg.request.search.docs or \
+           msg.request.update.docs or msg.request.delete.docs
     for d in docs:
         if doc_bytes and doc_bytes[d_idx]:
-            d.raw_bytes = doc_bytes[d_idx]
+            d.raw_bytes = bytes(doc_bytes[d_idx])
             d_idx += 1
 
         for c in d.chunks:
             if chunk_bytes and chunk_bytes[c_idx]:
-                c.embedding.raw_bytes = chunk_bytes[c_idx]
+                if buffers is not None:
+                    # zero-copy mode, the embedding is read from the buffer directly
+                    buffers[c.chunk_id] = chunk_bytes[c_idx]
+                else:
+                    c.embedding.raw_bytes = chunk_bytes[c_idx]
             c_idx += 1
 
             if chunk_byte_type == 'raw_bytes':
-                c.raw_bytes = chunk_bytes[c_idx]
+                c.raw_bytes = bytes(chunk_bytes[c_idx])
                 c_idx += 1
             elif chunk_byte_type == 'blob':
-                c.blob.raw_bytes = chunk_bytes[c_idx]
+                c.blob.raw_bytes = bytes(chunk_bytes[c_idx])
                 c_idx += 1
             elif chunk_byte_type == 'text':
-                c.text = chunk_bytes[c_idx].decode()
+                c.text = bytes(chunk_bytes[c_idx]).decode()
                 c_idx += 1
 
 
+def _fill_embeddings_to_msg(msg: 'jina_pb2.Message', buffers: Dict[int, memoryview]):
+    """Fill the embeddings received in the zero-copy mode back into the message """
+    docs = msg.request.train.docs or msg.request.index.docs or msg.request.search.docs or \
+           msg.request.update.docs or msg.request.delete.docs
+    for d in docs:
+        for c in d.chunks:
+            if not c.embedding.raw_bytes and c.HasField('embedding') and c.chunk_id in buffers:
+                c.embedding.raw_bytes = bytes(buffers[c.chunk_id])
+
+
+def _get_size(m) -> int:
+    if isinstance(m, memoryview):
+        return m.nbytes
+    return sys.getsizeof(m)
+
+
 def remove_envelope(m: 'jina_pb2.Message') -> 'jina_pb2.Request':
     """Remove the envelope and return only the request body """
 
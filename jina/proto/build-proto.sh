@@ -5,6 +5,8 @@ SRC_DIR=./
 SRC_NAME=jina.proto
 VER_FILE=../__init__.py
 
+# jina_pb2.py is generated by protoc 3.21 with the builder API, it requires protobuf>=3.20 at runtime (see setup.py)
+
 # set up the plugin path
 PLUGIN_PATH=/Volumes/TOSHIBA-4T/Documents/grpc/bins/opt/grpc_python_plugin
 
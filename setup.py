@@ -34,7 +34,7 @@ except FileNotFoundError:
 base_dep = [
     'numpy',
     'pyzmq>=17.1.0',
-    'protobuf',
+    'protobuf>=3.20',
     'grpcio',
     'ruamel.yaml>=0.15.89',
 ]
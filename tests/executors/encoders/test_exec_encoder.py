@@ -1,10 +1,16 @@
 import os
 import unittest
+from types import SimpleNamespace
 
 import numpy as np
 
+from jina.drivers.encode import EncodeDriver
+from jina.drivers.helper import array2pb, pb2array, unpack_embeddings
 from jina.executors import BaseExecutor
+from jina.executors.encoders.cache import EmbeddingCache
 from jina.executors.encoders.nlp.char import OneHotTextEncoder
+from jina.peapods.zmq import add_envelope
+from jina.proto import jina_pb2
 from tests import JinaTestCase
 
 
@@ -45,6 +51,132 @@ class MyTestCase(JinaTestCase):
 
         self.add_tmpfile(encoder_loaded.config_abspath, encoder_loaded.save_abspath)
 
+    def test_embedding_cache(self):
+        encoder = OneHotTextEncoder(workspace=os.environ['TEST_WORKDIR'])
+        path = os.path.join(os.environ['TEST_WORKDIR'], 'embedding.cache')
+        self.add_tmpfile(path, path + '.keys', path + '.json', path + '.lock')
+        num_encoded = []
+
+        def encode(data):
+            num_encoded.append(data.shape[0])
+            return encoder.encode(data)
+
+        test_data = np.array(['a', 'b', 'a', 'xyz'])
+        cache = EmbeddingCache(max_entries=10, path=path)
+        np.testing.assert_array_equal(cache.encode(test_data, encode), encoder.encode(test_data))
+        # the duplicated text is encoded once, the cached texts are not encoded again
+        np.testing.assert_array_equal(cache.encode(test_data[::-1], encode), encoder.encode(test_data[::-1]))
+        self.assertEqual(num_encoded, [3])
+        self.assertEqual(cache.stats['hits'], 4)
+        self.assertEqual(cache.stats['disk_entries'], 3)
+
+        # a new cache starts from the on-disk tier
+        cache = EmbeddingCache(max_entries=10, path=path)
+        test_data = np.array(['b', 'c'])
+        np.testing.assert_array_equal(cache.encode(test_data, encode), encoder.encode(test_data))
+        self.assertEqual(num_encoded, [3, 1])
+        self.assertEqual(cache.stats['disk_hits'], 1)
+        self.assertEqual(cache.stats['disk_entries'], 4)
+
+    def test_shared_embedding_cache(self):
+        encoder = OneHotTextEncoder(workspace=os.environ['TEST_WORKDIR'])
+        path = os.path.join(os.environ['TEST_WORKDIR'], 'embedding.shared.cache')
+        self.add_tmpfile(path, path + '.keys', path + '.json', path + '.lock')
+        num_encoded = []
+
+        def encode(data):
+            num_encoded.append(data.shape[0])
+            return encoder.encode(data)
+
+        # two caches appending to the same files, e.g. in two workers
+        a = EmbeddingCache(max_entries=10, path=path)
+        b = EmbeddingCache(max_entries=10, path=path)
+        a.encode(np.array(['a']), encode)
+        b.encode(np.array(['bbbb']), encode)
+        a.encode(np.array(['cccccc']), encode)
+        # the embedding appended by the other cache is loaded on a miss
+        test_data = np.array(['a', 'bbbb', 'cccccc'])
+        np.testing.assert_array_equal(b.encode(test_data, encode), encoder.encode(test_data))
+        self.assertEqual(num_encoded, [1, 1, 1])
+        self.assertEqual(b.stats['disk_hits'], 2)
+
+        c = EmbeddingCache(max_entries=10, path=path)
+        np.testing.assert_array_equal(c.encode(test_data[::-1], encode), encoder.encode(test_data[::-1]))
+        self.assertEqual(num_encoded, [1, 1, 1])
+        self.assertEqual(c.stats['disk_entries'], 3)
+
+    def test_encode_driver_cache(self):
+        encoder = OneHotTextEncoder(workspace=os.environ['TEST_WORKDIR'])
+        driver = EncodeDriver(cache_size=10)
+        for _ in range(2):
+            req = jina_pb2.Request()
+            for t in ['a', 'b', 'a']:
+                req.index.docs.add().chunks.add().text = t
+            driver.attach(executor=encoder, pea=SimpleNamespace(request=req.index, message=None, logger=encoder.logger))
+            driver()
+            for d in req.index.docs:
+                np.testing.assert_array_equal(pb2array(d.chunks[0].embedding),
+                                              encoder.encode(np.array([d.chunks[0].text]))[0])
+        self.assertEqual(driver.stats['cache_misses'], 3)
+        self.assertEqual(driver.stats['cache_hits'], 3)
+
+    def test_encode_driver_batch(self):
+        encoder = OneHotTextEncoder(workspace=os.environ['TEST_WORKDIR'])
+        driver = EncodeDriver(pack_embedding=True)
+        msgs = []
+        for texts in (['a', 'b'], [], ['c']):
+            req = jina_pb2.Request()
+            d = req.index.docs.add()
+            for t in texts:
+                c = d.chunks.add()
+                c.text = t
+                c.chunk_id = ord(t)
+            msgs.append(add_envelope(req, 'test', 'test-id'))
+        driver.attach(executor=encoder, pea=SimpleNamespace(request=None, message=None, logger=encoder.logger))
+        driver.encode_batch(msgs)
+        for msg in msgs:
+            # the following call on each message does not encode again
+            driver.attach(executor=encoder, pea=SimpleNamespace(request=msg.request.index, message=msg,
+                                                                logger=encoder.logger))
+            driver()
+            unpack_embeddings(msg.request.index)
+            for c in msg.request.index.docs[0].chunks:
+                np.testing.assert_array_equal(pb2array(c.embedding), encoder.encode(np.array([c.text]))[0])
+        self.assertFalse(driver._batched)
+
+    def test_encode_driver_batch_shapes(self):
+        encoder = OneHotTextEncoder(workspace=os.environ['TEST_WORKDIR'])
+        shapes = []
+
+        def encode(data):
+            shapes.append(data.shape)
+            if data.shape[1] == 3:
+                raise ValueError('can not encode the 3-dim blobs')
+            return data * 2
+
+        encoder.encode = encode
+        driver = EncodeDriver()
+        msgs = []
+        for j, dim in enumerate((2, 3, 2)):
+            req = jina_pb2.Request()
+            req.request_id = j
+            req.index.docs.add().chunks.add().blob.CopyFrom(array2pb(np.ones(dim)))
+            msgs.append(add_envelope(req, 'test', 'test-id'))
+        driver.attach(executor=encoder, pea=SimpleNamespace(request=None, message=None, logger=encoder.logger))
+        # the blobs of different shapes are not stacked, the 2-dim ones are encoded together
+        driver.encode_batch(msgs)
+        self.assertEqual(shapes, [(2, 2), (1, 3)])
+        self.assertEqual(set(driver._batched), {0, 2})
+        for msg in msgs:
+            driver.attach(executor=encoder, pea=SimpleNamespace(request=msg.request.index, message=msg,
+                                                                logger=encoder.logger))
+            driver()
+        # the failed message is not marked as encoded, and is encoded again on its own
+        self.assertEqual(shapes, [(2, 2), (1, 3), (1, 3)])
+        np.testing.assert_array_equal(pb2array(msgs[2].request.index.docs[0].chunks[0].embedding), np.ones(2) * 2)
+        self.assertFalse(msgs[1].request.index.docs[0].chunks[0].HasField('embedding'))
+        self.assertFalse(driver._batched)
+
 
 if __name__ == '__main__':
     unittest.main()
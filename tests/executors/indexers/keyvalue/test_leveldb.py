@@ -1,3 +1,4 @@
+import json
 import os
 import unittest
 
@@ -33,8 +34,59 @@ class MyTestCase(JinaTestCase):
         doc = searcher.query('d2')
         self.assertEqual(doc.doc_id, 2)
         self.assertEqual(doc.length, 3)
+        docs = searcher.query_batch(['d3', 'd4', 'd1'])
+        self.assertEqual(docs[0].doc_id, 3)
+        self.assertIsNone(docs[1])
+        self.assertEqual(docs[2].doc_id, 1)
         self.add_tmpfile(indexer.save_abspath, indexer.index_abspath)
 
+    def test_update_delete(self):
+        indexer = LeveldbIndexer(index_filename='leveldb.delete.db')
+        self.add_tmpfile(indexer.save_abspath, indexer.index_abspath)
+        indexer.add({f'd{j}': self._create_Document(j, 'cat', 0.1, 3).SerializeToString() for j in (1, 2, 3)})
+        indexer.update({'d2': self._create_Document(2, 'dog', 0.1, 3)})
+        indexer.delete(['d3', 'd4'])
+        self.assertEqual(indexer.query('d2').raw_bytes, b'dog')
+        self.assertEqual([d.doc_id if d else None for d in indexer.query_batch(['d1', 'd3'])], [1, None])
+        self.assertEqual(indexer.compact(), 0)
+        self.assertEqual(indexer.query('d1').raw_bytes, b'cat')
+        indexer.close()
+
+    def test_convert_from_json(self):
+        import plyvel
+        indexer = LeveldbIndexer(index_filename='leveldb.json.db')
+        self.add_tmpfile(indexer.save_abspath, indexer.index_abspath)
+        # a database written by the older versions
+        db = plyvel.DB(indexer.index_abspath, create_if_missing=True)
+        for doc_id in (1, 2, 3):
+            v = MessageToJson(self._create_Document(doc_id, 'cat', 0.1, 3))
+            db.put(f'd{doc_id}'.encode('utf8'), json.dumps(v).encode('utf8'))
+        db.close()
+
+        self.assertTrue(indexer.is_legacy_file)
+        self.assertEqual(indexer.query('d2').doc_id, 2)
+        self.assertEqual(indexer.convert_from_json(), 3)
+        self.assertFalse(indexer.is_legacy_file)
+        self.assertEqual(indexer.query_batch(['d3', 'd2'])[1].doc_id, 2)
+        indexer.add({'d4': self._create_Document(4, 'dog', 0.1, 3).SerializeToString()})
+        self.assertEqual(indexer.query('d4').doc_id, 4)
+        indexer.close()
+
+    def test_add_to_json(self):
+        import plyvel
+        indexer = LeveldbIndexer(index_filename='leveldb.json.add.db')
+        self.add_tmpfile(indexer.save_abspath, indexer.index_abspath)
+        db = plyvel.DB(indexer.index_abspath, create_if_missing=True)
+        v = MessageToJson(self._create_Document(1, 'cat', 0.1, 3))
+        db.put(b'd1', json.dumps(v).encode('utf8'))
+        db.close()
+
+        # the database is converted before adding, nothing is lost
+        indexer.add({'d2': self._create_Document(2, 'dog', 0.1, 3).SerializeToString()})
+        self.assertFalse(indexer.is_legacy_file)
+        self.assertEqual([d.raw_bytes for d in indexer.query_batch(['d1', 'd2'])], [b'cat', b'dog'])
+        indexer.close()
+
     def test_add_query(self):
         indexer = LeveldbIndexer(index_filename='leveldb.db')
         self.run_test(indexer)
@@ -0,0 +1,193 @@
+import gzip
+import json
+import os
+import unittest
+from types import SimpleNamespace
+
+from google.protobuf.json_format import MessageToJson
+
+import jina.proto.jina_pb2 as jina_pb2
+from jina.drivers.index import KVIndexDriver, KVDeleteDriver
+from jina.executors.indexers import BaseIndexer
+from jina.executors.indexers.keyvalue.proto import BasePbIndexer, HEADER_MAGIC, LazyPbReader, SortedOffsets
+from tests import JinaTestCase
+
+
+def create_document(doc_id, text):
+    d = jina_pb2.Document()
+    d.doc_id = doc_id
+    d.raw_bytes = text.encode('utf8')
+    c = d.chunks.add()
+    c.chunk_id = doc_id * 10
+    c.doc_id = doc_id
+    return d
+
+
+class MyTestCase(JinaTestCase):
+
+    def _assert_query(self, searcher):
+        self.assertEqual(searcher.query('d2').raw_bytes, b'dog')
+        self.assertEqual(searcher.query('c10').doc_id, 1)
+        docs = searcher.query_batch(['d3', 'd4', 'd1'])
+        self.assertEqual(docs[0].doc_id, 3)
+        self.assertIsNone(docs[1])
+        self.assertEqual(docs[2].doc_id, 1)
+
+    def test_binary_add_query(self):
+        indexer = BasePbIndexer(index_filename='pb.test.bin')
+        d1, d2, d3 = create_document(1, 'cat'), create_document(2, 'dog'), create_document(3, 'bird')
+        # binary, JSON and protobuf values are all accepted
+        indexer.add({'d1': d1.SerializeToString(), 'c10': d1.chunks[0].SerializeToString()})
+        indexer.add({'d2': MessageToJson(d2), 'd3': d3})
+        indexer.save()
+        indexer.close()
+        self.add_tmpfile(indexer.index_abspath, indexer.save_abspath, indexer.offset_abspath,
+                         indexer.sorted_offset_abspath)
+        with open(indexer.index_abspath, 'rb') as fp:
+            self.assertEqual(fp.read(len(HEADER_MAGIC)), HEADER_MAGIC)
+
+        self._assert_query(BaseIndexer.load(indexer.save_abspath))
+
+        # the offset index is rebuilt when it is missing
+        os.remove(indexer.offset_abspath)
+        self._assert_query(BaseIndexer.load(indexer.save_abspath))
+        self.assertTrue(os.path.exists(indexer.offset_abspath))
+
+    def test_lazy_query_handler(self):
+        indexer = BasePbIndexer(index_filename='pb.lazy.bin', cache_size=2)
+        indexer.add({f'd{j}': create_document(j, str(j)) for j in range(10)})
+        indexer.save()
+        indexer.close()
+        self.add_tmpfile(indexer.index_abspath, indexer.save_abspath, indexer.offset_abspath,
+                         indexer.sorted_offset_abspath)
+
+        searcher = BaseIndexer.load(indexer.save_abspath)
+        self.assertIsInstance(searcher.query_handler, LazyPbReader)
+        self.assertTrue(os.path.exists(indexer.sorted_offset_abspath))
+        self.assertEqual(len(searcher.query_handler), 10)
+        # nothing is parsed before querying
+        self.assertEqual(len(searcher.query_handler._cache), 0)
+        for j in (1, 2, 3, 1):
+            self.assertEqual(searcher.query(f'd{j}').raw_bytes, str(j).encode('utf8'))
+        self.assertEqual(list(searcher.query_handler._cache.keys()), ['d3', 'd1'])
+        self.assertIsNone(searcher.query('d10'))
+        searcher.close()
+
+    def test_sorted_offsets(self):
+        indexer = BasePbIndexer(index_filename='pb.sorted.bin')
+        indexer.add({f'd{j}': create_document(j, str(j)) for j in range(100)})
+        indexer.save()
+        indexer.close()
+        self.add_tmpfile(indexer.index_abspath, indexer.save_abspath, indexer.offset_abspath,
+                         indexer.sorted_offset_abspath)
+
+        searcher = BaseIndexer.load(indexer.save_abspath)
+        self.assertIsInstance(searcher.query_handler._offsets, SortedOffsets)
+        self.assertEqual(searcher.query_handler._offsets.num_sorted, 100)
+        self.assertEqual(searcher.query('d42').raw_bytes, b'42')
+        self.assertIsNone(searcher.query('d420'))
+        # a few new entries are read from the offset index without rewriting the sorted one
+        mtime = os.path.getmtime(indexer.sorted_offset_abspath)
+        searcher.update({'d1': create_document(1, 'wolf'), 'd1000': create_document(1000, 'cat')})
+        searcher.delete(['d2'])
+        self.assertEqual(searcher.query('d1').raw_bytes, b'wolf')
+        self.assertEqual(searcher.query_batch(['d1000', 'd2', 'd3']),
+                         [create_document(1000, 'cat'), None, create_document(3, '3')])
+        self.assertEqual(len(searcher.query_handler), 100)
+        self.assertEqual(set(searcher.query_handler.keys()), {f'd{j}' for j in range(100) if j != 2} | {'d1000'})
+        self.assertEqual(os.path.getmtime(indexer.sorted_offset_abspath), mtime)
+
+        # the sorted offset index is rewritten when the new entries are too many
+        searcher.update({f'd{j}': create_document(j, 'dog') for j in range(3, 20)})
+        self.assertEqual(searcher.query('d3').raw_bytes, b'dog')
+        self.assertEqual(searcher.query_handler._offsets.num_sorted, 100)
+        self.assertEqual(searcher.query_handler._offsets._recent, {})
+        self.assertEqual(searcher.query('d1').raw_bytes, b'wolf')
+        self.assertIsNone(searcher.query('d2'))
+        searcher.close()
+
+    def test_convert_from_json(self):
+        indexer = BasePbIndexer(index_filename='pb.test.gz')
+        d1, d2, d3 = create_document(1, 'cat'), create_document(2, 'dog'), create_document(3, 'bird')
+        # an index file written by the older versions
+        with gzip.open(indexer.index_abspath, 'wt') as fp:
+            for objs in ({'d1': d1, 'c10': d1.chunks[0]}, {'d2': d2}):
+                json.dump({k: MessageToJson(v) for k, v in objs.items()}, fp)
+                fp.write('\n')
+        self.add_tmpfile(indexer.index_abspath, indexer.save_abspath, indexer.offset_abspath,
+                         indexer.sorted_offset_abspath)
+
+        # appending keeps the legacy format
+        indexer.add({'d3': d3.SerializeToString()})
+        indexer.save()
+        indexer.close()
+        self.assertTrue(indexer.is_legacy_file)
+
+        searcher = BaseIndexer.load(indexer.save_abspath)
+        self._assert_query(searcher)
+        self.assertEqual(searcher.convert_from_json(), 4)
+        self.assertFalse(searcher.is_legacy_file)
+        self._assert_query(searcher)
+        self.assertEqual(searcher.convert_from_json(), 0)
+
+    def test_update_delete_compact(self):
+        indexer = BasePbIndexer(index_filename='pb.delete.bin')
+        d1, d2, d3 = create_document(1, 'cat'), create_document(2, 'dog'), create_document(3, 'bird')
+        indexer.add({'d1': d1, 'c10': d1.chunks[0], 'd2': d2, 'd3': d3})
+        self.add_tmpfile(indexer.index_abspath, indexer.save_abspath, indexer.offset_abspath,
+                         indexer.sorted_offset_abspath)
+        self.assertEqual(indexer.query('d2').raw_bytes, b'dog')
+
+        # the changes are visible to the loaded query handler
+        indexer.update({'d2': create_document(2, 'wolf')})
+        indexer.delete(['d3', 'c10', 'd4'])
+        self.assertEqual(indexer.query('d2').raw_bytes, b'wolf')
+        self.assertEqual(indexer.query_batch(['d1', 'd3', 'c10']), [d1, None, None])
+        indexer.save()
+        indexer.close()
+
+        def _assert_query(searcher):
+            self.assertEqual(searcher.query('d2').raw_bytes, b'wolf')
+            self.assertEqual(searcher.query_batch(['d1', 'd3', 'c10']), [d1, None, None])
+            self.assertEqual(len(searcher.query_handler), 2)
+
+        searcher = BaseIndexer.load(indexer.save_abspath)
+        _assert_query(searcher)
+        # the tombstones are kept in the index file, so the offset index can be rebuilt
+        os.remove(indexer.offset_abspath)
+        searcher = BaseIndexer.load(indexer.save_abspath)
+        _assert_query(searcher)
+
+        size = os.path.getsize(indexer.index_abspath)
+        # the old d2, d3, c10 and the tombstones of d3, c10 and d4
+        self.assertEqual(searcher.compact(), 6)
+        self.assertLess(os.path.getsize(indexer.index_abspath), size)
+        _assert_query(searcher)
+        self.assertEqual(searcher.compact(), 0)
+        searcher.close()
+
+    def test_update_delete_driver(self):
+        indexer = BasePbIndexer(index_filename='pb.driver.bin')
+        indexer.add({f'd{j}': create_document(j, 'cat') for j in range(1, 4)})
+        self.add_tmpfile(indexer.index_abspath, indexer.save_abspath, indexer.offset_abspath,
+                         indexer.sorted_offset_abspath)
+
+        req = jina_pb2.Request()
+        req.update.docs.add().CopyFrom(create_document(1, 'dog'))
+        driver = KVIndexDriver(level='doc', method='update')
+        driver.attach(executor=indexer, pea=SimpleNamespace(request=req.update, message=None))
+        driver()
+        self.assertEqual(indexer.query('d1').raw_bytes, b'dog')
+
+        req = jina_pb2.Request()
+        req.delete.docs.add().doc_id = 2
+        driver = KVDeleteDriver(level='doc')
+        driver.attach(executor=indexer, pea=SimpleNamespace(request=req.delete, message=None))
+        driver()
+        self.assertIsNone(indexer.query('d2'))
+        self.assertEqual(indexer.query('d3').raw_bytes, b'cat')
+        indexer.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
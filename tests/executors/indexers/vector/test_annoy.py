@@ -32,6 +32,7 @@ class MyTestCase(JinaTestCase):
         a.add(vec_idx, vec)
         a.save()
         a.close()
+        self.add_tmpfile(a.index_abspath, a.save_abspath, a.norm_abspath, a.keys_abspath)
         self.assertTrue(os.path.exists(a.index_abspath))
         # a.query(np.array(np.random.random([10, 5]), dtype=np.float32), top_k=4)
 
@@ -45,13 +46,13 @@ class MyTestCase(JinaTestCase):
             np.testing.assert_almost_equal(retr_idx, idx)
         self.assertEqual(idx.shape, dist.shape)
         self.assertEqual(idx.shape, (10, 4))
-        self.add_tmpfile(a.index_abspath, a.save_abspath)
 
     def test_scipy_indexer(self):
         a = NumpyIndexer(index_filename='np.test.gz', backend='scipy')
         a.add(vec_idx, vec)
         a.save()
         a.close()
+        self.add_tmpfile(a.index_abspath, a.save_abspath, a.norm_abspath, a.keys_abspath)
         self.assertTrue(os.path.exists(a.index_abspath))
         # a.query(np.array(np.random.random([10, 5]), dtype=np.float32), top_k=4)
 
@@ -65,13 +66,13 @@ class MyTestCase(JinaTestCase):
             np.testing.assert_almost_equal(retr_idx, idx)
         self.assertEqual(idx.shape, dist.shape)
         self.assertEqual(idx.shape, (10, 4))
-        self.add_tmpfile(a.index_abspath, a.save_abspath)
 
     def test_nmslib_indexer(self):
         a = NmslibIndexer(index_filename='np.test.gz', space='l2')
         a.add(vec_idx, vec)
         a.save()
         a.close()
+        self.add_tmpfile(a.index_abspath, a.save_abspath, a.norm_abspath, a.keys_abspath)
         self.assertTrue(os.path.exists(a.index_abspath))
         # a.query(np.array(np.random.random([10, 5]), dtype=np.float32), top_k=4)
 
@@ -85,13 +86,14 @@ class MyTestCase(JinaTestCase):
             np.testing.assert_almost_equal(retr_idx, idx)
         self.assertEqual(idx.shape, dist.shape)
         self.assertEqual(idx.shape, (10, 4))
-        self.add_tmpfile(a.index_abspath, a.save_abspath)
 
     def test_annoy_indexer(self):
         a = AnnoyIndexer(index_filename='annoy.test.gz')
         a.add(vec_idx, vec)
         a.save()
         a.close()
+        self.add_tmpfile(a.index_abspath, a.save_abspath, a.norm_abspath, a.keys_abspath, a.ann_abspath,
+                         a.ann_abspath + '.meta')
         self.assertTrue(os.path.exists(a.index_abspath))
         # a.query(np.array(np.random.random([10, 5]), dtype=np.float32), top_k=4)
 
@@ -105,7 +107,65 @@ class MyTestCase(JinaTestCase):
             np.testing.assert_almost_equal(retr_idx, idx)
         self.assertEqual(idx.shape, dist.shape)
         self.assertEqual(idx.shape, (10, 4))
-        self.add_tmpfile(a.index_abspath, a.save_abspath)
+
+    def test_annoy_persist_index(self):
+        a = AnnoyIndexer(index_filename='annoy.persist.bin', storage='memmap')
+        a.add(vec_idx, vec)
+        a.save()
+        a.close()
+        self.add_tmpfile(a.index_abspath, a.save_abspath, a.norm_abspath, a.keys_abspath, a.ann_abspath,
+                         a.ann_abspath + '.meta')
+
+        b = BaseIndexer.load(a.save_abspath)
+        idx1, dist1 = b.query(query, top_k=4)
+        self.assertTrue(os.path.exists(b.ann_abspath))
+        mtime = os.stat(b.ann_abspath).st_mtime_ns
+
+        # the saved index is loaded instead of rebuilt
+        b = BaseIndexer.load(a.save_abspath)
+        idx2, dist2 = b.query(query, top_k=4)
+        np.testing.assert_equal(idx1, idx2)
+        np.testing.assert_almost_equal(dist1, dist2)
+        self.assertEqual(os.stat(b.ann_abspath).st_mtime_ns, mtime)
+
+        # changing the vectors invalidates the saved index
+        b.add(vec_idx[:, :1] + 100, vec[:1])
+        b.save()
+        b.close()
+        b = BaseIndexer.load(a.save_abspath)
+        self.assertEqual(b.query_handler.get_n_items(), 11)
+
+    def test_annoy_threads(self):
+        a = AnnoyIndexer(index_filename='annoy.threads.bin', storage='memmap')
+        a.add(vec_idx, vec)
+        a.save()
+        a.close()
+        self.add_tmpfile(a.index_abspath, a.save_abspath, a.norm_abspath, a.keys_abspath, a.ann_abspath,
+                         a.ann_abspath + '.meta')
+
+        b = BaseIndexer.load(a.save_abspath)
+        idx1, dist1 = b.query(query, top_k=4)
+        b.close()
+
+        b = BaseIndexer.load(a.save_abspath)
+        b.num_threads = 3
+        idx2, dist2 = b.query(query, top_k=4)
+        np.testing.assert_equal(idx1, idx2)
+        np.testing.assert_almost_equal(dist1, dist2)
+        b.close()
+
+        c = AnnoyIndexer(index_filename='annoy.background.bin', storage='memmap', num_threads=2,
+                         build_in_background=True)
+        c.add(vec_idx, vec)
+        c.save()
+        c.close()
+        self.add_tmpfile(c.index_abspath, c.save_abspath, c.norm_abspath, c.keys_abspath, c.ann_abspath,
+                         c.ann_abspath + '.meta')
+        c = BaseIndexer.load(c.save_abspath)
+        self.assertIsNotNone(c._build_future)
+        idx3, dist3 = c.query(query, top_k=4)
+        np.testing.assert_equal(idx1.shape, idx3.shape)
+        c.close()
 
 
 if __name__ == '__main__':
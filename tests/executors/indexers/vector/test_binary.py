@@ -0,0 +1,65 @@
+import unittest
+
+import numpy as np
+
+from jina.executors.indexers import BaseIndexer
+from jina.executors.indexers.vector.binary import BinaryNumpyIndexer
+from tests import JinaTestCase
+
+np.random.seed(500)
+vec_idx = np.arange(1000) + 100
+query = np.random.random([10, 64]) - 0.5
+
+
+class MyTestCase(JinaTestCase):
+
+    def _build(self, index_filename, vec, **kwargs):
+        a = BinaryNumpyIndexer(index_filename=index_filename, **kwargs)
+        a.add(vec_idx[:500], vec[:500])
+        a.add(vec_idx[500:], vec[500:])
+        a.save()
+        a.close()
+        self.add_tmpfile(a.index_abspath, a.save_abspath, a.keys_abspath)
+        return a
+
+    def test_binary_indexer(self):
+        # 64 bits are searched as uint64 words, 60 bits as bytes
+        for num_bits in (64, 60):
+            vec = np.random.random([1000, num_bits]) - 0.5
+            q = query[:, :num_bits]
+            for storage in ('gzip', 'memmap'):
+                a = self._build(f'binary.{num_bits}.{storage}.bin', vec, storage=storage)
+                b = BaseIndexer.load(a.save_abspath)
+                self.assertEqual(b.query_handler.shape, (1000, 8))
+                self.assertEqual(b.query_handler.dtype, np.uint8)
+
+                from scipy.spatial.distance import cdist
+                expected_dist = cdist(q > 0, vec > 0, metric='hamming') * num_bits
+                for num_threads, query_memory_limit in ((1, 256 * 1024 * 1024), (3, 1)):
+                    b.num_threads = num_threads
+                    b.query_memory_limit = query_memory_limit
+                    idx, dist = b.query(q, top_k=10)
+                    self.assertEqual(idx.shape, (10, 10))
+                    np.testing.assert_almost_equal(dist, np.sort(expected_dist, axis=1)[:, :10])
+                    np.testing.assert_almost_equal(
+                        np.take_along_axis(expected_dist, idx - 100, axis=1), dist)
+                b.close()
+
+    def test_popcount_table(self):
+        from jina.executors.indexers.vector.binary import POPCOUNT_TABLE
+        x = np.random.randint(0, 256, [100, 8], dtype=np.uint8)
+        expected = [sum(bin(v).count('1') for v in row) for row in x]
+        np.testing.assert_equal(POPCOUNT_TABLE[x].sum(axis=1), expected)
+        np.testing.assert_equal(POPCOUNT_TABLE[x.view(np.uint64).view(np.uint8)].sum(axis=1), expected)
+
+    def test_dim_mismatch(self):
+        a = BinaryNumpyIndexer(index_filename='binary.bad.bin')
+        a.add(vec_idx[:2], np.random.random([2, 64]))
+        with self.assertRaises(ValueError):
+            a.add(vec_idx[:2], np.random.random([2, 60]))
+        a.close()
+        self.add_tmpfile(a.index_abspath, a.keys_abspath)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import os
+import unittest
+
+import numpy as np
+
+from jina.executors.indexers import BaseIndexer
+from jina.executors.indexers.vector.ivf import IVFNumpyIndexer
+from jina.executors.indexers.vector.numpy import NumpyIndexer
+from tests import JinaTestCase
+
+np.random.seed(500)
+centers = np.random.random([20, 16]) * 10
+vec = (centers[np.random.randint(0, 20, 2000)] + np.random.random([2000, 16])).astype(np.float32)
+vec_idx = np.arange(2000) + 100
+query = vec[:20] + np.random.random([20, 16]).astype(np.float32) * 0.1
+
+
+class MyTestCase(JinaTestCase):
+
+    def _build(self, index_filename, train=True, **kwargs):
+        a = IVFNumpyIndexer(index_filename=index_filename, **kwargs)
+        if train:
+            a.train(vec[:1000])
+        a.add(vec_idx[:1000], vec[:1000])
+        a.save()
+        a.close()
+        self.add_tmpfile(a.index_abspath, a.save_abspath, a.norm_abspath, a.keys_abspath, a.lists_abspath, a.ann_abspath,
+                         a.ann_abspath + '.meta', a.ann_abspath + '.rows', a.ann_abspath + '.offsets')
+        return a
+
+    def test_ivf_indexer(self):
+        for metric in ('euclidean', 'cosine'):
+            a = self._build(f'ivf.{metric}.bin', nlist=20, nprobe=3, metric=metric)
+            b = NumpyIndexer(index_filename=f'ivf.expected.{metric}.bin', metric=metric)
+            b.add(vec_idx[:1000], vec[:1000])
+            b.close()
+            self.add_tmpfile(b.index_abspath, b.norm_abspath, b.keys_abspath)
+            expected_idx, expected_dist = b.query(query, top_k=10)
+
+            c = BaseIndexer.load(a.save_abspath)
+            idx, dist = c.query(query, top_k=10)
+            self.assertEqual(idx.shape, (20, 10))
+            recall = np.mean([len(set(i) & set(e)) / 10 for i, e in zip(idx, expected_idx)])
+            self.assertGreater(recall, 0.9)
+            np.testing.assert_almost_equal(dist[:, 0], expected_dist[:, 0], decimal=3)
+            self.assertTrue(os.path.exists(c.ann_abspath))
+
+            # probing all lists is the exhaustive search
+            c.nprobe = 20
+            idx, dist = c.query(query, top_k=10)
+            np.testing.assert_equal(idx, expected_idx)
+
+    def test_append(self):
+        a = self._build('ivf.append.bin', nlist=20, nprobe=20)
+        b = BaseIndexer.load(a.save_abspath)
+        self.assertTrue(b.is_trained)
+        b.query(query, top_k=10)
+        mtime = os.path.getmtime(b.ann_abspath)
+
+        # the rearranged lists are reused when nothing has changed
+        b = BaseIndexer.load(a.save_abspath)
+        b.query(query, top_k=10)
+        self.assertEqual(os.path.getmtime(b.ann_abspath), mtime)
+
+        # a few new vectors are searched without rearranging the lists again
+        b.add(vec_idx[1000:1050], vec[1000:1050])
+        b.save()
+        b.close()
+        c = BaseIndexer.load(b.save_abspath)
+        idx2, _ = c.query(vec[1020:1021], top_k=1)
+        self.assertEqual(idx2[0, 0], vec_idx[1020])
+        # probing all lists is the exhaustive search
+        expected = np.argsort(np.sum((query[:, None] - vec[None, :1050]) ** 2, axis=-1), axis=1)[:, :10]
+        np.testing.assert_equal(c.query(query, top_k=10)[0], vec_idx[expected])
+        self.assertEqual(os.path.getmtime(c.ann_abspath), mtime)
+
+        # the lists are rearranged again when the new vectors are too many
+        c.add(vec_idx[1050:], vec[1050:])
+        idx3, _ = c.query(vec[1500:1501], top_k=1)
+        self.assertEqual(idx3[0, 0], vec_idx[1500])
+        self.assertEqual(os.path.getsize(c.lists_abspath), 2000 * 4)
+        self.assertEqual(os.path.getsize(c.ann_abspath), vec.nbytes)
+        c.close()
+
+    def test_add_before_train(self):
+        a = IVFNumpyIndexer(index_filename='ivf.untrained.bin')
+        with self.assertRaises(RuntimeError):
+            a.add(vec_idx[:10], vec[:10])
+
+    def test_not_enough_vectors(self):
+        a = self._build('ivf.small.bin', nlist=20, nprobe=1)
+        b = BaseIndexer.load(a.save_abspath)
+        idx, dist = b.query(query, top_k=500)
+        self.assertLess(idx.shape[1], 500)
+        # each query gets all the vectors of its own list, the shorter rows are padded
+        found = np.isfinite(dist)
+        lists = np.fromfile(b.lists_abspath, dtype=np.int32)
+        np.testing.assert_equal(found.sum(axis=1), np.bincount(lists, minlength=20)[b._assign(query)])
+        self.assertEqual(idx.shape[1], found.sum(axis=1).max())
+        self.assertTrue(np.isin(idx[found], vec_idx).all())
+
+    def test_delete_compact(self):
+        a = self._build('ivf.delete.bin', nlist=20, nprobe=3)
+        b = BaseIndexer.load(a.save_abspath)
+        idx, _ = b.query(query, top_k=10)
+        b.delete(idx[:, 0])
+        idx2, _ = b.query(query, top_k=10)
+        self.assertFalse(np.isin(idx2, idx[:, 0]).any())
+
+        num_deleted = b.compact()
+        self.assertEqual(num_deleted, np.unique(idx[:, 0]).shape[0])
+        self.assertEqual(os.path.getsize(b.lists_abspath), (1000 - num_deleted) * 4)
+        np.testing.assert_equal(b.query(query, top_k=10)[0], idx2)
+        b.close()
+
+    def test_filtered_search(self):
+        a = IVFNumpyIndexer(index_filename='ivf.filter.bin', nlist=20, nprobe=3)
+        a.train(vec[:1000])
+        a.add(vec_idx[:1000], vec[:1000], attributes={'parity': ['odd' if k % 2 else 'even' for k in vec_idx[:1000]]})
+        a.save()
+        a.close()
+        self.add_tmpfile(a.index_abspath, a.save_abspath, a.norm_abspath, a.keys_abspath, a.lists_abspath, a.ann_abspath, a.ann_abspath + '.meta',
+                         a.ann_abspath + '.rows', a.ann_abspath + '.offsets',
+                         a.attributes.manifest_abspath, a.attributes.column_abspath(0))
+        b = BaseIndexer.load(a.save_abspath)
+        idx, _ = b.query(query, top_k=10, filter={'parity': 'odd'})
+        self.assertEqual(idx.shape, (20, 10))
+        self.assertTrue(np.all(idx % 2 == 1))
+        b.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,349 @@
+import gzip
+import os
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from jina.drivers.index import VectorDeleteDriver, VectorIndexDriver
+from jina.drivers.search import VectorSearchDriver
+from jina.executors.indexers import BaseIndexer
+from jina.executors.indexers.vector.numpy import NumpyIndexer
+from jina.proto import jina_pb2
+from jina.drivers.helper import array2pb
+from tests import JinaTestCase
+
+# fix the seed here
+np.random.seed(500)
+vec_idx = np.random.randint(0, high=100, size=[10])
+vec = np.random.random([10, 10])
+query = np.array(np.random.random([10, 10]), dtype=np.float32)
+
+
+class MyTestCase(JinaTestCase):
+
+    def _build(self, index_filename='numpy.test.bin', **kwargs):
+        a = NumpyIndexer(index_filename=index_filename, **kwargs)
+        a.add(vec_idx[:5], vec[:5])
+        a.add(vec_idx[5:], vec[5:])
+        a.save()
+        a.close()
+        self.add_tmpfile(a.index_abspath, a.save_abspath, a.norm_abspath, a.keys_abspath)
+        return a
+
+    def test_memmap_indexer(self):
+        a = self._build(storage='memmap')
+        with open(a.index_abspath, 'rb') as fp:
+            self.assertNotEqual(fp.read(2), b'\x1f\x8b')
+
+        b = BaseIndexer.load(a.save_abspath)
+        self.assertIsInstance(b.query_handler, np.memmap)
+        np.testing.assert_almost_equal(b.query_handler, vec)
+        idx, dist = b.query(query, top_k=4)
+        self.assertEqual(idx.shape, (10, 4))
+        self.assertEqual(idx.shape, dist.shape)
+
+    def test_memmap_same_result_as_gzip(self):
+        a = self._build(index_filename='numpy.test.gz')
+        b = BaseIndexer.load(a.save_abspath)
+        idx1, dist1 = b.query(query, top_k=4)
+        self.assertNotIsInstance(b.query_handler, np.memmap)
+
+        a = self._build(storage='memmap')
+        b = BaseIndexer.load(a.save_abspath)
+        idx2, dist2 = b.query(query, top_k=4)
+        np.testing.assert_equal(idx1, idx2)
+        np.testing.assert_almost_equal(dist1, dist2)
+
+    def test_memmap_reads_gzip(self):
+        a = self._build()
+        with gzip.open(a.index_abspath, 'rb') as fp:
+            self.assertEqual(len(fp.read()), vec.nbytes)
+
+        # switching the storage does not break the existing gzip index
+        b = BaseIndexer.load(a.save_abspath)
+        b.storage = 'memmap'
+        np.testing.assert_almost_equal(b.query_handler, vec)
+        self.assertTrue(os.path.exists(b.index_abspath))
+
+    def test_blocked_search(self):
+        from scipy.spatial.distance import cdist
+        for metric in ('euclidean', 'cosine'):
+            a = self._build(index_filename=f'numpy.{metric}.bin', metric=metric)
+            b = BaseIndexer.load(a.save_abspath)
+            # one vector per block
+            b.query_memory_limit = 1
+            idx, dist = b.query(query, top_k=4)
+
+            expected_dist = cdist(query, vec, metric=metric)
+            expected_idx = expected_dist.argsort(axis=1)[:, :4]
+            np.testing.assert_equal(idx, vec_idx[expected_idx])
+            np.testing.assert_almost_equal(dist, np.take_along_axis(expected_dist, expected_idx, axis=1), decimal=5)
+
+            # top_k larger than the index size
+            idx, dist = b.query(query, top_k=20)
+            self.assertEqual(idx.shape, (10, 10))
+            self.assertTrue(np.all(np.diff(dist, axis=1) >= 0))
+
+    def test_search_block_size(self):
+        a = NumpyIndexer(index_filename='numpy.block.bin')
+        queries = query.astype(np.float16)
+        # the temporaries of 10 queries and the converted 10-dim vector and its norm, for 3 vectors
+        a.query_memory_limit = (10 * 4 + 10 + 1) * 2 * 3
+        self.assertEqual(a._get_search_block_size(queries, vec.astype(np.uint8)), 3)
+
+    def test_parallel_search(self):
+        for metric in ('euclidean', 'cosine'):
+            a = self._build(index_filename=f'numpy.{metric}.bin', metric=metric)
+            b = BaseIndexer.load(a.save_abspath)
+            idx1, dist1 = b.query(query, top_k=4)
+
+            # more partitions than vectors, and more than one block per partition
+            for num_threads, query_memory_limit in ((3, 256 * 1024 * 1024), (4, 1), (20, 1)):
+                b = BaseIndexer.load(a.save_abspath)
+                b.num_threads = num_threads
+                b.query_memory_limit = query_memory_limit
+                idx2, dist2 = b.query(query, top_k=4)
+                np.testing.assert_equal(idx1, idx2)
+                np.testing.assert_almost_equal(dist1, dist2)
+                self.assertIsNotNone(b._thread_pool)
+                b.close()
+                self.assertIsNone(b._thread_pool)
+
+    def test_norm_cache(self):
+        a = self._build(storage='memmap')
+        self.assertTrue(os.path.exists(a.norm_abspath))
+        b = BaseIndexer.load(a.save_abspath)
+        np.testing.assert_almost_equal(b.sq_norms, np.sum(vec ** 2, axis=1))
+        idx1, dist1 = b.query(query, top_k=4)
+
+        # the norms are recomputed when the norm file is missing
+        os.remove(a.norm_abspath)
+        b = BaseIndexer.load(a.save_abspath)
+        idx2, dist2 = b.query(query, top_k=4)
+        np.testing.assert_equal(idx1, idx2)
+        np.testing.assert_almost_equal(dist1, dist2)
+        self.assertTrue(os.path.exists(a.norm_abspath))
+
+        # the cached norms are invalidated by add
+        b.add(vec_idx[:1], vec[:1] * 2)
+        self.assertIsNone(b._sq_norms)
+        self.assertEqual(os.path.getsize(b.norm_abspath), 11 * 8)
+
+    def test_add_after_query(self):
+        for storage in ('memmap', 'gzip'):
+            a = self._build(f'numpy.add.{storage}.bin', storage=storage)
+            b = BaseIndexer.load(a.save_abspath)
+            b.query(query, top_k=4)
+            # the new vectors are searchable right away, and their norms are persisted
+            b.add(vec_idx[:1] + 100, query[:1].astype(vec.dtype))
+            idx, dist = b.query(query[:1], top_k=1)
+            self.assertEqual(idx[0, 0], vec_idx[0] + 100)
+            np.testing.assert_almost_equal(dist[0, 0], 0, decimal=5)
+            self.assertEqual(os.path.getsize(b.norm_abspath), 11 * 8)
+            b.close()
+
+    def test_legacy_key_bytes(self):
+        a = self._build(storage='memmap')
+        self.assertEqual(a.key_bytes, b'')
+        np.testing.assert_equal(np.fromfile(a.keys_abspath, dtype=a.key_dtype), vec_idx)
+        idx1, dist1 = BaseIndexer.load(a.save_abspath).query(query, top_k=4)
+
+        # the older versions keep the keys in the pickled executor
+        b = BaseIndexer.load(a.save_abspath)
+        b.key_bytes = vec_idx.tobytes()
+        os.remove(a.keys_abspath)
+        idx2, dist2 = b.query(query, top_k=4)
+        np.testing.assert_equal(idx1, idx2)
+        np.testing.assert_almost_equal(dist1, dist2)
+
+        # the keys are moved to the keys file on the next add
+        b.add(vec_idx[:1], vec[:1])
+        self.assertEqual(b.key_bytes, b'')
+        np.testing.assert_equal(np.fromfile(a.keys_abspath, dtype=a.key_dtype), np.concatenate([vec_idx, vec_idx[:1]]))
+
+    def test_delete_update_compact(self):
+        for j, kwargs in enumerate(({'storage': 'memmap'}, {'storage': 'gzip'},
+                                    {'storage': 'memmap', 'backend': 'scipy'})):
+            a = self._build(index_filename=f'numpy.delete.{j}.bin', **kwargs)
+            b = BaseIndexer.load(a.save_abspath)
+            idx, _ = b.query(query, top_k=4)
+            deleted = idx[:, 0]
+            b.delete(deleted)
+            self.assertEqual(b.size, 10 - np.unique(deleted).shape[0])
+            # the deletion is visible to the loaded query handler
+            idx, dist = b.query(query, top_k=4)
+            self.assertFalse(np.isin(idx, deleted).any())
+
+            # the top-k is trimmed when less than top_k vectors remain
+            b.delete(vec_idx[1:])
+            idx, _ = b.query(query, top_k=4)
+            self.assertEqual(idx.shape, (10, 1))
+            np.testing.assert_equal(idx, vec_idx[0])
+
+            b.update(vec_idx[1:2], vec[1:2] + 10)
+            b.update(vec_idx[:1], query[:1].astype(vec.dtype))
+            b.save()
+            b.close()
+
+            c = BaseIndexer.load(a.save_abspath)
+            self.assertEqual(c.size, 2)
+            idx, dist = c.query(query[:1], top_k=4)
+            np.testing.assert_equal(idx, [vec_idx[:2]])
+            np.testing.assert_almost_equal(dist[0, 0], 0, decimal=5)
+
+            # the space of the deleted vectors is reclaimed
+            size = os.path.getsize(c.index_abspath)
+            self.assertEqual(c.compact(), 10)
+            self.assertLess(os.path.getsize(c.index_abspath), size)
+            self.assertFalse(os.path.exists(c.deleted_abspath))
+            self.assertEqual(c.query_handler.shape[0], 2)
+            idx2, dist2 = c.query(query[:1], top_k=4)
+            np.testing.assert_equal(idx, idx2)
+            np.testing.assert_almost_equal(dist, dist2)
+            self.assertEqual(c.compact(), 0)
+            c.close()
+            self.add_tmpfile(c.deleted_abspath)
+
+    def test_delete_driver(self):
+        a = self._build(storage='memmap')
+        b = BaseIndexer.load(a.save_abspath)
+        req = jina_pb2.Request()
+        d = req.delete.docs.add()
+        for k in vec_idx[:3]:
+            d.chunks.add().chunk_id = k
+        driver = VectorDeleteDriver()
+        driver.attach(executor=b, pea=SimpleNamespace(request=req.delete, message=None))
+        driver()
+        idx, _ = b.query(query, top_k=10)
+        self.assertFalse(np.isin(idx, vec_idx[:3]).any())
+        b.close()
+        self.add_tmpfile(b.deleted_abspath)
+
+    def test_filtered_search(self):
+        from scipy.spatial.distance import cdist
+        lang = np.array(['en', 'de'] * 5, dtype=object)
+        for j, kwargs in enumerate(({'storage': 'memmap'}, {'storage': 'gzip', 'backend': 'scipy'},
+                                    {'storage': 'memmap', 'query_memory_limit': 1, 'num_threads': 3})):
+            a = NumpyIndexer(index_filename=f'numpy.filter.{j}.bin', **kwargs)
+            # the first vectors have no attributes
+            a.add(vec_idx[:2], vec[:2])
+            a.add(vec_idx[2:], vec[2:], attributes={'lang': lang[2:]})
+            a.save()
+            a.close()
+            self.add_tmpfile(a.index_abspath, a.save_abspath, a.norm_abspath, a.keys_abspath, a.deleted_abspath,
+                             a.attributes.manifest_abspath, a.attributes.column_abspath(0))
+
+            b = BaseIndexer.load(a.save_abspath)
+            for value, rows in (('en', [2, 4, 6, 8]), (['en', 'de'], list(range(2, 10)))):
+                idx, dist = b.query(query, top_k=3, filter={'lang': value})
+                expected_dist = cdist(query, vec[rows])
+                expected_idx = expected_dist.argsort(axis=1)[:, :3]
+                np.testing.assert_equal(idx, vec_idx[rows][expected_idx])
+                np.testing.assert_almost_equal(dist, np.take_along_axis(expected_dist, expected_idx, axis=1),
+                                               decimal=5)
+
+            # less than top_k vectors match
+            idx, _ = b.query(query, top_k=10, filter={'lang': 'de'})
+            self.assertEqual(idx.shape, (10, 4))
+            self.assertTrue(np.isin(idx, vec_idx[3::2]).all())
+            for f in ({'lang': 'fr'}, {'country': 'de'}):
+                idx, _ = b.query(query, top_k=3, filter=f)
+                self.assertEqual(idx.shape, (10, 0))
+
+            # the attributes stay aligned with the vectors after the compaction
+            b.delete(vec_idx[:3])
+            self.assertEqual(b.compact(), 3)
+            idx, _ = b.query(query, top_k=10, filter={'lang': 'en'})
+            self.assertEqual(idx.shape, (10, 3))
+            self.assertTrue(np.isin(idx, vec_idx[4::2]).all())
+            b.close()
+
+    def test_filter_driver(self):
+        a = NumpyIndexer(index_filename='numpy.filter.bin', storage='memmap')
+        self.add_tmpfile(a.index_abspath, a.norm_abspath, a.keys_abspath, a.attributes.manifest_abspath,
+                         a.attributes.column_abspath(0))
+        req = jina_pb2.Request()
+        for j in range(10):
+            d = req.index.docs.add()
+            d.doc_id = j
+            if j % 2:
+                d.tags['lang'] = 'en'
+            c = d.chunks.add()
+            c.chunk_id = vec_idx[j]
+            c.embedding.CopyFrom(array2pb(vec[j]))
+        driver = VectorIndexDriver()
+        driver.attach(executor=a, pea=SimpleNamespace(request=req.index, message=None, logger=a.logger))
+        driver()
+        a.flush()
+
+        req = jina_pb2.Request()
+        req.search.top_k = 3
+        req.search.filter['lang'] = 'en'
+        d = req.search.docs.add()
+        d.chunks.add().embedding.CopyFrom(array2pb(vec[0]))
+        driver = VectorSearchDriver()
+        driver.attach(executor=a, pea=SimpleNamespace(request=req.search, message=None, logger=a.logger))
+        driver()
+        matches = [r.match_chunk.chunk_id for r in req.search.docs[0].chunks[0].topk_results]
+        self.assertEqual(len(matches), 3)
+        self.assertTrue(set(matches) <= set(vec_idx[1::2]))
+        a.close()
+
+    def test_remove_deleted_warning(self):
+        a = NumpyIndexer(index_filename='numpy.warning.bin')
+        warnings = []
+        a.logger = SimpleNamespace(warning=warnings.append)
+        tombstones = np.array([True, True, False, False, False, False])
+        # the approximate index returns less candidates than queried, one of them is excluded
+        idx, _ = a._remove_deleted(np.array([[0, 2, -1, -1]]), np.zeros([1, 4]), 2, tombstones)
+        np.testing.assert_equal(idx, [[2]])
+        self.assertEqual(len(warnings), 1)
+        # less than top_k vectors are not excluded, this is not warned
+        idx, _ = a._remove_deleted(np.array([[2, 0, 3, 1, 4, 5]]), np.zeros([1, 6]), 5, tombstones)
+        np.testing.assert_equal(idx, [[2, 3, 4, 5]])
+        self.assertEqual(len(warnings), 1)
+
+    def test_search_driver_cache(self):
+        a = NumpyIndexer(index_filename='numpy.cache.bin', storage='memmap')
+        self.add_tmpfile(a.index_abspath, a.norm_abspath, a.keys_abspath, a.deleted_abspath)
+        a.add(vec_idx[:5], vec[:5])
+        a.flush()
+        num_queries = []
+        query_fn = a.query
+        a.query = lambda keys, *args, **kwargs: num_queries.append(keys.shape[0]) or query_fn(keys, *args, **kwargs)
+
+        def search(rows):
+            req = jina_pb2.Request()
+            req.search.top_k = 3
+            for j in rows:
+                req.search.docs.add().chunks.add().embedding.CopyFrom(array2pb(query[j]))
+            driver.attach(executor=a, pea=SimpleNamespace(request=req.search, message=None, logger=a.logger))
+            driver()
+            return [[r.match_chunk.chunk_id for r in d.chunks[0].topk_results] for d in req.search.docs]
+
+        driver = VectorSearchDriver(cache_size=10)
+        expected = search([0, 1])
+        self.assertEqual(num_queries, [2])
+        # the duplicated chunk is queried once, the cached ones are not queried
+        self.assertEqual(search([1, 2, 2, 0]), [expected[1], search([2])[0], search([2])[0], expected[0]])
+        self.assertEqual(num_queries, [2, 1])
+        self.assertEqual(driver.stats['cache_hits'], 4)
+        self.assertEqual(driver.stats['cache_misses'], 4)
+
+        # adding vectors invalidates the cache
+        a.add(vec_idx[5:], vec[5:])
+        a.flush()
+        self.assertEqual(search([0]), [list(query_fn(query[:1], 3)[0][0])])
+        self.assertEqual(num_queries, [2, 1, 1])
+
+        # so does an update keeping the size unchanged
+        a.update(vec_idx[[0]], vec[[1]])
+        a.flush()
+        self.assertEqual(search([0]), [list(query_fn(query[:1], 3)[0][0])])
+        self.assertEqual(num_queries, [2, 1, 1, 1])
+        a.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import unittest
+
+import numpy as np
+
+from jina.executors.indexers import BaseIndexer
+from jina.executors.indexers.vector.numpy import NumpyIndexer
+from jina.executors.indexers.vector.pq import PQIndexer
+from tests import JinaTestCase
+
+np.random.seed(500)
+# clustered data, so that the quantization error is small compared to the distances between the clusters
+centers = np.random.random([50, 32]) * 10
+vec = (centers[np.random.randint(0, 50, 2000)] + np.random.random([2000, 32])).astype(np.float32)
+vec_idx = np.arange(2000) + 100
+query = vec[:20] + np.random.random([20, 32]).astype(np.float32) * 0.1
+
+
+class MyTestCase(JinaTestCase):
+
+    def _build(self, index_filename, **kwargs):
+        a = PQIndexer(index_filename=index_filename, **kwargs)
+        a.train(vec[:1000])
+        a.add(vec_idx[:1000], vec[:1000])
+        a.add(vec_idx[1000:], vec[1000:])
+        a.save()
+        a.close()
+        self.add_tmpfile(a.index_abspath, a.save_abspath, a.norm_abspath, a.keys_abspath, a.codes_abspath)
+        return a
+
+    def _get_expected(self, metric, top_k):
+        b = NumpyIndexer(index_filename=f'pq.expected.{metric}.bin', metric=metric)
+        b.add(vec_idx, vec)
+        b.close()
+        self.add_tmpfile(b.index_abspath, b.norm_abspath, b.keys_abspath)
+        return b.query(query, top_k)
+
+    def test_pq_indexer(self):
+        for metric in ('euclidean', 'cosine'):
+            a = self._build(f'pq.{metric}.bin', num_subspaces=8, metric=metric)
+            self.assertEqual(os.path.getsize(a.codes_abspath), 2000 * 8)
+            self.assertFalse(os.path.exists(a.norm_abspath))
+            expected_idx, expected_dist = self._get_expected(metric, 10)
+
+            b = BaseIndexer.load(a.save_abspath)
+            self.assertTrue(b.is_trained)
+            self.assertEqual(b.codes.shape, (2000, 8))
+            self.assertEqual(b.codes.dtype, np.uint8)
+            idx, dist = b.query(query, top_k=10)
+            self.assertEqual(idx.shape, (20, 10))
+            self.assertTrue(np.all(np.diff(dist, axis=1) >= 0))
+            # the nearest neighbour is the vector the query is generated from
+            self.assertGreater(np.mean(idx[:, 0] == vec_idx[:20]), 0.8)
+
+            # the exact re-ranking recovers the exact distances
+            b.rerank_top_k = 100
+            idx, dist = b.query(query, top_k=10)
+            np.testing.assert_equal(idx[:, 0], expected_idx[:, 0])
+            from scipy.spatial.distance import cdist
+            exact_dist = cdist(query.astype(np.float64), vec[idx[:, 0] - 100].astype(np.float64), metric=metric)
+            np.testing.assert_almost_equal(dist[:, 0], np.diag(exact_dist), decimal=4)
+            recall = np.mean([len(set(i) & set(e)) / 10 for i, e in zip(idx, expected_idx)])
+            self.assertGreater(recall, 0.9)
+
+    def test_add_before_train(self):
+        a = PQIndexer(index_filename='pq.notrain.bin', num_subspaces=4, num_centroids=16)
+        with self.assertRaises(RuntimeError):
+            a.add(vec_idx[:10], vec[:10])
+
+    def test_delete_compact(self):
+        a = self._build('pq.delete.bin', num_subspaces=8)
+        b = BaseIndexer.load(a.save_abspath)
+        idx, _ = b.query(query, top_k=10)
+        b.delete(idx[:, 0])
+        idx2, _ = b.query(query, top_k=10)
+        self.assertFalse(np.isin(idx2, idx[:, 0]).any())
+
+        num_deleted = b.compact()
+        self.assertEqual(num_deleted, np.unique(idx[:, 0]).shape[0])
+        self.assertEqual(os.path.getsize(b.codes_abspath), (2000 - num_deleted) * 8)
+        np.testing.assert_equal(b.query(query, top_k=10)[0], idx2)
+        b.close()
+
+    def test_filtered_search(self):
+        a = PQIndexer(index_filename='pq.filter.bin', num_subspaces=8)
+        a.train(vec[:1000])
+        a.add(vec_idx[:1000], vec[:1000], attributes={'parity': ['odd' if k % 2 else 'even' for k in vec_idx[:1000]]})
+        a.save()
+        a.close()
+        self.add_tmpfile(a.index_abspath, a.save_abspath, a.norm_abspath, a.keys_abspath, a.codes_abspath,
+                         a.attributes.manifest_abspath, a.attributes.column_abspath(0))
+        b = BaseIndexer.load(a.save_abspath)
+        idx, _ = b.query(query, top_k=10, filter={'parity': 'odd'})
+        self.assertEqual(idx.shape, (20, 10))
+        self.assertTrue(np.all(idx % 2 == 1))
+        b.close()
+
+    def test_bad_num_subspaces(self):
+        a = PQIndexer(index_filename='pq.bad.bin', num_subspaces=5)
+        with self.assertRaises(ValueError):
+            a.train(vec)
+        with self.assertRaises(ValueError):
+            PQIndexer(index_filename='pq.bad.bin', metric='cityblock')
+
+
+if __name__ == '__main__':
+    unittest.main()
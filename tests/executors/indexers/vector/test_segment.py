@@ -0,0 +1,154 @@
+import os
+import unittest
+
+import numpy as np
+
+from jina.executors.indexers import BaseIndexer
+from jina.executors.indexers.vector.numpy import NumpyIndexer
+from jina.executors.indexers.vector.segment import SegmentNumpyIndexer
+from tests import JinaTestCase
+
+np.random.seed(500)
+vec_idx = np.arange(100) + 100
+vec = np.random.random([100, 10])
+query = np.array(np.random.random([10, 10]), dtype=np.float32)
+
+
+class MyTestCase(JinaTestCase):
+
+    def tearDown(self) -> None:
+        for f in os.listdir('.'):
+            if f.startswith('segment.test.bin'):
+                self.add_tmpfile(f)
+        super().tearDown()
+
+    def _get_expected(self, num_vecs, top_k=4):
+        b = NumpyIndexer(index_filename='segment.expected.bin')
+        b.add(vec_idx[:num_vecs], vec[:num_vecs])
+        b.close()
+        r = b.query(query, top_k)
+        for f in (b.index_abspath, b.norm_abspath, b.keys_abspath):
+            os.remove(f)
+        return r
+
+    def test_query_after_add(self):
+        a = SegmentNumpyIndexer(index_filename='segment.test.bin', max_segments=100)
+        self.add_tmpfile(a.save_abspath)
+        for j in range(0, 100, 10):
+            a.add(vec_idx[j:j + 10], vec[j:j + 10])
+            # every segment is queryable right after it is added
+            idx, dist = a.query(query, top_k=4)
+            expected_idx, expected_dist = self._get_expected(j + 10)
+            np.testing.assert_equal(idx, expected_idx)
+            np.testing.assert_almost_equal(dist, expected_dist, decimal=5)
+        self.assertEqual(len(a.segments), 10)
+        self.assertEqual(a.size, 100)
+        a.save()
+
+        # another indexer on the same workspace picks up the new segments
+        b = BaseIndexer.load(a.save_abspath)
+        self.assertEqual(len(b.segments), 10)
+        generation = b.generation
+        a.add(vec_idx[:1], vec[:1] + 10)
+        self.assertNotEqual(b.generation, generation)
+        self.assertEqual(len(b.segments), 11)
+        self.assertEqual(b.size, 101)
+        # so is a deletion, which keeps the segments
+        generation = b.generation
+        a.delete(vec_idx[:1])
+        self.assertNotEqual(b.generation, generation)
+        self.assertEqual(len(b.segments), 11)
+        a.close()
+        b.close()
+
+    def test_compaction(self):
+        for compact_in_background in (False, True):
+            a = SegmentNumpyIndexer(index_filename='segment.test.bin', min_segment_size=30, max_segments=4,
+                                    compact_in_background=compact_in_background)
+            for j in range(0, 100, 10):
+                a.add(vec_idx[j:j + 10], vec[j:j + 10])
+                idx, _ = a.query(query, top_k=4)
+                np.testing.assert_equal(idx, self._get_expected(j + 10)[0])
+            a.close()
+
+            self.assertLessEqual(len(a.segments), 4)
+            self.assertEqual(a.size, 100)
+            idx, dist = a.query(query, top_k=4)
+            expected_idx, expected_dist = self._get_expected(100)
+            np.testing.assert_equal(idx, expected_idx)
+            np.testing.assert_almost_equal(dist, expected_dist, decimal=5)
+            # the merged segments are removed
+            segment_files = [f for f in os.listdir('.') if f.startswith('segment.test.bin.') and f.endswith('.vec')]
+            self.assertEqual(len(segment_files), len(a.segments))
+            for f in os.listdir('.'):
+                if f.startswith('segment.test.bin'):
+                    os.remove(f)
+
+    def test_delete(self):
+        a = SegmentNumpyIndexer(index_filename='segment.test.bin', min_segment_size=1, max_segments=100,
+                                compact_in_background=False)
+        self.add_tmpfile(a.save_abspath)
+        for j in range(0, 100, 10):
+            a.add(vec_idx[j:j + 10], vec[j:j + 10])
+        a.save()
+        b = BaseIndexer.load(a.save_abspath)
+
+        # the deleted vectors span several segments
+        deleted = vec_idx[5:25]
+        a.delete(deleted)
+        self.assertEqual(a.size, 80)
+        idx, _ = a.query(query, top_k=100)
+        self.assertEqual(idx.shape, (10, 80))
+        self.assertFalse(np.isin(idx, deleted).any())
+        # another indexer on the same workspace picks up the tombstones
+        self.assertEqual(b.size, 80)
+        np.testing.assert_equal(b.query(query, top_k=100)[0], idx)
+
+        a.update(vec_idx[:1], query[:1].astype(vec.dtype))
+        idx, dist = a.query(query[:1], top_k=4)
+        self.assertEqual(idx[0, 0], vec_idx[0])
+        np.testing.assert_almost_equal(dist[0, 0], 0, decimal=5)
+
+        # the deleted vectors are dropped by the compaction
+        num_vecs = sum(s.size for s in a.segments)
+        a.compact()
+        self.assertEqual(sum(s.size for s in a.segments), num_vecs - 21)
+        self.assertTrue(all(s.num_deleted == 0 for s in a.segments))
+        self.assertFalse([f for f in os.listdir('.') if f.startswith('segment.test.bin') and f.endswith('.deleted')])
+        self.assertEqual(a.size, 80)
+        np.testing.assert_equal(a.query(query[:1], top_k=4)[0], idx)
+        a.close()
+        b.close()
+
+    def test_filtered_search(self):
+        lang = np.array(['en', 'de'] * 50, dtype=object)
+        a = SegmentNumpyIndexer(index_filename='segment.test.bin', min_segment_size=100, max_segments=100,
+                                compact_in_background=False)
+        self.add_tmpfile(a.save_abspath)
+        # the first segment has no attributes
+        a.add(vec_idx[:10], vec[:10])
+        for j in range(10, 100, 10):
+            a.add(vec_idx[j:j + 10], vec[j:j + 10], attributes={'lang': lang[j:j + 10]})
+
+        b = NumpyIndexer(index_filename='segment.expected.bin')
+        b.add(vec_idx[10::2], vec[10::2])
+        b.close()
+        expected_idx, expected_dist = b.query(query, top_k=4)
+        for f in (b.index_abspath, b.norm_abspath, b.keys_abspath):
+            os.remove(f)
+
+        idx, dist = a.query(query, top_k=4, filter={'lang': 'en'})
+        np.testing.assert_equal(idx, expected_idx)
+        np.testing.assert_almost_equal(dist, expected_dist, decimal=5)
+
+        # the attributes are carried over to the merged segment
+        a.delete(vec_idx[:12])
+        a.compact()
+        self.assertEqual(len(a.segments), 1)
+        np.testing.assert_equal(a.query(query, top_k=4, filter={'lang': 'en'})[0], expected_idx)
+        self.assertFalse(np.isin(a.query(query, top_k=100, filter={'lang': 'en'})[0], vec_idx[:12]).any())
+        a.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
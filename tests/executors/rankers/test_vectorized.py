@@ -0,0 +1,134 @@
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from jina.drivers.score import Chunk2DocScoreDriver
+from jina.executors.rankers import MaxRanker, MinRanker, _meta2columns
+from jina.executors.rankers.bi_match import BiMatchRanker
+from jina.executors.rankers.tfidf import TfIdfRanker, BM25Ranker
+from jina.proto import jina_pb2
+from tests import JinaTestCase
+
+
+def create_data(num_docs=500, num_query_chunks=20, top_k=100):
+    np.random.seed(0)
+    doc_lengths = np.random.randint(1, 50, num_docs)
+    match_idx = []
+    match_chunk_meta = {}
+    query_chunk_meta = {}
+    for q in range(num_query_chunks):
+        query_chunk_meta[q] = {'length': num_query_chunks}
+        for d in np.random.randint(0, num_docs, top_k):
+            c = d * 100 + np.random.randint(0, doc_lengths[d])
+            match_chunk_meta[c] = {'length': doc_lengths[d]}
+            match_idx.append([d, c, q, np.random.random()])
+    return np.array(match_idx), query_chunk_meta, match_chunk_meta
+
+
+def create_request(num_queries=4, num_docs=50, num_query_chunks=5, top_k=20):
+    np.random.seed(0)
+    doc_lengths = np.random.randint(1, 10, num_docs)
+    msg = jina_pb2.Message()
+    req = msg.request.search
+    for j in range(num_queries):
+        d = req.docs.add()
+        d.doc_id = j
+        for q in range(num_query_chunks):
+            c = d.chunks.add()
+            c.chunk_id = j * num_query_chunks + q
+            c.length = num_query_chunks
+            for m in np.random.randint(0, num_docs, top_k):
+                r = c.topk_results.add()
+                r.match_chunk.doc_id = m
+                r.match_chunk.chunk_id = m * 100 + np.random.randint(0, doc_lengths[m])
+                r.match_chunk.length = doc_lengths[m]
+                r.score.value = np.random.random()
+    return msg, req
+
+
+def score_by_group(ranker, match_idx, query_chunk_meta, match_chunk_meta):
+    """The per-group scoring loop used before the segment reductions """
+    extra = (ranker.get_idf(match_idx),) if isinstance(ranker, TfIdfRanker) else ()
+    r = [ranker._get_score(g, query_chunk_meta, match_chunk_meta, *extra) for g in ranker.group_by_doc_id(match_idx)]
+    return ranker.sort_doc_by_score(r)
+
+
+class ChunkIdIdfRanker(TfIdfRanker):
+    def get_idf(self, match_idx):
+        return {idx: idx + 1. for idx in np.unique(match_idx[:, self.col_query_chunk_id])}
+
+
+class SquaredTfRanker(BM25Ranker):
+    def get_tf(self, match_idx, match_chunk_meta):
+        return {k: v ** 2 for k, v in super().get_tf(match_idx, match_chunk_meta).items()}
+
+
+class MyTestCase(JinaTestCase):
+
+    def test_same_as_group_by(self):
+        data = create_data()
+        for ranker in (MaxRanker(), MinRanker(), TfIdfRanker(threshold=0.2), BM25Ranker(threshold=0.2),
+                       BiMatchRanker()):
+            expected = score_by_group(ranker, *data)
+            doc_idx = ranker.score(*data)
+            self.assertEqual(doc_idx.shape, expected.shape)
+            np.testing.assert_almost_equal(doc_idx[doc_idx[:, 0].argsort()], expected[expected[:, 0].argsort()])
+            # sorted by the score in the descending order
+            self.assertTrue(np.all(np.diff(doc_idx[:, 1]) <= 0))
+
+    def test_overridden_tf_idf(self):
+        data = create_data()
+        for ranker, base in ((ChunkIdIdfRanker(threshold=0.2), TfIdfRanker(threshold=0.2)),
+                             (SquaredTfRanker(threshold=0.2), BM25Ranker(threshold=0.2))):
+            expected = score_by_group(ranker, *data)
+            doc_idx = ranker.score(*data)
+            np.testing.assert_almost_equal(doc_idx[doc_idx[:, 0].argsort()], expected[expected[:, 0].argsort()])
+            # the overridden functions are not skipped by the segment reductions
+            base_idx = base.score(*data)
+            self.assertFalse(np.allclose(doc_idx[doc_idx[:, 0].argsort()], base_idx[base_idx[:, 0].argsort()]))
+
+    def test_missing_meta(self):
+        match_idx, query_chunk_meta, match_chunk_meta = create_data()
+        missing = int(match_idx[0, 1])
+        del match_chunk_meta[missing]
+        for ranker in (TfIdfRanker(threshold=0.), BM25Ranker(threshold=0.)):
+            with self.assertRaises(KeyError) as cm:
+                ranker.score(match_idx, query_chunk_meta, match_chunk_meta)
+            self.assertIn(str(missing), str(cm.exception))
+
+    def test_batch_score(self):
+        queries = [create_data(num_docs=50, num_query_chunks=5, top_k=20) for _ in range(4)]
+        match_idx = np.concatenate([np.concatenate([np.full([len(m), 1], j), m], axis=1)
+                                    for j, (m, _, _) in enumerate(queries)])
+        # the query chunks of different query docs have different ids
+        match_idx[:, 3] += match_idx[:, 0] * 5
+        query_chunk_meta = {j * 5 + q: v for j, (_, qm, _) in enumerate(queries) for q, v in qm.items()}
+        match_chunk_meta = {k: v for _, _, mm in queries for k, v in mm.items()}
+
+        for ranker in (MaxRanker(), MinRanker(), TfIdfRanker(threshold=0.2), BM25Ranker(threshold=0.2),
+                       BiMatchRanker()):
+            doc_idx = ranker.batch_score(match_idx, _meta2columns(query_chunk_meta), _meta2columns(match_chunk_meta))
+            for j, (m, qm, mm) in enumerate(queries):
+                expected = ranker.score(m, qm, mm)
+                actual = doc_idx[doc_idx[:, 0] == j, 1:]
+                self.assertTrue(np.all(np.diff(actual[:, 1]) <= 0))
+                np.testing.assert_almost_equal(actual[actual[:, 0].argsort()], expected[expected[:, 0].argsort()])
+
+    def test_batch_driver(self):
+        for ranker in (MaxRanker(), TfIdfRanker(threshold=0.2), BM25Ranker(threshold=0.2), BiMatchRanker()):
+            results = []
+            for batch in (False, True):
+                msg, req = create_request()
+                driver = Chunk2DocScoreDriver(batch=batch)
+                driver.attach(executor=ranker, pea=SimpleNamespace(request=req, message=msg))
+                driver()
+                results.append([[(r.match_doc.doc_id, r.score.value) for r in d.topk_results] for d in req.docs])
+            self.assertEqual(len(results[1]), 4)
+            for expected, actual in zip(*results):
+                self.assertEqual(len(expected), len(actual))
+                np.testing.assert_almost_equal(sorted(actual), sorted(expected))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -68,16 +68,20 @@ class MyTestCase(JinaTestCase):
     def test_resource_executor(self):
         a = BaseExecutor.load_config(resource_filename('jina', '/'.join(('resources', 'executors._route.yml'))))
         self.assertEqual(a.name, 'route')
-        self.assertEqual(len(a._drivers), 4)
+        self.assertEqual(len(a._drivers), 6)
         a = BaseExecutor.load_config(resource_filename('jina', '/'.join(('resources', 'executors._forward.yml'))))
         self.assertEqual(a.name, 'forward')
-        self.assertEqual(len(a._drivers), 4)
+        self.assertEqual(len(a._drivers), 6)
         a = BaseExecutor.load_config(resource_filename('jina', '/'.join(('resources', 'executors._merge.yml'))))
         self.assertEqual(a.name, 'merge')
-        self.assertEqual(len(a._drivers), 4)
+        self.assertEqual(len(a._drivers), 6)
         a = BaseExecutor.load_config(resource_filename('jina', '/'.join(('resources', 'executors._clear.yml'))))
         self.assertEqual(a.name, 'clear')
-        self.assertEqual(len(a._drivers), 4)
+        self.assertEqual(len(a._drivers), 6)
+        for y in ('_merge_topk', '_merge_topk_chunks', '_merge_topk_docs'):
+            a = BaseExecutor.load_config(resource_filename('jina', '/'.join(('resources', f'executors.{y}.yml'))))
+            self.assertEqual(a.name, 'merge')
+            self.assertEqual(len(a._drivers), 4)
 
     def test_multiple_executor(self):
         from jina.executors.encoders import BaseEncoder
@@ -90,31 +94,31 @@ class MyTestCase(JinaTestCase):
             pass
 
         d1 = D1()
-        self.assertEqual(len(d1._drivers), 4)
+        self.assertEqual(len(d1._drivers), 6)
 
         class D2(BaseIndexer):
             pass
 
         d2 = D2('dummy.bin')
-        self.assertEqual(len(d2._drivers), 1)
+        self.assertEqual(len(d2._drivers), 3)
 
         class D3(BaseRanker):
             pass
 
         d3 = D3()
-        self.assertEqual(len(d3._drivers), 2)
+        self.assertEqual(len(d3._drivers), 4)
 
         class D4(BaseDocCrafter):
             pass
 
         d4 = D4()
-        self.assertEqual(len(d4._drivers), 4)
+        self.assertEqual(len(d4._drivers), 6)
 
         class D5(BaseChunkCrafter):
             pass
 
         d5 = D5()
-        self.assertEqual(len(d5._drivers), 4)
+        self.assertEqual(len(d5._drivers), 6)
 
 
 if __name__ == '__main__':
@@ -195,6 +195,17 @@ class MyTestCase(JinaTestCase):
                      callback_on_body=True)
         self.add_tmpfile('test-docshard')
 
+    def test_delete_through_ranker(self):
+        def validate(req):
+            self.assertEqual(len(req.docs), 2)
+
+        f = Flow().add(name='ranker', yaml_path='MaxRanker', replicas=2, polling='all',
+                       reducing_yaml_path='_merge_topk_docs')
+        with f:
+            # the ranker and the merger forward the requests not for them, the second delete fails if the peas are down
+            f.delete(input_fn=random_docs(2), in_proto=True, output_fn=validate, callback_on_body=True)
+            f.delete(input_fn=random_docs(2), in_proto=True, output_fn=validate, callback_on_body=True)
+
     def test_py_client(self):
         f = (Flow().add(name='r1', yaml_path='_forward')
              .add(name='r2', yaml_path='_forward')
@@ -0,0 +1,70 @@
+import unittest
+
+import numpy as np
+
+from jina.drivers.helper import array2pb, extract_embeddings, pack_embeddings, unpack_embeddings, extract_chunks
+from jina.proto import jina_pb2
+from tests import JinaTestCase
+
+
+def random_request(num_docs=3, chunks_per_doc=4):
+    req = jina_pb2.Request().search
+    c_id = 0
+    for j in range(num_docs):
+        d = req.docs.add()
+        d.doc_id = j
+        for k in range(chunks_per_doc):
+            c = d.chunks.add()
+            c.chunk_id = c_id
+            c_id += 1
+    return req
+
+
+class MyTestCase(JinaTestCase):
+
+    def test_pack_extract(self):
+        req = random_request()
+        chunk_pts = [c for d in req.docs for c in d.chunks]
+        embeds = np.random.random([len(chunk_pts), 8]).astype(np.float32)
+        pack_embeddings(req, embeds, chunk_pts)
+        self.assertFalse(any(c.HasField('embedding') for c in chunk_pts))
+
+        # survives the serialization
+        req2 = jina_pb2.Request().search
+        req2.ParseFromString(req.SerializeToString())
+        contents, pts, no_chunk_docs, bad_chunk_ids = extract_embeddings(req2)
+        np.testing.assert_equal(contents, embeds)
+        self.assertEqual([c.chunk_id for c in pts], list(range(12)))
+        self.assertFalse(no_chunk_docs)
+        self.assertFalse(bad_chunk_ids)
+
+        # chunks in a different order are gathered from the packed rows
+        req2.docs[0].chunks[0].chunk_id = 100
+        d = req2.docs.add()
+        d.doc_id = 100
+        contents, pts, no_chunk_docs, bad_chunk_ids = extract_embeddings(req2)
+        np.testing.assert_equal(contents, embeds[1:])
+        self.assertEqual(no_chunk_docs, [100])
+        self.assertEqual(bad_chunk_ids, [(0, 100)])
+
+    def test_unpack(self):
+        req = random_request()
+        chunk_pts = [c for d in req.docs for c in d.chunks]
+        embeds = np.random.random([len(chunk_pts), 8])
+        pack_embeddings(req, embeds, chunk_pts)
+        unpack_embeddings(req)
+        self.assertFalse(req.embedding_chunk_ids)
+        contents, *_ = extract_chunks(req.docs, embedding=True)
+        np.testing.assert_equal(contents, embeds)
+
+    def test_fallback_to_chunk_embedding(self):
+        req = random_request()
+        for c in (c for d in req.docs for c in d.chunks):
+            c.embedding.CopyFrom(array2pb(np.ones(4) * c.chunk_id))
+        contents, pts, *_ = extract_embeddings(req)
+        self.assertEqual(contents.shape, (12, 4))
+        np.testing.assert_equal(contents[:, 0], np.arange(12))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,29 @@
+import os
 import unittest
 
+import numpy as np
+import zmq
+
+from jina.drivers.helper import pb2array
+from jina.executors.encoders.nlp.char import OneHotTextEncoder
 from jina.main.parser import set_pea_parser, set_pod_parser, set_gateway_parser
 from jina.peapods.gateway import GatewayPea
 from jina.peapods.pea import BasePea
 from jina.peapods.pod import BasePod, GatewayPod, MutablePod, GatewayFlowPod, FlowPod
+from jina.peapods.zmq import send_message, recv_message, add_envelope
+from jina.proto import jina_pb2
 from tests import JinaTestCase
 
+cur_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+class BatchCountingEncoder(OneHotTextEncoder):
+    batch_sizes = []
+
+    def encode(self, data, *args, **kwargs):
+        self.batch_sizes.append(data.shape[0])
+        return super().encode(data, *args, **kwargs)
+
 
 class MyTestCase(JinaTestCase):
 
@@ -121,6 +139,109 @@ class MyTestCase(JinaTestCase):
             with self.subTest(runtime=j):
                 _test_pod_context(j)
 
+    def test_pea_batching(self):
+        args = set_pea_parser().parse_args(['--runtime', 'thread', '--yaml-path', 'BatchCountingEncoder',
+                                            '--max-batch-size', '3', '--max-batch-wait', '500'])
+        ctx = zmq.Context()
+        in_sock = ctx.socket(zmq.PUSH)
+        in_sock.connect(f'tcp://{args.host_in}:{args.port_in}')
+        out_sock = ctx.socket(zmq.PULL)
+        out_sock.connect(f'tcp://{args.host_out}:{args.port_out}')
+        try:
+            with BasePea(args):
+                for j in range(5):
+                    req = jina_pb2.Request()
+                    req.request_id = j
+                    for t in 'abc'[:j % 2 + 1]:
+                        req.index.docs.add().chunks.add().text = t
+                    send_message(in_sock, add_envelope(req, 'test', 'test-id'))
+
+                for j in range(5):
+                    msg, _ = recv_message(out_sock, timeout=5000)
+                    self.assertEqual(msg.envelope.request_id, j)
+                    for d in msg.request.index.docs:
+                        np.testing.assert_array_equal(pb2array(d.chunks[0].embedding),
+                                                      OneHotTextEncoder().encode(np.array([d.chunks[0].text]))[0])
+            # every two requests fill a batch, the last request is encoded after the max wait
+            self.assertEqual(BatchCountingEncoder.batch_sizes, [3, 3, 1])
+        finally:
+            in_sock.close()
+            out_sock.close()
+            ctx.term()
+
+    def test_pea_pipeline(self):
+        args = set_pea_parser().parse_args(['--runtime', 'thread', '--yaml-path', 'OneHotTextEncoder',
+                                            '--pipeline', '--pipeline-queue-size', '2'])
+        ctx = zmq.Context()
+        in_sock = ctx.socket(zmq.PUSH)
+        in_sock.connect(f'tcp://{args.host_in}:{args.port_in}')
+        out_sock = ctx.socket(zmq.PULL)
+        out_sock.connect(f'tcp://{args.host_out}:{args.port_out}')
+        try:
+            with BasePea(args) as p:
+                for j in range(20):
+                    req = jina_pb2.Request()
+                    req.request_id = j
+                    req.index.docs.add().chunks.add().text = chr(ord('a') + j)
+                    send_message(in_sock, add_envelope(req, 'test', 'test-id'))
+                # the control requests are replied by the receiving thread
+                self.assertEqual(p.status.request.control.command, jina_pb2.Request.ControlRequest.STATUS)
+
+                for j in range(20):
+                    msg, _ = recv_message(out_sock, timeout=5000)
+                    self.assertEqual(msg.envelope.request_id, j)
+                    c = msg.request.index.docs[0].chunks[0]
+                    np.testing.assert_array_equal(pb2array(c.embedding),
+                                                  OneHotTextEncoder().encode(np.array([c.text]))[0])
+        finally:
+            in_sock.close()
+            out_sock.close()
+            ctx.term()
+
+    def test_pea_workers(self):
+        args = set_pea_parser().parse_args(['--runtime', 'thread', '--yaml-path', 'PidEncoder', '--num-workers', '2',
+                                            '--py-modules', os.path.join(cur_dir, 'yaml', 'pid_encoder.py')])
+        ctx = zmq.Context()
+        in_sock = ctx.socket(zmq.PUSH)
+        in_sock.connect(f'tcp://{args.host_in}:{args.port_in}')
+        out_sock = ctx.socket(zmq.PULL)
+        out_sock.connect(f'tcp://{args.host_out}:{args.port_out}')
+        try:
+            with BasePea(args) as p:
+                for j in range(10):
+                    req = jina_pb2.Request()
+                    req.request_id = j
+                    body = req.train if j == 5 else req.search
+                    body.docs.add().chunks.add().text = 'a'
+                    send_message(in_sock, add_envelope(req, 'test', 'test-id'))
+                self.assertEqual(p.status.request.control.command, jina_pb2.Request.ControlRequest.STATUS)
+                # the executor is only loaded by the workers, the pea keeps a forwarding one for the control requests
+                self.assertEqual(p.executor.name, 'forward')
+
+                pids = []
+                for j in range(10):
+                    msg, _ = recv_message(out_sock, timeout=20000)
+                    self.assertEqual(msg.envelope.request_id, j)
+                    body = getattr(msg.request, msg.request.WhichOneof('body'))
+                    pids.append(int(pb2array(body.docs[0].chunks[0].embedding)[0]))
+            # the search requests are handled by the workers, the train request by a single worker of its own
+            self.assertNotIn(os.getpid(), pids)
+            self.assertNotIn(pids[5], pids[:5] + pids[6:])
+        finally:
+            in_sock.close()
+            out_sock.close()
+            ctx.term()
+
+    def test_pea_workers_threaded_executor(self):
+        from jina.executors.indexers.vector.numpy import NumpyIndexer
+        p = BasePea(set_pea_parser().parse_args(['--num-workers', '2']))
+        self.assertFalse(p.daemon)
+        # the executors running their own threads can not be used with the workers
+        p.executor = NumpyIndexer(index_filename='workers.bin', num_threads=2)
+        self.assertEqual(p._get_threaded_executors(), [p.executor.name])
+        p.executor = NumpyIndexer(index_filename='workers.bin')
+        self.assertEqual(p._get_threaded_executors(), [])
+
 
 if __name__ == '__main__':
     unittest.main()
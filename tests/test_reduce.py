@@ -0,0 +1,80 @@
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from jina.drivers.reduce import MergeTopKDriver
+from jina.drivers.score import Chunk2DocScoreDriver
+from jina.executors.rankers import MaxRanker
+from jina.proto import jina_pb2
+from tests import JinaTestCase
+
+
+def random_request(num_docs=2, num_chunks=3, top_k=5):
+    msg = jina_pb2.Message()
+    req = msg.request.search
+    req.top_k = top_k
+    for j in range(num_docs):
+        d = req.docs.add()
+        d.doc_id = j
+        # the doc-level results are scored by a ranker, the higher the better
+        for s in np.sort(np.random.random(top_k))[::-1]:
+            r = d.topk_results.add()
+            r.score.value = s
+        for k in range(num_chunks):
+            c = d.chunks.add()
+            c.chunk_id = j * num_chunks + k
+            for s in np.sort(np.random.random(top_k)):
+                r = c.topk_results.add()
+                r.score.value = s
+    return msg
+
+
+class MyTestCase(JinaTestCase):
+
+    def test_merge_topk(self):
+        msgs = [random_request() for _ in range(4)]
+        reqs = [m.request.search for m in msgs]
+        expected_doc = np.sort([r.score.value for q in reqs for r in q.docs[1].topk_results])[::-1][:5]
+        expected_chunk = np.sort([r.score.value for q in reqs for r in q.docs[0].chunks[2].topk_results])[:5]
+
+        driver = MergeTopKDriver(level='all')
+        driver.attach(pea=SimpleNamespace(request=reqs[-1], message=msgs[-1], prev_requests=reqs,
+                                          prev_messages=msgs))
+        driver()
+        req = reqs[-1]
+        np.testing.assert_almost_equal([r.score.value for r in req.docs[1].topk_results], expected_doc)
+        np.testing.assert_almost_equal([r.score.value for r in req.docs[0].chunks[2].topk_results], expected_chunk)
+        for d in req.docs:
+            self.assertEqual(len(d.topk_results), 5)
+            for c in d.chunks:
+                self.assertEqual(len(c.topk_results), 5)
+
+    def test_merge_ranked_docs(self):
+        msgs = []
+        for shard_id in range(2):
+            msg = jina_pb2.Message()
+            req = msg.request.search
+            req.top_k = 3
+            c = req.docs.add().chunks.add()
+            # each shard matches 4 docs, the shard 1 holds the best matches
+            for j in range(4):
+                r = c.topk_results.add()
+                r.match_chunk.doc_id = shard_id * 10 + j
+                r.match_chunk.chunk_id = shard_id * 10 + j
+                r.score.value = shard_id + j / 10
+            driver = Chunk2DocScoreDriver()
+            driver.attach(executor=MaxRanker(), pea=SimpleNamespace(request=req, message=msg))
+            driver()
+            msgs.append(msg)
+        reqs = [m.request.search for m in msgs]
+
+        driver = MergeTopKDriver(level='doc')
+        driver.attach(pea=SimpleNamespace(request=reqs[-1], message=msgs[-1], prev_requests=reqs,
+                                          prev_messages=msgs))
+        driver()
+        self.assertEqual([r.match_doc.doc_id for r in reqs[-1].docs[0].topk_results], [13, 12, 11])
+
+
+if __name__ == '__main__':
+    unittest.main()
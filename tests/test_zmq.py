@@ -0,0 +1,70 @@
+import unittest
+
+import numpy as np
+import zmq
+
+from jina.drivers.helper import array2pb, extract_chunks
+from jina.peapods.zmq import send_message, recv_message, add_envelope
+from jina.proto import jina_pb2
+from tests import JinaTestCase
+
+
+def random_msg(num_docs=3, chunks_per_doc=4, embed_dim=8):
+    req = jina_pb2.Request()
+    c_id = 0
+    for j in range(num_docs):
+        d = req.index.docs.add()
+        d.doc_id = j
+        for k in range(chunks_per_doc):
+            c = d.chunks.add()
+            c.chunk_id = c_id
+            c.text = f'hello {c_id}'
+            c.embedding.CopyFrom(array2pb(np.random.random([embed_dim])))
+            c_id += 1
+    return add_envelope(req, 'test', 'test-id')
+
+
+class MyTestCase(JinaTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.ctx = zmq.Context()
+        self.in_sock = self.ctx.socket(zmq.PAIR)
+        self.out_sock = self.ctx.socket(zmq.PAIR)
+        self.in_sock.bind('inproc://test-zero-copy')
+        self.out_sock.connect('inproc://test-zero-copy')
+
+    def tearDown(self):
+        self.in_sock.close()
+        self.out_sock.close()
+        self.ctx.term()
+        super().tearDown()
+
+    def test_zero_copy_recv(self):
+        msg = random_msg()
+        expected, *_ = extract_chunks(msg.request.index.docs, embedding=True)
+
+        send_message(self.out_sock, msg)
+        buffers = {}
+        recv_msg, _ = recv_message(self.in_sock, buffers=buffers)
+        docs = recv_msg.request.index.docs
+        self.assertEqual(len(buffers), 12)
+        # the embeddings are not filled into the message, the rest are
+        self.assertFalse(any(c.embedding.raw_bytes for d in docs for c in d.chunks))
+        self.assertEqual(docs[1].chunks[0].text, 'hello 4')
+        embeds, chunk_pts, _, bad_chunk_ids = extract_chunks(docs, embedding=True, buffers=buffers)
+        np.testing.assert_equal(embeds, expected)
+        self.assertEqual(len(chunk_pts), 12)
+        self.assertFalse(bad_chunk_ids)
+
+        # forwarding the message sends the buffered embeddings along with it
+        docs[0].chunks[0].embedding.CopyFrom(array2pb(np.zeros(8)))
+        expected[0] = 0
+        send_message(self.out_sock, recv_msg, buffers=buffers)
+        recv_msg, _ = recv_message(self.in_sock)
+        embeds, *_ = extract_chunks(recv_msg.request.index.docs, embedding=True)
+        np.testing.assert_equal(embeds, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()